@@ -42,10 +42,13 @@ def main():
     if environment == 'development':
         # For development, you likely want debug mode and possibly a specific host for local network testing
         app.run(host='0.0.0.0', port=port, debug=True)
+    elif environment == 'production':
+        # Pre-fork worker pool with graceful recycling and SIGTERM shutdown (see server.py)
+        from .server import serve
+        serve(app, port)
     else:
-        # For production or other environments, debug should be False.
-        # Use '0.0.0.0' to make it accessible from outside the container/localhost,
-        # but in a production setup, you'd typically use a WSGI server like Gunicorn or uWSGI.
+        # Other environments (e.g. testing) keep the single-process server, without debug.
+        # Use '0.0.0.0' to make it accessible from outside the container/localhost.
         app.run(host='0.0.0.0', port=port, debug=False)
 
 if __name__ == "__main__":
@@ -0,0 +1,481 @@
+"""
+Columnar analytics over a user's training history.
+
+TrainingHistory loads a user's set rows once into contiguous NumPy arrays
+(one per column) and computes metrics as vectorized group-bys over them.
+Each metric returns the same JSON shape as the matching endpoint in
+routes_metrics.py, so endpoints can be switched over (METRICS_ENGINE=numpy,
+or ?engine=numpy per request) and benchmarked against the SQL versions.
+
+DailyPrefixSums answers arbitrary date-range and bucketed (day, week,
+month) metrics as differences of cumulative totals over the logged days.
+
+Histories and prefix sums are cached per worker, keyed by the user's data
+version (see UserDataVersion), so repeated metric requests reuse the
+loaded arrays.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func
+
+from .cache import LRUCache
+from .catalog import reference_catalog
+from .models import db, Exercise, Workout, StandardExercise, CustomExercise, UserDataVersion
+from . import constants
+
+# numpy's datetime64[D] counts days from 1970-01-01
+EPOCH_ORDINAL = 719163
+
+# Loaded histories and prefix sums, keyed by (user_id, data version)
+history_cache = LRUCache(maxsize=constants.ANALYTICS_CACHE_SIZE)
+prefix_cache = LRUCache(maxsize=constants.ANALYTICS_CACHE_SIZE)
+
+# Bucket sizes accepted by ranged metrics
+BUCKETS = ('day', 'week', 'month')
+
+
+def _to_days(day):
+    """Convert a date to days since the epoch"""
+    return day.toordinal() - EPOCH_ORDINAL
+
+
+def _iso_weeks(days):
+    """
+    Vectorized ISO calendar for an array of epoch days.
+
+    Returns:
+        tuple: (iso_year, iso_week) integer arrays
+    """
+    # 1970-01-01 was a Thursday, so (days + 3) % 7 is Monday-based weekday
+    thursdays = days - (days + 3) % 7 + 3
+    years = thursdays.astype('datetime64[D]').astype('datetime64[Y]')
+    jan_first = years.astype('datetime64[D]').astype(np.int64)
+    return years.astype(np.int64) + 1970, (thursdays - jan_first) // 7 + 1
+
+
+def _group_sum(keys, values):
+    """Sum values per unique key; returns (unique_keys, sums)"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values, minlength=len(unique))
+
+
+def _group_max(keys, values):
+    """Max of values per unique key, ignoring NaN; returns (unique_keys, maxima)"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    maxima = np.full(len(unique), -np.inf)
+    np.fmax.at(maxima, inverse, values)
+    return unique, maxima
+
+
+def _epley(weight, reps):
+    return np.where(reps <= 1, weight, weight * (1 + reps / 30.0))
+
+
+def _brzycki(weight, reps):
+    # Undefined from 37 reps on; those sets do not produce an estimate
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(reps < 37, weight * 36.0 / (37.0 - reps), np.nan)
+
+
+def _lombardi(weight, reps):
+    return weight * np.power(np.maximum(reps, 1), 0.1)
+
+
+# Vectorized estimated one-rep max formulas; a single rep is its own max in each
+E1RM_FORMULAS = {
+    'epley': _epley,
+    'brzycki': _brzycki,
+    'lombardi': _lombardi,
+}
+
+
+def _rounded(values):
+    """Round an estimate array for JSON, with -inf (no estimate) as None"""
+    return [round(v, 1) if np.isfinite(v) else None for v in values.tolist()]
+
+
+class TrainingHistory:
+    """
+    One user's set history as parallel NumPy arrays, ordered by date.
+
+    Columns: days (epoch days), exercise_key (see Exercise.make_exercise_key,
+    0 for legacy rows), body_part_id (0 if unknown), weight, reps, sets.
+    """
+
+    def __init__(self, days, exercise_key, body_part_id, weight, reps, sets, exercise_names=None):
+        self._memo = {}  # Computed results; a history lives for one data version
+        self.days = days
+        self.exercise_key = exercise_key
+        self.body_part_id = body_part_id
+        self.weight = weight
+        self.reps = reps
+        self.sets = sets
+        self.exercise_names = exercise_names or {}
+        self.volume = weight * reps * sets
+
+    def __len__(self):
+        return len(self.days)
+
+    @classmethod
+    def load(cls, user_id):
+        """Load a user's full set history with one query (plus one for exercise names)"""
+        rows = db.session.query(
+            Exercise.date,
+            Exercise.exercise_key_expr(),
+            Exercise.body_part_id,
+            Exercise.weight,
+            Exercise.reps,
+            Exercise.sets
+        ).filter(
+            Exercise.user_id == user_id
+        ).order_by(Exercise.date).all()
+
+        count = len(rows)
+        days, keys, body_parts, weights, reps, sets = zip(*rows) if rows else ((),) * 6
+        history = cls(
+            days=np.fromiter((_to_days(d) for d in days), dtype=np.int64, count=count),
+            exercise_key=np.fromiter((k or 0 for k in keys), dtype=np.int64, count=count),
+            body_part_id=np.fromiter((b or 0 for b in body_parts), dtype=np.int64, count=count),
+            weight=np.fromiter(weights, dtype=np.float64, count=count),
+            reps=np.fromiter(reps, dtype=np.float64, count=count),
+            sets=np.fromiter(sets, dtype=np.float64, count=count),
+        )
+        history.exercise_names = cls._load_exercise_names(user_id)
+        return history
+
+    @staticmethod
+    def _load_exercise_names(user_id):
+        """Map each exercise key the user has logged to its display name"""
+        names = db.session.query(
+            Exercise.exercise_key_expr().label('exercise_key'),
+            func.coalesce(
+                StandardExercise.exercise_name,
+                CustomExercise.exercise_name,
+                "Unknown"
+            ).label('exercise_name')
+        ).outerjoin(
+            StandardExercise, StandardExercise.standard_exercise_id == Exercise.standard_exercise_id
+        ).outerjoin(
+            CustomExercise, CustomExercise.custom_exercise_id == Exercise.custom_exercise_id
+        ).filter(
+            Exercise.user_id == user_id
+        ).distinct().all()
+        return {key: name for key, name in names if key is not None}
+
+    def _window(self, start=None, end=None):
+        """Boolean mask of rows with start <= date <= end (either bound optional)"""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.days >= _to_days(start)
+        if end is not None:
+            mask &= self.days <= _to_days(end)
+        return mask
+
+    def keys_for_name(self, exercise_name):
+        """Exercise keys with a display name, standard exercises first"""
+        return sorted(
+            (key for key, name in self.exercise_names.items() if name == exercise_name),
+            reverse=True
+        )
+
+    def _exercise_mask(self, exercise_name):
+        """Boolean mask of one exercise's rows (standard exercise wins a name clash)"""
+        keys = self.keys_for_name(exercise_name)
+        if not keys:
+            return np.zeros(len(self), dtype=bool)
+        return self.exercise_key == keys[0]
+
+    # Metrics (same JSON shapes as routes_metrics.py)
+
+    def weekly_volume(self, since):
+        """Total volume per ISO week from `since`'s week on (see volume_trend)"""
+        start = _to_days(since)
+        mask = self.days >= start - (start + 3) % 7
+        years, weeks = _iso_weeks(self.days[mask])
+        week_keys, volumes = _group_sum(years * 100 + weeks, self.volume[mask])
+        return {
+            "weeks": [f"{key // 100}-{key % 100:02d}" for key in week_keys.tolist()],
+            "volumes": volumes.tolist()
+        }
+
+    def body_part_volume(self, start, end):
+        """Total volume per body part name between two dates"""
+        mask = self._window(start, end) & (self.body_part_id > 0)
+        body_parts, volumes = _group_sum(self.body_part_id[mask], self.volume[mask])
+        return {
+            reference_catalog.body_part_name(int(body_part_id)): float(volume)
+            for body_part_id, volume in zip(body_parts, volumes)
+        }
+
+    def imbalance(self, start, end):
+        """Percentage of volume per body part (see body_part_imbalance)"""
+        volumes = self.body_part_volume(start, end)
+        total_volume = sum(volumes.values())
+        if total_volume == 0:
+            return {
+                'error': 'No workout data found for the specified period',
+                'data': {},
+                'total_volume': 0
+            }
+
+        return {
+            'data': {
+                body_part: round(volumes.get(body_part, 0) / total_volume * 100, 2)
+                for body_part in reference_catalog.body_part_names()
+            },
+            'total_volume': total_volume,
+            'period': {
+                'start': start.isoformat(),
+                'end': end.isoformat()
+            }
+        }
+
+    def balance_frequency(self, start, end=None):
+        """Distinct training days per body part name (input to body_part_balance)"""
+        mask = self._window(start, end) & (self.body_part_id > 0)
+        # Unique (body part, day) pairs, then count pairs per body part
+        pairs = np.unique(np.stack([self.body_part_id[mask], self.days[mask]]), axis=1)
+        body_parts, days_worked = np.unique(pairs[0], return_counts=True)
+        return {
+            reference_catalog.body_part_name(int(body_part_id)): int(days)
+            for body_part_id, days in zip(body_parts, days_worked)
+        }
+
+    def progression(self, exercise_name):
+        """Per-day max weight, volume and e1RM for one exercise (see get_exercise_progression)"""
+        mask = self._exercise_mask(exercise_name)
+        days = self.days[mask]
+        weight = self.weight[mask]
+        # Same formula as DailyExerciseSummary.estimate_1rm
+        e1rm = _epley(weight, self.reps[mask])
+
+        training_days, max_weights = _group_max(days, weight)
+        _, volumes = _group_sum(days, self.volume[mask])
+        _, estimated_1rms = _group_max(days, e1rm)
+
+        dates = training_days.astype('datetime64[D]').astype(str).tolist()
+        max_weights = max_weights.tolist()
+        pr_index = int(np.argmax(max_weights)) if max_weights else None
+        return {
+            'exercise_name': exercise_name,
+            'dates': dates,
+            'max_weights': max_weights,
+            'volumes': volumes.tolist(),
+            'estimated_1rms': np.round(estimated_1rms, 1).tolist(),
+            'personal_record': {
+                'weight': max_weights[pr_index] if pr_index is not None else 0,
+                'date': dates[pr_index] if pr_index is not None else None
+            },
+            'total_sessions': len(dates)
+        }
+
+    def strength_curve(self, exercise_name, formula='epley'):
+        """
+        Per-session estimated 1RM (Epley, Brzycki and the selected formula),
+        rolling best e1RM, and a rep-max table (heaviest weight lifted for at
+        least N reps, N = 1..REP_MAX_TABLE_REPS) for one exercise.
+        """
+        memo_key = ('strength_curve', exercise_name, formula)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        mask = self._exercise_mask(exercise_name)
+        days = self.days[mask]
+        weight = self.weight[mask]
+        reps = self.reps[mask]
+
+        training_days, _ = _group_max(days, weight)
+        estimates = {}
+        for name in {'epley', 'brzycki', formula}:
+            _, estimates[name] = _group_max(days, E1RM_FORMULAS[name](weight, reps))
+        selected = estimates[formula]
+
+        # Heaviest weight per exact rep count, then a reverse running max so
+        # each row is the best weight moved for at least that many reps
+        table_size = constants.REP_MAX_TABLE_REPS
+        best_at = np.full(table_size + 1, -np.inf)
+        in_table = reps <= table_size
+        np.fmax.at(best_at, np.maximum(reps[in_table], 1).astype(np.int64), weight[in_table])
+        high_rep_best = weight[~in_table].max() if (~in_table).any() else -np.inf
+        best_at[table_size] = max(best_at[table_size], high_rep_best)
+        rep_maxes = np.maximum.accumulate(best_at[:0:-1])[::-1]
+
+        result = {
+            'exercise_name': exercise_name,
+            'formula': formula,
+            'dates': training_days.astype('datetime64[D]').astype(str).tolist(),
+            'e1rm': _rounded(selected),
+            'epley': _rounded(estimates['epley']),
+            'brzycki': _rounded(estimates['brzycki']),
+            'rolling_best': _rounded(np.maximum.accumulate(selected)) if len(selected) else [],
+            'rep_maxes': {
+                str(rep_count): value
+                for rep_count, value in zip(range(1, table_size + 1), _rounded(rep_maxes))
+            },
+            'total_sessions': len(training_days)
+        }
+        self._memo[memo_key] = result
+        return result
+
+    def diversity(self, start):
+        """Number of distinct exercises performed since a date (see workout_diversity)"""
+        mask = self._window(start) & (self.exercise_key != 0)
+        return {"unique_exercises": int(len(np.unique(self.exercise_key[mask])))}
+
+
+def history_for(user_id):
+    """Return the user's TrainingHistory, loading it on a cache miss"""
+    cache_key = (user_id, UserDataVersion.get(user_id))
+    history = history_cache.get(cache_key)
+    if history is None:
+        history = TrainingHistory.load(user_id)
+        history_cache.set(cache_key, history)
+    return history
+
+
+def bucket_periods(start, end, bucket):
+    """
+    Split start..end (inclusive) into day, week (ISO, Monday-based) or
+    month buckets. The first and last buckets are cut to the range.
+
+    Returns:
+        list: (label, first_day, last_day) per bucket, labelled
+        YYYY-MM-DD, YYYY-WW (ISO week, as in volume_trend) or YYYY-MM
+    """
+    periods = []
+    day = start
+    while day <= end:
+        if bucket == 'day':
+            label, next_day = day.isoformat(), day + timedelta(days=1)
+        elif bucket == 'week':
+            iso_year, iso_week, weekday = day.isocalendar()
+            label, next_day = f"{iso_year}-{iso_week:02d}", day + timedelta(days=8 - weekday)
+        else:
+            label = f"{day.year}-{day.month:02d}"
+            next_day = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        periods.append((label, day, min(next_day - timedelta(days=1), end)))
+        day = next_day
+    return periods
+
+
+class DailyPrefixSums:
+    """
+    Cumulative daily totals for one user over the days they logged
+    anything, so the total over any date range is
+    prefix[hi] - prefix[lo], with lo and hi found by binary search in the
+    sorted day array: a year costs the same two lookups as a week, and
+    memory grows with the number of logged days, not the span between the
+    first and last one.
+
+    Holds per-body-part volume (body part 0 for rows without one), a
+    training-day count for workouts, and per exercise key the sorted
+    days it was trained, where a searchsorted position is that key's
+    running count of training days.
+    """
+
+    def __init__(self, days, body_part_ids, volume_prefix, workout_prefix, exercise_days, num_keys):
+        self.days = days                        # sorted distinct epoch days, (days,)
+        self.body_part_ids = body_part_ids
+        self.volume_prefix = volume_prefix      # (body parts, days + 1)
+        self.total_prefix = volume_prefix.sum(axis=0)
+        self.workout_prefix = workout_prefix    # (days + 1,)
+        self.exercise_days = exercise_days      # sorted key_index * num_days + day index
+        self.num_days = len(days)
+        self.num_keys = num_keys
+
+    @classmethod
+    def load(cls, user_id):
+        """Build a user's prefix sums from one grouped query (plus one for workout dates)"""
+        rows = db.session.query(
+            Exercise.date,
+            func.coalesce(Exercise.body_part_id, 0),
+            func.coalesce(Exercise.exercise_key_expr(), 0),
+            func.sum(Exercise.weight * Exercise.reps * Exercise.sets)
+        ).filter(
+            Exercise.user_id == user_id
+        ).group_by(
+            Exercise.date,
+            Exercise.body_part_id,
+            Exercise.exercise_key_expr()
+        ).all()
+        workout_dates = db.session.query(Workout.date).filter(
+            Workout.user_id == user_id
+        ).distinct().all()
+
+        dates, body_parts, keys, volumes = zip(*rows) if rows else ((),) * 4
+        exercise_dates = np.array([_to_days(d) for d in dates], dtype=np.int64)
+        workout_days = np.array([_to_days(d) for d, in workout_dates], dtype=np.int64)
+
+        # Index every row by its position among the distinct logged days
+        days = np.unique(np.concatenate([exercise_dates, workout_days]))
+        num_days = len(days)
+        positions = np.searchsorted(days, exercise_dates)
+
+        # Daily volume per body part, accumulated along the day axis
+        body_part_ids, body_part_index = np.unique(
+            np.array(body_parts, dtype=np.int64), return_inverse=True
+        )
+        daily_volume = np.zeros((len(body_part_ids), num_days))
+        np.add.at(daily_volume, (body_part_index, positions), np.array(volumes, dtype=np.float64))
+        volume_prefix = np.zeros((len(body_part_ids), num_days + 1))
+        np.cumsum(daily_volume, axis=1, out=volume_prefix[:, 1:])
+
+        trained = np.zeros(num_days, dtype=np.int64)
+        trained[np.searchsorted(days, workout_days)] = 1
+        workout_prefix = np.concatenate([[0], np.cumsum(trained)])
+
+        # Distinct (exercise, day) pairs, as one sorted composite per pair
+        keys = np.array(keys, dtype=np.int64)
+        logged = keys != 0
+        exercise_keys, key_index = np.unique(keys[logged], return_inverse=True)
+        exercise_days = np.unique(key_index * num_days + positions[logged])
+
+        return cls(days, body_part_ids, volume_prefix, workout_prefix, exercise_days, len(exercise_keys))
+
+    def _bounds(self, periods):
+        """Prefix indexes (lo, hi) per period: the logged days before it and up to its end"""
+        first = np.array([_to_days(p[1]) for p in periods], dtype=np.int64)
+        last = np.array([_to_days(p[2]) for p in periods], dtype=np.int64)
+        return np.searchsorted(self.days, first, side='left'), np.searchsorted(self.days, last, side='right')
+
+    def volume(self, periods):
+        """Total volume per period"""
+        lo, hi = self._bounds(periods)
+        return self.total_prefix[hi] - self.total_prefix[lo]
+
+    def body_part_volume(self, periods):
+        """Volume per body part name (body parts with an id) per period"""
+        lo, hi = self._bounds(periods)
+        return {
+            reference_catalog.body_part_name(int(body_part_id)): prefix[hi] - prefix[lo]
+            for body_part_id, prefix in zip(self.body_part_ids, self.volume_prefix)
+            if body_part_id > 0
+        }
+
+    def workout_days(self, periods):
+        """Number of distinct workout days per period"""
+        lo, hi = self._bounds(periods)
+        return self.workout_prefix[hi] - self.workout_prefix[lo]
+
+    def distinct_exercises(self, periods):
+        """Number of distinct exercises performed per period"""
+        lo, hi = self._bounds(periods)
+        # Each key's training days in [lo, hi), for every key and period at once
+        key_base = (np.arange(self.num_keys) * self.num_days)[:, None]
+        counts = (
+            np.searchsorted(self.exercise_days, key_base + hi)
+            - np.searchsorted(self.exercise_days, key_base + lo)
+        )
+        return (counts > 0).sum(axis=0)
+
+
+def prefix_sums_for(user_id):
+    """Return the user's DailyPrefixSums, building them on a cache miss"""
+    cache_key = (user_id, UserDataVersion.get(user_id))
+    prefix_sums = prefix_cache.get(cache_key)
+    if prefix_sums is None:
+        prefix_sums = DailyPrefixSums.load(user_id)
+        prefix_cache.set(cache_key, prefix_sums)
+    return prefix_sums
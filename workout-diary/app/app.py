@@ -9,6 +9,8 @@ from .models import db, User
 from .initialize_data_base import initialize_database
 from . import constants as constants_main
 from .logging_config import setup_logging, log_request_info
+from .compression import init_compression
+from .static_assets import init_static_assets
 
 
 def create_app():
@@ -139,6 +141,9 @@ def create_app():
         'pool_recycle': 300,
     }
     
+    # Metrics backend: 'sql' (aggregate queries) or 'numpy' (columnar engine in analitics.py)
+    app.config['METRICS_ENGINE'] = os.getenv('METRICS_ENGINE', 'sql').lower()
+    
     # ========================================
     # SESSION SECURITY
     # ========================================
@@ -166,6 +171,12 @@ def create_app():
     # Add request logging middleware
     log_request_info(app)
     
+    # Compress text responses (runs before the request log's after_request)
+    init_compression(app)
+    
+    # Fingerprinted, precompressed static files (see build_static.py)
+    init_static_assets(app)
+    
     # Initialize LoginManager
     login_manager = LoginManager()
     login_manager.init_app(app)
@@ -243,11 +254,12 @@ def create_app():
     @app.after_request
     def set_security_headers(response):
         """Add security headers to all responses"""
-        # Content Security Policy
+        # Content Security Policy (the Tailwind CDN only until tailwind.css is built)
+        tailwind_cdn = '' if app.config.get('TAILWIND_BUILT') else ' https://cdn.tailwindcss.com'
         response.headers['Content-Security-Policy'] = (
             "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.tailwindcss.com https://cdn.jsdelivr.net https://code.jquery.com; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://cdn.tailwindcss.com; "
+            f"script-src 'self' 'unsafe-inline' 'unsafe-eval'{tailwind_cdn} https://cdn.jsdelivr.net https://code.jquery.com; "
+            f"style-src 'self' 'unsafe-inline' https://fonts.googleapis.com{tailwind_cdn}; "
             "font-src 'self' https://fonts.gstatic.com; "
             "img-src 'self' data: https:; "
             "connect-src 'self'; "
@@ -0,0 +1,119 @@
+"""
+In-process caches shared by the route modules.
+
+Each worker process keeps its own copy. Entries are keyed by the user's
+data version (see UserDataVersion in models.py), so a write in any worker
+makes stale entries unreachable everywhere without cross-process messaging.
+The same version drives the read APIs' ETags (see etag_by_data_version).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with hit/miss counters.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, predicate=None):
+        """
+        Drop entries from this worker's cache.
+
+        Args:
+            predicate: Optional function of the key; only matching keys are
+                dropped. Drops everything when omitted.
+        """
+        with self._lock:
+            if predicate is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def stats(self):
+        """Return size and hit/miss counters for logging or diagnostics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+def etag_by_data_version(view):
+    """
+    Give a GET JSON view an ETag and answer conditional requests.
+
+    The ETag hashes the current user's data version, today's date (windowed
+    metrics move at midnight), the reference catalog version, the metrics
+    engine and the full request path with its query string. When the
+    client's If-None-Match matches, a 304 is returned without calling the
+    view, so none of its queries run. The tag is weak: it names the data,
+    and the bytes differ when the response is compressed (see
+    compression.py). Apply below @login_required.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        from flask import request, make_response, current_app
+        from flask_login import current_user
+        from .catalog import reference_catalog
+        from .models import UserDataVersion
+
+        fingerprint = ':'.join(str(part) for part in (
+            current_user.user_id,
+            UserDataVersion.get(current_user.user_id),
+            date.today().isoformat(),
+            reference_catalog.current_version(),
+            current_app.config.get('METRICS_ENGINE', 'sql'),
+            request.full_path
+        ))
+        etag = hashlib.sha1(fingerprint.encode()).hexdigest()
+
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        # Per-user data: browsers may store it but must revalidate every time
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
@@ -0,0 +1,126 @@
+"""
+In-memory reference catalog for BodyParts and StandardExercises.
+
+Both tables are static reference data, so each worker loads them once and
+answers name/ID lookups from dictionaries. The catalog carries a version
+(a signature of both tables) that is re-checked at most every
+CATALOG_CHECK_SECONDS; when it changes the catalog reloads. Call
+reference_catalog.invalidate() after editing reference data in-process.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import func
+
+from . import constants
+
+CatalogExercise = namedtuple(
+    'CatalogExercise',
+    ['standard_exercise_id', 'body_part_id', 'exercise_name', 'description', 'is_compound']
+)
+
+
+class ReferenceCatalog:
+    def __init__(self, check_seconds=constants.CATALOG_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self.version = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._body_part_ids = {}
+        self._body_part_names = {}
+        self._exercises = {}
+        self._exercises_by_body_part = {}
+
+    @staticmethod
+    def _signature():
+        """One cheap aggregate describing the current reference data"""
+        from .models import db, BodyPart, StandardExercise
+
+        body_parts = db.session.query(
+            func.count(BodyPart.body_part_id),
+            func.max(BodyPart.body_part_id),
+            func.sum(func.length(BodyPart.body_part_name))
+        ).one()
+        exercises = db.session.query(
+            func.count(StandardExercise.standard_exercise_id),
+            func.max(StandardExercise.standard_exercise_id),
+            func.sum(func.length(StandardExercise.exercise_name))
+        ).one()
+        return tuple(body_parts) + tuple(exercises)
+
+    def _load(self, signature):
+        from .models import db, BodyPart, StandardExercise
+
+        body_parts = db.session.query(BodyPart.body_part_id, BodyPart.body_part_name).all()
+        exercises = db.session.query(
+            StandardExercise.standard_exercise_id,
+            StandardExercise.body_part_id,
+            StandardExercise.exercise_name,
+            StandardExercise.description,
+            StandardExercise.is_compound
+        ).order_by(StandardExercise.exercise_name).all()
+
+        by_body_part = {}
+        for row in exercises:
+            by_body_part.setdefault(row.body_part_id, []).append(CatalogExercise(*row))
+
+        self._body_part_ids = {row.body_part_name: row.body_part_id for row in body_parts}
+        self._body_part_names = {row.body_part_id: row.body_part_name for row in body_parts}
+        self._exercises = {row.standard_exercise_id: CatalogExercise(*row) for row in exercises}
+        self._exercises_by_body_part = by_body_part
+        self.version = signature
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self.version is not None and now - self._checked_at < self.check_seconds:
+            return
+        with self._lock:
+            if self.version is not None and now - self._checked_at < self.check_seconds:
+                return
+            signature = self._signature()
+            if signature != self.version:
+                self._load(signature)
+            self._checked_at = now
+
+    def invalidate(self):
+        """Force a reload on the next lookup in this worker"""
+        with self._lock:
+            self.version = None
+
+    # ========================================
+    # LOOKUPS
+    # ========================================
+    def current_version(self):
+        """Return the catalog version (re-checked at most every check_seconds)"""
+        self._ensure_current()
+        return self.version
+
+    def body_part_id(self, body_part_name):
+        """Return the ID for a body part name, or None if unknown"""
+        self._ensure_current()
+        return self._body_part_ids.get(body_part_name)
+
+    def body_part_name(self, body_part_id):
+        """Return the name for a body part ID, or None if unknown"""
+        self._ensure_current()
+        return self._body_part_names.get(body_part_id)
+
+    def body_part_names(self):
+        """Return all body part names, sorted"""
+        self._ensure_current()
+        return sorted(self._body_part_ids)
+
+    def standard_exercise(self, standard_exercise_id):
+        """Return the CatalogExercise for an ID, or None if unknown"""
+        self._ensure_current()
+        return self._exercises.get(standard_exercise_id)
+
+    def standard_exercises_for_body_part(self, body_part_id):
+        """Return a body part's standard exercises, sorted by name"""
+        self._ensure_current()
+        return list(self._exercises_by_body_part.get(body_part_id, []))
+
+
+reference_catalog = ReferenceCatalog()
@@ -0,0 +1,170 @@
+"""
+Response compression for HTML, JSON and other text responses.
+
+Compresses in an after_request hook, so it sees the final body and headers:
+
+- gzip always, Brotli when the `brotli` (or `brotlicffi`) package is
+  installed and the client prefers it (Accept-Encoding q-values)
+- bodies under COMPRESSION_MIN_SIZE are sent as-is, as is anything already
+  encoded, HEAD/204/304 responses, and Cache-Control: no-transform
+- every response the decision depended on gets Vary: Accept-Encoding
+- streamed responses are compressed chunk by chunk as they are sent
+  (flushed per chunk), never collected into one buffer first
+- a compressed body is a different byte sequence, so a strong ETag becomes
+  weak (etag_by_data_version already issues weak tags)
+- send_file responses (static files) pass straight through untouched;
+  fingerprinted assets are precompressed at build time (static_assets.py)
+
+Set COMPRESS=false to turn it off (e.g. behind a proxy that compresses).
+"""
+
+import os
+import zlib
+
+from . import constants
+
+try:
+    import brotli as _brotli
+except ImportError:
+    try:
+        import brotlicffi as _brotli
+    except ImportError:
+        _brotli = None
+
+
+def available_encodings():
+    """Encodings this process can produce, in order of preference"""
+    return ('br', 'gzip') if _brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encodings, offered=None):
+    """
+    Pick the content coding for a request's Accept-Encoding (a werkzeug
+    Accept object): the highest-quality one of `offered` (default: what
+    this process can produce), earlier ones winning ties.
+    Returns None when the client accepts none of them.
+    """
+    best, best_quality = None, 0
+    for encoding in offered if offered is not None else available_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_bytes(data, encoding, level=None):
+    """
+    Compress a whole body in one call. `level` overrides the gzip level or
+    Brotli quality used for dynamic responses (build_static.py uses the max).
+    """
+    if encoding == 'br':
+        return _brotli.compress(data, quality=constants.BROTLI_QUALITY if level is None else level)
+    compressor = zlib.compressobj(
+        constants.GZIP_LEVEL if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+    return compressor.compress(data) + compressor.flush()
+
+
+class StreamCompressor:
+    """
+    Incremental gzip/Brotli encoder. `chunk` returns whatever is complete
+    after feeding one piece of the body (flushed, so a streamed response
+    still reaches the client piece by piece); `finish` ends the stream.
+    """
+
+    def __init__(self, encoding):
+        if encoding == 'br':
+            compressor = _brotli.Compressor(quality=constants.BROTLI_QUALITY)
+            self._process = compressor.process
+            self._flush = compressor.flush
+            self._finish = compressor.finish
+        else:
+            compressor = zlib.compressobj(constants.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._process = compressor.compress
+            self._flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = compressor.flush
+
+    def chunk(self, data):
+        return self._process(data) + self._flush()
+
+    def finish(self):
+        return self._finish()
+
+
+def _compressed_stream(body, encoding, close):
+    """Yield the compressed form of an iterable body, closing the original afterwards"""
+    compressor = StreamCompressor(encoding)
+    try:
+        for data in body:
+            if data:
+                compressed = compressor.chunk(data)
+                if compressed:
+                    yield compressed
+        yield compressor.finish()
+    finally:
+        if close is not None:
+            close()
+
+
+def _is_compressible(response):
+    """Whether the response type and headers allow compressing it at all"""
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    if response.cache_control.no_transform:
+        return False
+    return response.mimetype in constants.COMPRESSIBLE_MIMETYPES
+
+
+def init_compression(app):
+    """
+    Register the compression hook.
+    Call after log_request_info so the logged duration includes compression.
+    """
+    app.config.setdefault(
+        'COMPRESSION_ENABLED',
+        os.getenv('COMPRESS', 'true').lower() == 'true'
+    )
+    app.config.setdefault(
+        'COMPRESSION_MIN_SIZE',
+        int(os.getenv('COMPRESS_MIN_SIZE', constants.COMPRESSION_MIN_SIZE))
+    )
+
+    @app.after_request
+    def compress_response(response):
+        from flask import request
+
+        if not app.config['COMPRESSION_ENABLED'] or request.method == 'HEAD':
+            return response
+        if not _is_compressible(response):
+            return response
+
+        streamed = response.is_streamed
+        if not streamed and response.calculate_content_length() < app.config['COMPRESSION_MIN_SIZE']:
+            return response
+
+        # From here on the body depends on Accept-Encoding, compressed or not
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if streamed:
+            body = response.response
+            response.response = _compressed_stream(
+                response.iter_encoded(), encoding, getattr(body, 'close', None)
+            )
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            compressed = compress_bytes(data, encoding)
+            if len(compressed) >= len(data):
+                return response
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
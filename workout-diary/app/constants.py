@@ -19,6 +19,96 @@ MAX_PAGE_SIZE = 100
 MAX_SETS_PER_EXERCISE = 100
 MAX_REPS_PER_SET = 1000
 MAX_WEIGHT_LBS = 10000
+MAX_EXERCISES_PER_SESSION = 50
+MAX_PROGRESSION_EXERCISES = 25  # Exercises per batch progression request
+REP_MAX_TABLE_REPS = 12  # Rep counts covered by the strength curve's rep-max table
+MAX_METRIC_BUCKETS = 1000  # Day/week/month buckets per ranged metrics request
+
+# Store identical consecutive sets as one Exercises row with a set count
+# (run coalesce_exercise_sets.py once to migrate existing one-row-per-set data)
+COMPACT_SET_STORAGE = True
+
+# Rest between sets: gaps between set completions longer than MAX_REST_SECONDS
+# per set are breaks, not rest. Daily summaries keep a histogram of rest
+# times in REST_BUCKET_SECONDS buckets for percentiles.
+MAX_REST_SECONDS = 600
+REST_BUCKET_SECONDS = 15
+
+# Training targets: weekly volume (lbs) per body part for a Maintenance goal at
+# Moderately Active, scaled by goal and activity level to seed TrainingTargets.
+# Body parts without an entry (Cardio, Flexibility) get no volume target.
+BASE_WEEKLY_VOLUME_TARGETS = {
+    'Chest': 10000,
+    'Back': 12000,
+    'Legs': 15000,
+    'Quads': 8000,
+    'Hamstrings': 6000,
+    'Glutes': 8000,
+    'Calves': 4000,
+    'Shoulders': 6000,
+    'Biceps': 3000,
+    'Triceps': 3000,
+    'Forearms': 2000,
+    'Abs': 2000,
+    'Core': 2000,
+    'Full Body': 6000,
+}
+GOAL_VOLUME_MULTIPLIERS = {
+    'Muscle Gain': 1.5,
+    'Maintenance': 1.0,
+    'Weight Loss': 0.8,
+    'Improved Endurance': 0.7,
+}
+ACTIVITY_VOLUME_MULTIPLIERS = {
+    'Sedentary': 0.6,
+    'Lightly Active': 0.8,
+    'Moderately Active': 1.0,
+    'Very Active': 1.2,
+    'Super Active': 1.4,
+}
+
+# Caching
+QUOTE_POOL_TTL_SECONDS = 600
+DASHBOARD_CACHE_SIZE = 512  # Cached dashboard contexts per worker
+CATALOG_CHECK_SECONDS = 60  # How often workers re-check the reference catalog version
+ANALYTICS_CACHE_SIZE = 64  # Loaded per-user training histories and prefix sums per worker (see analitics.py)
+GOAL_CACHE_SIZE = 512  # Cached weekly goal-achievement results per worker
+
+# Logging (queue mode, see logging_config.py)
+LOG_QUEUE_SIZE = 10000  # Records waiting for the listener before new ones are dropped
+LOG_BATCH_SIZE = 256  # Records written per listener batch (one flush per handler)
+LOG_STOP_TIMEOUT = 5  # Seconds stopping the listener waits for queue room, then for the thread
+REQUEST_LOG_SAMPLE_RATE = 0.1  # Share of fast successful requests logged in production
+REQUEST_LOG_SLOW_MS = 500  # Requests at least this slow are always logged
+
+# Response compression (see compression.py)
+COMPRESSION_MIN_SIZE = 1024  # Bytes; smaller bodies are sent as-is
+GZIP_LEVEL = 6  # zlib level for gzip responses
+BROTLI_QUALITY = 4  # Brotli quality for dynamic responses (0-11; higher is much slower)
+COMPRESSIBLE_MIMETYPES = (
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'image/svg+xml',
+)
+
+# Static assets (see build_static.py and static_assets.py)
+STATIC_HASH_LENGTH = 10  # Hex digits of the content hash in fingerprinted filenames
+STATIC_MAX_AGE_SECONDS = 365 * 24 * 3600  # Fingerprinted files never change, cache for a year
+STATIC_GZIP_LEVEL = 9  # Precompressed once at build time, so use the smallest output
+STATIC_BROTLI_QUALITY = 11
+
+# Production server (see server.py); each has an environment override
+WEB_WORKERS_PER_CPU = 2  # WEB_CONCURRENCY defaults to this many per CPU, plus one
+WEB_MAX_WORKERS = 8  # Cap for the CPU-based default (each worker holds its own caches)
+WEB_THREADS = 4  # WEB_THREADS: request threads per worker
+WEB_MAX_REQUESTS = 1000  # WEB_MAX_REQUESTS: recycle a worker after this many requests
+WEB_TIMEOUT = 30  # WEB_TIMEOUT: seconds before a silent worker is killed and replaced
+WEB_GRACEFUL_TIMEOUT = 30  # WEB_GRACEFUL_TIMEOUT: seconds to finish requests on SIGTERM
+WEB_KEEPALIVE = 5  # Seconds to hold idle keep-alive connections
 
 # NOTE: Database URI, JWT secrets, and API keys should be loaded from environment variables
 # See .env.example for required environment variables
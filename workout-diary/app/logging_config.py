@@ -6,12 +6,266 @@ This module sets up comprehensive logging with:
 - Console logging for development
 - Separate security audit log
 - Different log levels per environment
+- Optional queue-backed mode (LOG_QUEUE): request threads only enqueue
+  records, and one listener thread per process does the file I/O in batches
+- A sampled request log, in JSON with LOG_FORMAT=json (see log_request_info)
 """
 
+import atexit
+import hashlib
+import json
 import logging
+import random
 import os
-from logging.handlers import RotatingFileHandler
-from datetime import datetime
+import queue
+import threading
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from datetime import datetime, timezone
+
+from . import constants
+
+
+# ========================================
+# QUEUE-BACKED LOGGING
+# ========================================
+
+class LogQueueStats:
+    """Thread-safe counters for the log queue (per process)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.queued = 0
+            self.dropped = 0
+            self.written = 0
+            self.batches = 0
+            self.reported_dropped = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+
+_queue_counters = LogQueueStats()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger and message, plus the
+    structured `fields` a record was logged with (extra={'fields': {...}}).
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that leaves flushing to the queue listener, so a
+    batch of records costs one flush instead of one per record.
+    """
+
+    def flush(self):
+        # Called by StreamHandler.emit after every record; deliberately a no-op
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the logging thread: when the queue is
+    full the record is dropped and counted. Records are tagged with the
+    listener target (app or security) they are routed to.
+    """
+
+    def __init__(self, log_queue, target):
+        super().__init__(log_queue)
+        self.target = target
+
+    def enqueue(self, record):
+        record.log_target = self.target
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _queue_counters.add(dropped=1)
+        else:
+            _queue_counters.add(queued=1)
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    Single background thread draining the log queue: takes every record
+    waiting (up to LOG_BATCH_SIZE), routes each to its target's handlers,
+    then flushes each handler once per batch.
+    """
+
+    def __init__(self, log_queue, targets):
+        all_handlers = [h for handlers in targets.values() for h in handlers]
+        super().__init__(log_queue, *all_handlers, respect_handler_level=True)
+        self.targets = targets
+
+    def handle(self, record):
+        record = self.prepare(record)
+        for handler in self.targets.get(getattr(record, 'log_target', 'app'), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _flush_handlers(self):
+        for handler in self.handlers:
+            flush = getattr(handler, 'flush_batch', handler.flush)
+            try:
+                flush()
+            except (OSError, ValueError):
+                pass  # Stream closed underneath us, as logging.shutdown() tolerates too
+
+    def _report_drops(self):
+        """Log once per batch how many records were dropped since the last report"""
+        dropped = _queue_counters.dropped - _queue_counters.reported_dropped
+        if dropped > 0:
+            _queue_counters.add(reported_dropped=dropped)
+            self.handle(logging.makeLogRecord({
+                'name': 'logging_config',
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': f"Log queue full: dropped {dropped} records",
+                'log_target': 'app'
+            }))
+
+    def _discard_backlog(self):
+        """Drop every queued record (counted as dropped)"""
+        discarded = 0
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.queue.task_done()
+            discarded += 1
+        _queue_counters.add(dropped=discarded)
+
+    def stop(self):
+        """
+        Write out the queued records and stop the thread. QueueListener.stop
+        enqueues its sentinel with put_nowait, which raises queue.Full when
+        the queue is full at shutdown; this waits up to LOG_STOP_TIMEOUT for
+        room, and if the listener is stuck, discards the backlog to make room.
+        """
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(self._sentinel, timeout=constants.LOG_STOP_TIMEOUT)
+        except queue.Full:
+            self._discard_backlog()
+            try:
+                self.queue.put_nowait(self._sentinel)
+            except queue.Full:
+                pass  # Refilled at once; the daemon thread is abandoned below
+        self._thread.join(constants.LOG_STOP_TIMEOUT)
+        self._thread = None
+
+    def _monitor(self):
+        log_queue = self.queue
+        stopping = False
+        while not stopping:
+            batch = [self.dequeue(True)]
+            while len(batch) < constants.LOG_BATCH_SIZE:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            written = 0
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                    continue
+                self.handle(record)
+                written += 1
+            self._report_drops()
+            self._flush_handlers()
+            _queue_counters.add(written=written, batches=1)
+            for _ in batch:
+                log_queue.task_done()
+
+
+_queue_handlers = []
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _start_listener(targets):
+    """Start the process's log listener on a fresh queue, replacing any running one"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+        log_queue = queue.Queue(maxsize=constants.LOG_QUEUE_SIZE)
+        for handler in _queue_handlers:
+            handler.queue = log_queue
+        _listener = BatchingQueueListener(log_queue, targets)
+        _listener.start()
+
+
+def restart_log_listener():
+    """
+    Start a listener in a forked worker. Threads do not survive fork(), so
+    records would pile up in the inherited queue; the worker gets its own
+    queue, thread and counters instead. A lock some other master thread held
+    at fork time stays held in the child, so the counters and the listener
+    lock are replaced, never reset through the inherited locks.
+    """
+    global _listener, _listener_lock, _queue_counters
+    if _listener is None:
+        return
+    targets = _listener.targets
+    _listener = None  # The parent's thread is not ours to stop
+    _listener_lock = threading.Lock()
+    _queue_counters = LogQueueStats()
+    _start_listener(targets)
+
+
+def stop_log_listener():
+    """Write out every queued record and stop the listener (at exit and on worker shutdown)"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+        _listener = None
+
+
+def log_queue_stats():
+    """Return the log queue counters for logging or diagnostics"""
+    counters = _queue_counters
+    return {
+        'enabled': _listener is not None,
+        'queued': counters.queued,
+        'dropped': counters.dropped,
+        'written': counters.written,
+        'batches': counters.batches,
+        'pending': _listener.queue.qsize() if _listener is not None else 0,
+    }
+
+
+atexit.register(stop_log_listener)
 
 
 def setup_logging(app):
@@ -27,6 +281,17 @@ def setup_logging(app):
     # Get environment
     env = os.getenv('FLASK_ENV', 'development')
     
+    # Queue mode: handlers run on the listener thread, loggers only enqueue
+    use_queue = os.getenv('LOG_QUEUE', 'false' if env == 'testing' else 'true').lower() == 'true'
+    file_handler_class = BatchRotatingFileHandler if use_queue else RotatingFileHandler
+    app_handlers = []
+    security_handlers = []
+    request_handlers = []
+    
+    # File logs as JSON lines (LOG_FORMAT=json) or text; the console stays text
+    log_format = os.getenv('LOG_FORMAT', 'json' if env == 'production' else 'text').lower()
+    json_formatter = JsonFormatter() if log_format == 'json' else None
+    
     # Create logs directory if it doesn't exist
     logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
     if not os.path.exists(logs_dir):
@@ -62,14 +327,14 @@ def setup_logging(app):
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         console_handler.setFormatter(console_formatter)
-        app.logger.addHandler(console_handler)
+        app_handlers.append(console_handler)
     
     # ========================================
     # FILE HANDLER (All Environments)
     # ========================================
     # Main application log
     app_log_file = os.path.join(logs_dir, 'fitness_tracker.log')
-    file_handler = RotatingFileHandler(
+    file_handler = file_handler_class(
         app_log_file,
         maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=10
@@ -79,22 +344,22 @@ def setup_logging(app):
         '[%(asctime)s] %(levelname)s [%(name)s.%(funcName)s:%(lineno)d] %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    file_handler.setFormatter(file_formatter)
-    app.logger.addHandler(file_handler)
+    file_handler.setFormatter(json_formatter or file_formatter)
+    app_handlers.append(file_handler)
     
     # ========================================
     # ERROR LOG (Production)
     # ========================================
     if env == 'production':
         error_log_file = os.path.join(logs_dir, 'errors.log')
-        error_handler = RotatingFileHandler(
+        error_handler = file_handler_class(
             error_log_file,
             maxBytes=10 * 1024 * 1024,  # 10MB
             backupCount=20
         )
         error_handler.setLevel(logging.ERROR)
-        error_handler.setFormatter(file_formatter)
-        app.logger.addHandler(error_handler)
+        error_handler.setFormatter(json_formatter or file_formatter)
+        app_handlers.append(error_handler)
     
     # ========================================
     # SECURITY AUDIT LOG (Always Enabled)
@@ -104,7 +369,7 @@ def setup_logging(app):
     security_logger.handlers.clear()
     
     security_log_file = os.path.join(logs_dir, 'security_audit.log')
-    security_handler = RotatingFileHandler(
+    security_handler = file_handler_class(
         security_log_file,
         maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=50  # Keep more security logs
@@ -113,15 +378,59 @@ def setup_logging(app):
         '[%(asctime)s] SECURITY %(levelname)s: %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    security_handler.setFormatter(security_formatter)
-    security_logger.addHandler(security_handler)
+    security_handler.setFormatter(json_formatter or security_formatter)
+    security_handlers.append(security_handler)
     
     # Also log security events to console in development
     if env == 'development':
         security_console = logging.StreamHandler()
         security_console.setLevel(logging.INFO)
         security_console.setFormatter(security_formatter)
-        security_logger.addHandler(security_console)
+        security_handlers.append(security_console)
+    
+    # ========================================
+    # REQUEST LOG (sampled, see log_request_info)
+    # ========================================
+    request_logger = logging.getLogger('request_log')
+    request_logger.setLevel(logging.WARNING if env == 'testing' else logging.INFO)
+    request_logger.handlers.clear()
+    request_logger.propagate = False
+    
+    request_handler = file_handler_class(
+        os.path.join(logs_dir, 'requests.log'),
+        maxBytes=10 * 1024 * 1024,  # 10MB
+        backupCount=10
+    )
+    request_handler.setFormatter(json_formatter or logging.Formatter(
+        '[%(asctime)s] %(levelname)s %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    request_handlers.append(request_handler)
+    if env == 'development':
+        request_console = logging.StreamHandler()
+        request_console.setFormatter(logging.Formatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+        request_handlers.append(request_console)
+    
+    # ========================================
+    # ATTACH HANDLERS (directly, or through the log queue)
+    # ========================================
+    targets = {
+        'app': (app.logger, app_handlers),
+        'security': (security_logger, security_handlers),
+        'requests': (request_logger, request_handlers),
+    }
+    if use_queue:
+        _queue_handlers[:] = []
+        for target, (logger, _) in targets.items():
+            queue_handler = NonBlockingQueueHandler(None, target)
+            _queue_handlers.append(queue_handler)
+            logger.addHandler(queue_handler)
+        _start_listener({target: handlers for target, (_, handlers) in targets.items()})
+    else:
+        stop_log_listener()
+        for logger, handlers in targets.values():
+            for handler in handlers:
+                logger.addHandler(handler)
     
     # ========================================
     # STARTUP MESSAGE
@@ -131,43 +440,177 @@ def setup_logging(app):
     app.logger.info(f"Environment: {env}")
     app.logger.info(f"Log Level: {logging.getLevelName(log_level)}")
     app.logger.info(f"Logs Directory: {logs_dir}")
+    app.logger.info(f"Log Queue: {'enabled' if use_queue else 'disabled'}")
+    app.logger.info(f"Log Format: {log_format}")
     app.logger.info(f"=" * 60)
     
     return app.logger, security_logger
 
 
+_db_timing_registered = False
+
+
+def _register_db_timing():
+    """
+    Attach SQLAlchemy engine events that count statements and accumulate
+    DB time on flask.g for the current request. Registered once per
+    process on the Engine class, so it covers every engine/app instance.
+    """
+    global _db_timing_registered
+    if _db_timing_registered:
+        return
+
+    from time import perf_counter
+    from flask import g, has_request_context
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_times', []).append(perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get('query_start_times')
+        if not start_times:
+            return
+        elapsed = perf_counter() - start_times.pop()
+        if has_request_context() and hasattr(g, 'db_queries'):
+            g.db_queries += 1
+            g.db_time += elapsed
+
+    _db_timing_registered = True
+
+
+def _user_hash(app):
+    """
+    Short keyed hash of the logged-in user's ID, so request logs can be
+    correlated per user without recording the ID. Reads the user
+    flask-login already loaded for this request; never loads one.
+    """
+    from flask import g
+
+    user = g.get('_login_user')
+    user_id = getattr(user, 'user_id', None)
+    if user_id is None:
+        return None
+    key = str(app.config.get('SECRET_KEY') or '').encode()[:64]
+    return hashlib.blake2b(str(user_id).encode(), key=key, digest_size=8).hexdigest()
+
+
 def log_request_info(app):
     """
     Add request logging middleware.
-    Logs all incoming requests with timing information.
+    Times every request, counts SQL statements and DB time, and reports
+    the breakdown in a Server-Timing header (db, render excluding queries
+    run while rendering, and app = everything else) when
+    SERVER_TIMING_ENABLED is on. It is off by default in production, where
+    it would show every client query counts and timings.
+    
+    Completed requests go to the 'request_log' logger with structured
+    fields (route, method, status, duration, db time, user hash). Errors
+    (status >= 400) and requests slower than REQUEST_LOG_SLOW_MS are always
+    logged; other requests are sampled at REQUEST_LOG_SAMPLE_RATE, and
+    unsampled ones never build a log record.
     """
+    from flask import before_render_template, template_rendered
+
+    env = os.getenv('FLASK_ENV', 'development')
+    app.config.setdefault(
+        'SERVER_TIMING_ENABLED',
+        os.getenv('SERVER_TIMING', 'false' if env == 'production' else 'true').lower() == 'true'
+    )
+    app.config.setdefault(
+        'REQUEST_LOG_SAMPLE_RATE',
+        float(os.getenv('LOG_SAMPLE_RATE', constants.REQUEST_LOG_SAMPLE_RATE if env == 'production' else 1.0))
+    )
+    app.config.setdefault(
+        'REQUEST_LOG_SLOW_MS',
+        float(os.getenv('LOG_SLOW_MS', constants.REQUEST_LOG_SLOW_MS))
+    )
+    request_logger = logging.getLogger('request_log')
+    _register_db_timing()
+
     @app.before_request
     def before_request():
         from flask import request, g
-        from time import time
+        from time import perf_counter
         
-        g.start_time = time()
+        g.start_time = perf_counter()
+        g.db_queries = 0
+        g.db_time = 0.0
+        g.render_time = 0.0
         
-        # Log request details
-        app.logger.debug(
-            f"Request: {request.method} {request.path} "
-            f"from {request.remote_addr}"
-        )
+        # Log request details (arguments are only formatted if DEBUG is enabled)
+        if app.logger.isEnabledFor(logging.DEBUG):
+            app.logger.debug("Request: %s %s from %s", request.method, request.path, request.remote_addr)
+    
+    def render_started(sender, template, context, **extra):
+        from flask import g
+        from time import perf_counter
+        g.render_start = perf_counter()
+        g.render_db_start = g.get('db_time', 0.0)
+    
+    def render_finished(sender, template, context, **extra):
+        from flask import g
+        from time import perf_counter
+        if hasattr(g, 'render_start') and hasattr(g, 'render_time'):
+            # Queries run by the template (lazy loads) already count as db
+            render_db = g.get('db_time', 0.0) - g.render_db_start
+            g.render_time += max(perf_counter() - g.render_start - render_db, 0.0)
+    
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
     
     @app.after_request
     def after_request(response):
         from flask import request, g
-        from time import time
+        from time import perf_counter
         
         if hasattr(g, 'start_time'):
-            elapsed = time() - g.start_time
+            elapsed = perf_counter() - g.start_time
+            db_time = g.get('db_time', 0.0)
+            render_time = g.get('render_time', 0.0)
+            
+            # Errors and slow requests are always kept, the rest sampled
+            status = response.status_code
+            duration_ms = elapsed * 1000
+            if status >= 500:
+                level = logging.ERROR
+            elif status >= 400 or duration_ms >= app.config['REQUEST_LOG_SLOW_MS']:
+                level = logging.WARNING
+            elif random.random() < app.config['REQUEST_LOG_SAMPLE_RATE']:
+                level = logging.INFO
+            else:
+                level = None
+            
+            if level is not None and request_logger.isEnabledFor(level):
+                route = request.url_rule.rule if request.url_rule is not None else request.path
+                request_logger.log(
+                    level,
+                    "%s %s %s %.1fms (%d queries, %.1fms db)",
+                    request.method, route, status, duration_ms,
+                    g.get('db_queries', 0), db_time * 1000,
+                    extra={'fields': {
+                        'route': route,
+                        'method': request.method,
+                        'status': status,
+                        'duration_ms': round(duration_ms, 1),
+                        'db_ms': round(db_time * 1000, 1),
+                        'db_queries': g.get('db_queries', 0),
+                        'render_ms': round(render_time * 1000, 1),
+                        'user': _user_hash(app),
+                        'sample_rate': 1.0 if level > logging.INFO else app.config['REQUEST_LOG_SAMPLE_RATE'],
+                    }}
+                )
             
-            # Log response with timing
-            app.logger.info(
-                f"{request.method} {request.path} "
-                f"completed in {elapsed:.3f}s "
-                f"with status {response.status_code}"
-            )
+            if app.config.get('SERVER_TIMING_ENABLED'):
+                app_time = max(elapsed - db_time - render_time, 0.0)
+                response.headers['Server-Timing'] = (
+                    f'db;dur={db_time * 1000:.1f};desc="{g.get("db_queries", 0)} queries", '
+                    f'render;dur={render_time * 1000:.1f}, '
+                    f'app;dur={app_time * 1000:.1f}'
+                )
         
         return response
 
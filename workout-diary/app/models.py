@@ -1,11 +1,42 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+import struct
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from typing import List, Optional
+from sqlalchemy import func, case, insert, bindparam, text
 
 db = SQLAlchemy()
 
+
+def _upsert(model, values, key_columns, updates):
+    """
+    Insert a row, or update the existing row with the same key, in one
+    statement: ON DUPLICATE KEY UPDATE on MySQL/MariaDB, ON CONFLICT DO
+    UPDATE elsewhere (SQLite). Concurrent first writes cannot both find no
+    row and then collide on the INSERT. Does not commit.
+
+    Args:
+        model: mapped class to write
+        values: {column name: value} for a new row
+        key_columns: names of the unique key that identifies the row
+        updates: callable taking the proposed row (VALUES()/excluded) and
+            returning (column name, expression) pairs for an existing row,
+            applied in order (MySQL evaluates later ones against earlier results)
+    """
+    if db.session.get_bind().dialect.name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(model).values(**values)
+        stmt = stmt.on_duplicate_key_update(updates(stmt.inserted))
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(model).values(**values)
+        stmt = stmt.on_conflict_do_update(index_elements=key_columns, set_=dict(updates(stmt.excluded)))
+    return db.session.execute(stmt)
+
+
 class User(db.Model, UserMixin):
     __tablename__ = 'Users'
     user_id = db.Column(db.Integer, primary_key=True)
@@ -149,7 +180,7 @@ class Workout(db.Model):
     workout_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
-    workout_name = db.Column(db.String(50), nullable=False)
+    workout_name = db.Column(db.String(50))  # Optional, as in init_db.sql
     notes = db.Column(db.Text)
 
     # Relationship to User
@@ -178,44 +209,180 @@ class Workout(db.Model):
     @classmethod
     def calculate_consecutive_workout_days(cls, user_id):
         """Calculate the current workout streak (consecutive days with workouts)"""
-        from datetime import date, timedelta
-        
-        # Get all workout dates for the user, ordered by date descending
-        workouts = cls.query.filter(
-            cls.user_id == user_id
-        ).order_by(cls.date.desc()).all()
-        
-        if not workouts:
+        return WorkoutStreak.for_user(user_id).active_streak()
+
+
+class WorkoutStreak(db.Model):
+    """
+    Per-user streak state, kept current by rep_logger on every write.
+
+    current_streak is the length of the run of consecutive workout days
+    ending at last_workout_date; it only counts as active while that date
+    is today or yesterday (see active_streak). Anything the incremental
+    update cannot decide cheaply (back-filled days, deleted days) falls
+    back to recompute().
+    """
+    __tablename__ = 'WorkoutStreaks'
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), primary_key=True)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_workout_date = db.Column(db.Date)
+
+    def active_streak(self, today=None):
+        """Return the current streak, or 0 if it was broken before yesterday"""
+        from datetime import date
+        today = today or date.today()
+        if self.last_workout_date is None:
             return 0
-        
-        # Get unique dates (in case multiple workouts on same day)
-        workout_dates = sorted(set(w.date for w in workouts), reverse=True)
-        
-        # Check if the most recent workout was today or yesterday
-        today = date.today()
-        if workout_dates[0] > today:
-            # Future workout logged, start from there
-            current_date = workout_dates[0]
-        elif workout_dates[0] == today or workout_dates[0] == today - timedelta(days=1):
-            # Streak is active
-            current_date = today
-        else:
-            # Streak is broken (no workout today or yesterday)
+        if self.last_workout_date < today - timedelta(days=1):
             return 0
-        
-        # Count consecutive days
-        streak = 0
-        for workout_date in workout_dates:
-            if workout_date == current_date or workout_date == current_date - timedelta(days=1):
-                streak += 1
-                current_date = workout_date - timedelta(days=1)
-            else:
-                # Gap in streak
-                break
-        
-        return streak
+        return self.current_streak
+
+    @classmethod
+    def for_user(cls, user_id):
+        """
+        Return the user's streak state. A user without a stored row gets a
+        computed, unsaved one: reads never write, so concurrent first reads
+        cannot race on the insert. The row is stored by the next write
+        (record_day) or by rebuild_summaries.py.
+        """
+        state = db.session.get(cls, user_id)
+        if state is None:
+            current, longest, previous = cls._compute(user_id)
+            state = cls(
+                user_id=user_id,
+                current_streak=current,
+                longest_streak=longest,
+                last_workout_date=previous
+            )
+        return state
+
+    @classmethod
+    def record_day(cls, user_id, workout_date, new_day):
+        """
+        Update the streak for a set logged on workout_date. Does not commit.
+
+        Args:
+            user_id: ID of the user
+            workout_date: date the set was logged for
+            new_day: True if this is the user's first workout on that date
+        """
+        # Locked and read current, so concurrent writes update it in turn
+        state = cls.query.filter_by(user_id=user_id).with_for_update().populate_existing().one_or_none()
+        if state is None:
+            # First write since streaks were added: the user's bitmaps may
+            # predate it too, holding only the day just marked
+            return cls.recompute(user_id, rebuild_bitmaps=True)
+        if not new_day:
+            return state
+
+        last = state.last_workout_date
+        if last is None or workout_date > last + timedelta(days=1):
+            state.current_streak = 1
+            state.last_workout_date = workout_date
+        elif workout_date == last + timedelta(days=1):
+            state.current_streak += 1
+            state.last_workout_date = workout_date
+        else:
+            # Back-filled day: it may bridge an older gap
+            return cls.recompute(user_id)
+
+        state.longest_streak = max(state.longest_streak, state.current_streak)
+        return state
+
+    @classmethod
+    def _compute(cls, user_id, for_update=False):
+        """
+        Streak values from the user's training-day bitmaps (see TrainingDayBitmap).
+        With for_update the bitmaps are locked and read current (for writers).
+
+        Returns:
+            (int, int, date): (current streak, longest streak, last workout date)
+        """
+        from datetime import date
+        any_day = TrainingDayBitmap.ANY_BODY_PART
+        years = db.session.query(
+            func.min(TrainingDayBitmap.year),
+            func.max(TrainingDayBitmap.year)
+        ).filter(
+            TrainingDayBitmap.user_id == user_id,
+            TrainingDayBitmap.body_part_id == any_day
+        )
+        first_year, last_year = years.one()
+
+        current = longest = 0
+        previous = None
+        if first_year is not None:
+            start = date(first_year, 1, 1)
+            bits = TrainingDayBitmap.day_bits(
+                user_id, start, date(last_year, 12, 31), any_day, for_update=for_update
+            ).get(any_day, 0)
+            if bits:
+                last_index = bits.bit_length() - 1
+                previous = start + timedelta(days=last_index)
+                current = TrainingDayBitmap.run_ending_at(bits, last_index)
+                longest = TrainingDayBitmap.longest_run(bits)
+        return current, longest, previous
+
+    @classmethod
+    def recompute(cls, user_id, rebuild_bitmaps=False):
+        """
+        Rebuild and store one user's streak state. Does not commit.
+        The user's training-day bitmaps are rebuilt first when asked, or
+        when they have none (data logged before the bitmaps existed).
+        """
+        if rebuild_bitmaps or not db.session.query(
+            TrainingDayBitmap.query.filter_by(user_id=user_id).exists()
+        ).scalar():
+            TrainingDayBitmap.rebuild_user(user_id)
+        current, longest, previous = cls._compute(user_id, for_update=True)
+        values = dict(current_streak=current, longest_streak=longest, last_workout_date=previous)
+        # An upsert, so concurrent first writes cannot collide on the INSERT
+        _upsert(cls, dict(user_id=user_id, **values), ['user_id'],
+                lambda new: [(name, getattr(new, name)) for name in values])
+        return db.session.get(cls, user_id, populate_existing=True)
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """Recompute streak state for one or all users. Commits and returns the row count."""
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = [row.user_id for row in db.session.query(Workout.user_id).distinct()]
+        for uid in user_ids:
+            cls.recompute(uid)
+        db.session.commit()
+        return len(user_ids)
+
+
 
 
+class UserDataVersion(db.Model):
+    """
+    Per-user counter bumped by every write to a user's training data.
+
+    In-process caches key their entries by this version, so a write in any
+    worker invalidates cached results in all of them.
+    """
+    __tablename__ = 'UserDataVersions'
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def get(cls, user_id):
+        """Return the user's current data version (0 if never written)"""
+        version = db.session.query(cls.version).filter(cls.user_id == user_id).scalar()
+        return version or 0
+
+    @classmethod
+    def bump(cls, user_id):
+        """
+        Increment the user's data version in the current transaction. Does not commit.
+
+        A single upsert, so a user's first concurrent writes cannot both
+        find no row and then collide on the INSERT.
+        """
+        _upsert(cls, dict(user_id=user_id, version=1), ['user_id'], lambda new: [('version', cls.version + 1)])
 
 
 # Define the CustomExercise model
@@ -233,6 +400,17 @@ class CustomExercise(db.Model):
     # Relationship to Exercises
     exercises = db.relationship('Exercise', backref='custom_exercise', lazy=True)
 
+    @classmethod
+    def owned_ids(cls, user_id, custom_exercise_ids):
+        """Return which of the given custom exercise IDs belong to the user (one query)"""
+        custom_exercise_ids = set(custom_exercise_ids)
+        if not custom_exercise_ids:
+            return set()
+        return {row.custom_exercise_id for row in db.session.query(cls.custom_exercise_id).filter(
+            cls.user_id == user_id,
+            cls.custom_exercise_id.in_(custom_exercise_ids)
+        )}
+
 
 # Define the Exercise model
 class Exercise(db.Model):
@@ -248,6 +426,11 @@ class Exercise(db.Model):
     reps = db.Column(db.Integer, nullable=False)
     weight = db.Column(db.Float, nullable=False)
     date = db.Column(db.Date, nullable=False)
+    # When the row's latest set was completed (UTC), and the rest before its
+    # sets: rest_seconds in total across the rest_sets sets it is known for
+    completed_at = db.Column(db.DateTime, nullable=True)
+    rest_seconds = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rest_sets = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # Helper method to get the exercise name dynamically
     def get_exercise_name(self):
@@ -257,11 +440,339 @@ class Exercise(db.Model):
             return self.custom_exercise.exercise_name  # From CustomExercise
         return self.exercise_name or "Unknown"  # Fallback for legacy data
 
+    @staticmethod
+    def make_exercise_key(standard_exercise_id, custom_exercise_id):
+        """
+        Resolve a set's exercise to a single integer key.
+
+        Standard exercises keep their ID and custom exercises are negated so
+        the two ID spaces never collide. Legacy rows with neither return None.
+        """
+        if standard_exercise_id:
+            return int(standard_exercise_id)
+        if custom_exercise_id:
+            return -int(custom_exercise_id)
+        return None
+
+    @classmethod
+    def exercise_key_expr(cls):
+        """SQL counterpart of make_exercise_key for use in queries"""
+        return case(
+            (cls.standard_exercise_id.isnot(None), cls.standard_exercise_id),
+            else_=-cls.custom_exercise_id
+        )
+
+    @classmethod
+    def named_sets_query(cls):
+        """
+        Query set rows with body part and exercise names joined in, so
+        callers never touch the lazy relationships per row.
+        """
+        return db.session.query(
+            cls.exercise_id,
+            cls.workout_id,
+            cls.weight,
+            cls.reps,
+            cls.sets,
+            cls.date,
+            func.coalesce(BodyPart.body_part_name, "Unknown").label('body_part_name'),
+            func.coalesce(
+                StandardExercise.exercise_name,
+                CustomExercise.exercise_name,
+                cls.exercise_name,
+                "Unknown"
+            ).label('exercise_name')
+        ).outerjoin(
+            BodyPart, BodyPart.body_part_id == cls.body_part_id
+        ).outerjoin(
+            StandardExercise, StandardExercise.standard_exercise_id == cls.standard_exercise_id
+        ).outerjoin(
+            CustomExercise, CustomExercise.custom_exercise_id == cls.custom_exercise_id
+        )
+
+    @classmethod
+    def sets_for_workouts(cls, workout_ids):
+        """Return named set rows for a list of workouts in logging order"""
+        if not workout_ids:
+            return []
+        return cls.named_sets_query().filter(
+            cls.workout_id.in_(workout_ids)
+        ).order_by(cls.exercise_id).all()
+
+    @classmethod
+    def grouped_for_workouts(cls, workout_ids):
+        """
+        Group a list of workouts' sets by workout and body part, merging
+        rows with the same (exercise, weight, reps) into one entry.
+
+        Returns:
+            dict: {workout_id: {body_part_name: [entry, ...]}} where each
+            entry has key, exercise_name, weight, reps and sets
+        """
+        grouped = {workout_id: defaultdict(list) for workout_id in workout_ids}
+        entries = {}
+        for row in cls.sets_for_workouts(workout_ids):
+            exercise_key = (row.exercise_name, row.weight, row.reps)
+            lookup_key = (row.workout_id, row.body_part_name) + exercise_key
+            entry = entries.get(lookup_key)
+            if entry is None:
+                entry = {
+                    "key": exercise_key,
+                    "exercise_name": row.exercise_name,
+                    "weight": float(row.weight),
+                    "reps": row.reps,
+                    "sets": row.sets,
+                }
+                entries[lookup_key] = entry
+                grouped[row.workout_id][row.body_part_name].append(entry)
+            else:
+                entry["sets"] += row.sets
+        return grouped
+
+    @classmethod
+    def bulk_insert(cls, rows):
+        """
+        Insert many set rows with a single multi-row INSERT. Does not commit.
+
+        Where the database supports it the IDs come back from RETURNING,
+        sorted into the order of rows (SQLAlchemy batches the rows where it
+        can guarantee that order and sends them one by one where it cannot,
+        as on SQLite). MySQL has no RETURNING; see _inserted_ids.
+
+        Args:
+            rows: list of dicts of Exercise column values
+
+        Returns:
+            list: the new exercise_ids, in the order of rows
+        """
+        if not rows:
+            return []
+
+        dialect = db.session.get_bind().dialect
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            result = db.session.execute(
+                insert(cls).returning(cls.exercise_id, sort_by_parameter_order=True), rows
+            )
+            return list(result.scalars())
+
+        result = db.session.execute(insert(cls).values(rows))
+        return cls._inserted_ids(result, rows)
+
+    @classmethod
+    def _inserted_ids(cls, result, rows):
+        """
+        IDs of a multi-row INSERT without RETURNING (MySQL).
+
+        The rows get increasing IDs starting at LAST_INSERT_ID(). With
+        innodb_autoinc_lock_mode 0 or 1 they are consecutive; with 2
+        (interleaved, the MySQL 8 default) concurrent inserts may take IDs
+        in between, so they are read back by workout and ID in the same
+        transaction, whose consistent read does not see other
+        transactions' uncommitted rows.
+        """
+        count = len(rows)
+        if db.session.get_bind().dialect.name in ('mysql', 'mariadb'):
+            first_id = result.lastrowid
+        else:
+            first_id = result.lastrowid - count + 1  # SQLite reports the last row's ID
+
+        if cls._autoinc_lock_mode() <= 1:
+            return list(range(first_id, first_id + count))
+
+        ids = [exercise_id for exercise_id, in db.session.query(cls.exercise_id).filter(
+            cls.workout_id.in_({row['workout_id'] for row in rows}),
+            cls.exercise_id >= first_id
+        ).order_by(cls.exercise_id).limit(count + 1)]
+        if len(ids) != count:
+            raise RuntimeError(f"Inserted {count} set rows but read back {len(ids)} IDs")
+        return ids
+
+    _autoinc_lock_modes = {}
+
+    @classmethod
+    def _autoinc_lock_mode(cls):
+        """The server's innodb_autoinc_lock_mode (cached per engine); 2 if not MySQL"""
+        engine = db.session.get_bind()
+        if engine.url not in cls._autoinc_lock_modes:
+            mode = 2
+            if engine.dialect.name in ('mysql', 'mariadb'):
+                mode = int(db.session.execute(text('SELECT @@innodb_autoinc_lock_mode')).scalar())
+            cls._autoinc_lock_modes[engine.url] = mode
+        return cls._autoinc_lock_modes[engine.url]
+
+    @classmethod
+    def rest_before(cls, workout_id, completed_at, count):
+        """
+        Rest before `count` sets completed at completed_at, measured from
+        the workout's previous set completion and split evenly across the
+        sets. Gaps longer than MAX_REST_SECONDS per set are breaks.
+
+        Returns:
+            (int, int): (total rest seconds, number of sets it covers),
+            (0, 0) if unknown
+        """
+        from . import constants
+
+        if completed_at is None:
+            return 0, 0
+        previous = db.session.query(func.max(cls.completed_at)).filter(
+            cls.workout_id == workout_id
+        ).scalar()
+        if previous is None:
+            return 0, 0
+        elapsed = (completed_at - previous).total_seconds()
+        if elapsed <= 0 or elapsed > constants.MAX_REST_SECONDS * count:
+            return 0, 0
+        return round(elapsed), count
+
+    @classmethod
+    def append_sets(cls, workout_id, user_id, body_part_id, standard_exercise_id,
+                    custom_exercise_id, weight, reps, count, set_date,
+                    completed_at=None, rest_seconds=0, rest_sets=0):
+        """
+        Store `count` identical sets for a workout. Does not commit.
+
+        With COMPACT_SET_STORAGE the sets become one row with sets=count,
+        and if the workout's latest row is the same exercise, weight and
+        reps its set count (and rest totals) are bumped instead. Otherwise
+        one row is written per set, as before.
+
+        Returns:
+            list: the rows written or updated
+        """
+        from . import constants
+
+        values = dict(
+            workout_id=workout_id,
+            user_id=user_id,
+            body_part_id=body_part_id,
+            standard_exercise_id=standard_exercise_id,
+            custom_exercise_id=custom_exercise_id,
+            reps=reps,
+            weight=weight,
+            date=set_date,
+            completed_at=completed_at
+        )
+        if not constants.COMPACT_SET_STORAGE:
+            # Rest is spread evenly, so each single-set row gets its share
+            rows = [cls(
+                sets=1,
+                rest_seconds=round(rest_seconds / rest_sets) if rest_sets else 0,
+                rest_sets=1 if rest_sets else 0,
+                **values
+            ) for _ in range(count)]
+            db.session.add_all(rows)
+            return rows
+
+        last = cls.query.filter_by(workout_id=workout_id).order_by(cls.exercise_id.desc()).first()
+        if last is not None and cls._group_key(last) == cls._group_key_from(values):
+            updates = {
+                cls.sets: cls.sets + count,
+                cls.rest_seconds: cls.rest_seconds + rest_seconds,
+                cls.rest_sets: cls.rest_sets + rest_sets
+            }
+            if completed_at is not None:
+                updates[cls.completed_at] = completed_at
+            cls.query.filter_by(exercise_id=last.exercise_id).update(
+                updates, synchronize_session=False
+            )
+            db.session.refresh(last)
+            return [last]
+
+        row = cls(sets=count, rest_seconds=rest_seconds, rest_sets=rest_sets, **values)
+        db.session.add(row)
+        return [row]
+
+    @classmethod
+    def remove_sets(cls, lift, count=1):
+        """
+        Remove `count` sets from a stored set group. Does not commit.
+
+        The decrement is a single conditional UPDATE so concurrent deletes
+        of the same group stay consistent.
+
+        Returns:
+            bool: True if the whole row was deleted
+        """
+        updated = cls.query.filter(
+            cls.exercise_id == lift.exercise_id,
+            cls.sets > count
+        ).update({cls.sets: cls.sets - count}, synchronize_session=False)
+        if updated:
+            return False
+        db.session.delete(lift)
+        db.session.flush()
+        return True
+
+    @staticmethod
+    def _group_key(row):
+        return (row.body_part_id, row.standard_exercise_id, row.custom_exercise_id,
+                row.exercise_name, row.weight, row.reps)
+
+    @staticmethod
+    def _group_key_from(values):
+        return (values.get('body_part_id'), values.get('standard_exercise_id'),
+                values.get('custom_exercise_id'), values.get('exercise_name'),
+                values.get('weight'), values.get('reps'))
+
+    @classmethod
+    def coalesce_sets(cls, user_id=None, batch_size=1000):
+        """
+        Migrate one-row-per-set data to compact storage: runs of consecutive
+        identical rows within a workout collapse into the first row, whose
+        set count becomes the run total. Commits once per user.
+
+        Returns:
+            (int, int): (rows updated, rows deleted)
+        """
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = [row.user_id for row in db.session.query(cls.user_id).distinct()]
+
+        updated_total = deleted_total = 0
+        for uid in user_ids:
+            rows = db.session.query(
+                cls.exercise_id, cls.workout_id, cls.body_part_id, cls.standard_exercise_id,
+                cls.custom_exercise_id, cls.exercise_name, cls.weight, cls.reps, cls.sets
+            ).filter(cls.user_id == uid).order_by(cls.workout_id, cls.exercise_id).all()
+
+            updates, deletes = [], []
+            head = None  # [exercise_id, workout_id, group key, total sets, original sets]
+            for row in rows + [None]:
+                key = cls._group_key(row) if row is not None else None
+                if row is not None and head is not None and head[1] == row.workout_id and head[2] == key:
+                    head[3] += row.sets
+                    deletes.append(row.exercise_id)
+                    continue
+                if head is not None and head[3] != head[4]:
+                    updates.append({'row_id': head[0], 'new_sets': head[3]})
+                if row is not None:
+                    head = [row.exercise_id, row.workout_id, key, row.sets, row.sets]
+
+            if updates:
+                db.session.execute(
+                    cls.__table__.update().where(
+                        cls.__table__.c.exercise_id == bindparam('row_id')
+                    ).values(sets=bindparam('new_sets')),
+                    updates
+                )
+            for start in range(0, len(deletes), batch_size):
+                cls.query.filter(
+                    cls.exercise_id.in_(deletes[start:start + batch_size])
+                ).delete(synchronize_session=False)
+            db.session.commit()
+
+            updated_total += len(updates)
+            deleted_total += len(deletes)
+
+        return updated_total, deleted_total
+
     # Keep existing class methods
     @classmethod
     def get_total_weight_lifted(cls, workout_ids):
         """Calculate the total weight lifted for a list of workouts"""
-        total_weight = db.session.query(func.sum(cls.weight)).filter(
+        total_weight = db.session.query(func.sum(cls.weight * cls.sets)).filter(
             cls.workout_id.in_(workout_ids)
         ).scalar() or 0
         return total_weight
@@ -269,31 +780,16 @@ class Exercise(db.Model):
     @classmethod
     def get_total_reps(cls, workout_ids):
         """Calculate the total reps performed for a list of workouts"""
-        total_reps = db.session.query(func.sum(cls.reps)).filter(
+        total_reps = db.session.query(func.sum(cls.reps * cls.sets)).filter(
             cls.workout_id.in_(workout_ids)
         ).scalar() or 0
         return total_reps
     
     @classmethod
     def get_volume_per_body_part_per_week(cls, user_id):
-        start_of_week = datetime.now() - timedelta(days=datetime.now().weekday())
-        end_of_week = start_of_week + timedelta(days=6)
-
-        # Query to get the total volume per body part for the current week
-        volume_per_body_part = db.session.query(
-            BodyPart.body_part_name,
-            func.sum(cls.sets * cls.reps * cls.weight).label('total_volume')
-        ).join(
-            BodyPart, BodyPart.body_part_id == cls.body_part_id
-        ).filter(
-            cls.user_id == user_id,
-            cls.date >= start_of_week.date(),
-            cls.date <= end_of_week.date()
-        ).group_by(
-            BodyPart.body_part_name
-        ).all()
-
-        return volume_per_body_part
+        # Total volume per body part for the current week, from the weekly rollup
+        today = datetime.now().date()
+        return WeeklyVolume.body_part_totals(user_id, today, today)
 
 
 
@@ -327,6 +823,1005 @@ class StandardExercise(db.Model):
                               lazy=True)
 
 
+class PersonalRecord(db.Model):
+    """
+    Best weight per user and resolved exercise.
+
+    Maintained on write by rep_logger (record_set on logging, refresh on
+    delete) so the dashboard never scans set history for PRs. Rebuild from
+    existing data with rebuild_summaries.py.
+    """
+    __tablename__ = 'PersonalRecords'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'exercise_key', name='unique_user_exercise'),
+        db.Index('idx_user_date', 'user_id', 'date'),
+    )
+
+    personal_record_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=False)
+    exercise_key = db.Column(db.Integer, nullable=False)  # See Exercise.make_exercise_key
+    standard_exercise_id = db.Column(db.Integer, db.ForeignKey('StandardExercises.standard_exercise_id'), nullable=True)
+    custom_exercise_id = db.Column(db.Integer, db.ForeignKey('CustomExercises.custom_exercise_id'), nullable=True)
+    weight = db.Column(db.Float, nullable=False)
+    reps = db.Column(db.Integer, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+
+    @classmethod
+    def named_query(cls, user_id):
+        """Query a user's records with the exercise name joined in"""
+        return db.session.query(
+            cls.weight,
+            cls.reps,
+            cls.date,
+            func.coalesce(
+                StandardExercise.exercise_name,
+                CustomExercise.exercise_name,
+                "Unknown"
+            ).label('exercise_name')
+        ).outerjoin(
+            StandardExercise, StandardExercise.standard_exercise_id == cls.standard_exercise_id
+        ).outerjoin(
+            CustomExercise, CustomExercise.custom_exercise_id == cls.custom_exercise_id
+        ).filter(cls.user_id == user_id)
+
+    @classmethod
+    def record_set(cls, user_id, standard_exercise_id, custom_exercise_id, weight, reps, set_date):
+        """
+        Update the record for a newly logged set. Does not commit.
+
+        One upsert that keeps the greater weight, so concurrent first sets
+        of an exercise cannot collide on the unique key. Ties keep the
+        earliest date, so re-hitting a PR does not move it.
+        """
+        key = Exercise.make_exercise_key(standard_exercise_id, custom_exercise_id)
+        if key is None:
+            return
+
+        def better(new):
+            # Reps and date go first: MySQL applies the assignments in order,
+            # and the comparison must see the old weight
+            improved = (new.weight > cls.weight) | ((new.weight == cls.weight) & (new.date < cls.date))
+            return [
+                ('reps', case((improved, new.reps), else_=cls.reps)),
+                ('date', case((improved, new.date), else_=cls.date)),
+                ('weight', case((new.weight > cls.weight, new.weight), else_=cls.weight)),
+            ]
+
+        _upsert(cls, dict(
+            user_id=user_id,
+            exercise_key=key,
+            standard_exercise_id=standard_exercise_id or None,
+            custom_exercise_id=custom_exercise_id or None,
+            weight=weight,
+            reps=reps,
+            date=set_date
+        ), ['user_id', 'exercise_key'], better)
+
+    @classmethod
+    def refresh(cls, user_id, standard_exercise_id, custom_exercise_id, removed_weight=None):
+        """
+        Recompute one record from set history after a delete. Does not commit.
+
+        Callers must flush the delete first so the removed set is excluded.
+        When removed_weight is below the current record the history scan is
+        skipped, since the record cannot have changed.
+        """
+        key = Exercise.make_exercise_key(standard_exercise_id, custom_exercise_id)
+        if key is None:
+            return None
+
+        record = cls.query.filter_by(user_id=user_id, exercise_key=key).first()
+        if record is not None and removed_weight is not None and removed_weight < record.weight:
+            return record
+
+        best = db.session.query(Exercise.weight, Exercise.reps, Exercise.date).filter(
+            Exercise.user_id == user_id,
+            Exercise.exercise_key_expr() == key
+        ).order_by(Exercise.weight.desc(), Exercise.date).first()
+
+        if best is None:
+            if record is not None:
+                db.session.delete(record)
+            return None
+
+        if record is None:
+            record = cls(
+                user_id=user_id,
+                exercise_key=key,
+                standard_exercise_id=standard_exercise_id or None,
+                custom_exercise_id=custom_exercise_id or None
+            )
+            db.session.add(record)
+        record.weight = best.weight
+        record.reps = best.reps
+        record.date = best.date
+        return record
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """
+        Rebuild records from the Exercises table (all users by default).
+        Commits and returns the number of records written.
+        """
+        query = db.session.query(
+            Exercise.user_id,
+            Exercise.standard_exercise_id,
+            Exercise.custom_exercise_id,
+            Exercise.weight,
+            Exercise.reps,
+            Exercise.date
+        ).filter(
+            (Exercise.standard_exercise_id.isnot(None)) | (Exercise.custom_exercise_id.isnot(None))
+        )
+        delete_query = cls.query
+        if user_id is not None:
+            query = query.filter(Exercise.user_id == user_id)
+            delete_query = delete_query.filter_by(user_id=user_id)
+
+        # Heaviest first, earliest date first on ties: the first row seen
+        # per (user, exercise) is the record
+        best = {}
+        for row in query.order_by(Exercise.weight.desc(), Exercise.date).yield_per(1000):
+            key = (row.user_id, Exercise.make_exercise_key(row.standard_exercise_id, row.custom_exercise_id))
+            if key not in best:
+                best[key] = row
+
+        delete_query.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(cls, [{
+            'user_id': user,
+            'exercise_key': key,
+            'standard_exercise_id': row.standard_exercise_id,
+            'custom_exercise_id': row.custom_exercise_id if not row.standard_exercise_id else None,
+            'weight': row.weight,
+            'reps': row.reps,
+            'date': row.date
+        } for (user, key), row in best.items()])
+        db.session.commit()
+        return len(best)
+
+
+class WeeklyVolume(db.Model):
+    """
+    Training totals per user, ISO week and body part.
+
+    Maintained on write by rep_logger (add on logging, subtract on delete)
+    so weekly volume charts read a few pre-aggregated rows instead of
+    scanning set history. Rebuild from existing data with
+    rebuild_summaries.py.
+    """
+    __tablename__ = 'WeeklyVolumes'
+    __table_args__ = (
+        db.Index('idx_user_week_start', 'user_id', 'week_start'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), primary_key=True)
+    iso_year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    iso_week = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    body_part_id = db.Column(db.Integer, db.ForeignKey('BodyParts.body_part_id'), primary_key=True)
+    week_start = db.Column(db.Date, nullable=False)  # Monday of the ISO week, for date ranges
+    volume = db.Column(db.Float, nullable=False, default=0)
+    set_count = db.Column(db.Integer, nullable=False, default=0)
+    rep_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def week_start_of(day):
+        """Return the Monday of a date's ISO week"""
+        return day - timedelta(days=day.weekday())
+
+    @classmethod
+    def add(cls, user_id, body_part_id, set_date, weight, reps, sets):
+        """
+        Add `sets` sets of weight x reps to their week. Does not commit.
+
+        Pass a negative `sets` to subtract removed sets; a week that drops
+        to zero sets is deleted. Rows without a body part are not tracked.
+        """
+        cls._apply(user_id, body_part_id, set_date, weight * reps * sets, sets, reps * sets)
+
+    @classmethod
+    def add_rows(cls, rows):
+        """Add a batch of Exercises row mappings (see Exercise.bulk_insert). Does not commit."""
+        totals = defaultdict(lambda: [0.0, 0, 0])
+        for row in rows:
+            key = (row['user_id'], row['body_part_id'], row['date'])
+            totals[key][0] += row['weight'] * row['reps'] * row['sets']
+            totals[key][1] += row['sets']
+            totals[key][2] += row['reps'] * row['sets']
+
+        for (user_id, body_part_id, set_date), (volume, sets, reps) in totals.items():
+            cls._apply(user_id, body_part_id, set_date, volume, sets, reps)
+
+    @classmethod
+    def _apply(cls, user_id, body_part_id, set_date, volume, sets, reps):
+        """Upsert a delta of volume, sets and reps into a week's row (one statement)"""
+        if body_part_id is None or not sets:
+            return
+
+        iso_year, iso_week, _ = set_date.isocalendar()
+        key = dict(user_id=user_id, iso_year=iso_year, iso_week=iso_week, body_part_id=body_part_id)
+        _upsert(cls, dict(
+            week_start=cls.week_start_of(set_date),
+            volume=volume,
+            set_count=sets,
+            rep_count=reps,
+            **key
+        ), list(key), lambda new: [
+            ('volume', cls.volume + new.volume),
+            ('set_count', cls.set_count + new.set_count),
+            ('rep_count', cls.rep_count + new.rep_count)
+        ])
+
+        if sets < 0:
+            cls.query.filter_by(**key).filter(cls.set_count <= 0).delete(synchronize_session=False)
+
+    @classmethod
+    def weekly_totals(cls, user_id, since):
+        """Total volume, sets and reps per ISO week from `since`'s week on, oldest first"""
+        return db.session.query(
+            cls.iso_year,
+            cls.iso_week,
+            func.sum(cls.volume).label('total_volume'),
+            func.sum(cls.set_count).label('total_sets'),
+            func.sum(cls.rep_count).label('total_reps')
+        ).filter(
+            cls.user_id == user_id,
+            cls.week_start >= cls.week_start_of(since)
+        ).group_by(
+            cls.iso_year,
+            cls.iso_week
+        ).order_by(
+            cls.iso_year,
+            cls.iso_week
+        ).all()
+
+    @classmethod
+    def body_part_totals(cls, user_id, start_date, end_date):
+        """Total volume per body part name over the ISO weeks spanning a date range"""
+        return db.session.query(
+            BodyPart.body_part_name,
+            func.sum(cls.volume).label('total_volume')
+        ).join(
+            BodyPart, BodyPart.body_part_id == cls.body_part_id
+        ).filter(
+            cls.user_id == user_id,
+            cls.week_start.between(cls.week_start_of(start_date), cls.week_start_of(end_date))
+        ).group_by(
+            BodyPart.body_part_name
+        ).all()
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """
+        Rebuild weekly totals from the Exercises table (all users by default).
+        Commits and returns the number of rows written.
+        """
+        # Group by day in SQL (index-friendly and portable), fold days into
+        # ISO weeks here
+        query = db.session.query(
+            Exercise.user_id,
+            Exercise.body_part_id,
+            Exercise.date,
+            func.sum(Exercise.weight * Exercise.reps * Exercise.sets).label('volume'),
+            func.sum(Exercise.sets).label('sets'),
+            func.sum(Exercise.reps * Exercise.sets).label('reps')
+        ).filter(
+            Exercise.body_part_id.isnot(None)
+        ).group_by(
+            Exercise.user_id,
+            Exercise.body_part_id,
+            Exercise.date
+        )
+        delete_query = cls.query
+        if user_id is not None:
+            query = query.filter(Exercise.user_id == user_id)
+            delete_query = delete_query.filter_by(user_id=user_id)
+
+        weeks = {}
+        for row in query.yield_per(1000):
+            iso_year, iso_week, _ = row.date.isocalendar()
+            key = (row.user_id, iso_year, iso_week, row.body_part_id)
+            week = weeks.get(key)
+            if week is None:
+                week = weeks[key] = {
+                    'user_id': row.user_id,
+                    'iso_year': iso_year,
+                    'iso_week': iso_week,
+                    'body_part_id': row.body_part_id,
+                    'week_start': cls.week_start_of(row.date),
+                    'volume': 0.0,
+                    'set_count': 0,
+                    'rep_count': 0
+                }
+            week['volume'] += float(row.volume or 0)
+            week['set_count'] += int(row.sets or 0)
+            week['rep_count'] += int(row.reps or 0)
+
+        delete_query.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(cls, list(weeks.values()))
+        db.session.commit()
+        return len(weeks)
+
+
+class TrainingTarget(db.Model):
+    """
+    Weekly volume target per user and body part.
+
+    Seeded from the user's fitness goal and activity level (see the
+    training target constants): a user without rows reads the seeded
+    defaults, and rows are stored on the first explicit change or when the
+    goal or activity level changes (re-seeding). Targets the user sets
+    explicitly (is_custom) survive re-seeding.
+    """
+    __tablename__ = 'TrainingTargets'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), primary_key=True)
+    body_part_id = db.Column(db.Integer, db.ForeignKey('BodyParts.body_part_id'), primary_key=True)
+    weekly_volume = db.Column(db.Float, nullable=False)
+    is_custom = db.Column(db.Boolean, nullable=False, default=False)
+
+    @staticmethod
+    def seeded_volumes(fitness_goal, activity_level):
+        """Return {body_part_name: weekly volume} for a goal and activity level"""
+        from . import constants
+
+        scale = (
+            constants.GOAL_VOLUME_MULTIPLIERS.get(fitness_goal, 1.0)
+            * constants.ACTIVITY_VOLUME_MULTIPLIERS.get(activity_level, 1.0)
+        )
+        return {
+            body_part: round(volume * scale, -2)
+            for body_part, volume in constants.BASE_WEEKLY_VOLUME_TARGETS.items()
+        }
+
+    @classmethod
+    def _seeded_targets(cls, user):
+        """Return {body_part_id: weekly volume} seeded from the user's profile"""
+        volumes = cls.seeded_volumes(user.fitness_goal, user.activity_level)
+        body_parts = db.session.query(BodyPart.body_part_id, BodyPart.body_part_name).filter(
+            BodyPart.body_part_name.in_(list(volumes))
+        )
+        return {body_part.body_part_id: volumes[body_part.body_part_name] for body_part in body_parts}
+
+    @classmethod
+    def seed(cls, user):
+        """(Re)seed the user's non-custom targets from their profile. Does not commit."""
+        existing = {target.body_part_id: target for target in cls.query.filter_by(user_id=user.user_id)}
+
+        for body_part_id, weekly_volume in cls._seeded_targets(user).items():
+            target = existing.get(body_part_id)
+            if target is None:
+                db.session.add(cls(
+                    user_id=user.user_id,
+                    body_part_id=body_part_id,
+                    weekly_volume=weekly_volume
+                ))
+            elif not target.is_custom:
+                target.weekly_volume = weekly_volume
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Return {body_part_id: weekly volume}. Users without stored targets
+        get the seeded defaults, computed but not stored, so reads never write.
+        """
+        targets = db.session.query(cls.body_part_id, cls.weekly_volume).filter(
+            cls.user_id == user.user_id
+        ).all()
+        if not targets:
+            return cls._seeded_targets(user)
+        return dict(targets)
+
+    @classmethod
+    def set_custom(cls, user, volumes):
+        """
+        Set explicit targets from {body_part_id: weekly volume}. Does not commit.
+        A volume of None clears the body part's target. The seeded defaults
+        are stored first if the user has no targets yet, so the ones not
+        being changed are kept.
+        """
+        user_id = user.user_id
+        if not cls.query.filter_by(user_id=user_id).first():
+            cls.seed(user)
+            db.session.flush()
+        existing = {target.body_part_id: target for target in cls.query.filter_by(user_id=user_id)}
+        for body_part_id, weekly_volume in volumes.items():
+            target = existing.get(body_part_id)
+            if weekly_volume is None:
+                if target is not None:
+                    db.session.delete(target)
+            elif target is None:
+                db.session.add(cls(
+                    user_id=user_id,
+                    body_part_id=body_part_id,
+                    weekly_volume=weekly_volume,
+                    is_custom=True
+                ))
+            else:
+                target.weekly_volume = weekly_volume
+                target.is_custom = True
+
+    @classmethod
+    def weekly_achievement(cls, user, day):
+        """
+        Percent of target reached in a day's ISO week for every targeted
+        body part, in one pass over that week's WeeklyVolume rows.
+
+        Returns:
+            dict: {body_part_id: (volume, target, percent)}
+        """
+        targets = cls.for_user(user)
+        iso_year, iso_week, _ = day.isocalendar()
+        volumes = dict(db.session.query(WeeklyVolume.body_part_id, WeeklyVolume.volume).filter(
+            WeeklyVolume.user_id == user.user_id,
+            WeeklyVolume.iso_year == iso_year,
+            WeeklyVolume.iso_week == iso_week
+        ).all())
+
+        return {
+            body_part_id: (
+                volumes.get(body_part_id, 0.0),
+                target,
+                volumes.get(body_part_id, 0.0) / target * 100 if target else 0.0
+            )
+            for body_part_id, target in targets.items()
+        }
+
+
+class DailyExerciseSummary(db.Model):
+    """
+    Per-day totals for each user and resolved exercise: max weight, total
+    volume, best estimated 1RM and set count.
+
+    Maintained on write by rep_logger (record_sets on logging, refresh_day
+    on delete) so progression charts read one row per training day instead
+    of every set. Rebuild from existing data with rebuild_summaries.py.
+    """
+    __tablename__ = 'DailyExerciseSummaries'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), primary_key=True)
+    exercise_key = db.Column(db.Integer, primary_key=True, autoincrement=False)  # See Exercise.make_exercise_key
+    date = db.Column(db.Date, primary_key=True)
+    standard_exercise_id = db.Column(db.Integer, db.ForeignKey('StandardExercises.standard_exercise_id'), nullable=True)
+    custom_exercise_id = db.Column(db.Integer, db.ForeignKey('CustomExercises.custom_exercise_id'), nullable=True)
+    max_weight = db.Column(db.Float, nullable=False)
+    total_volume = db.Column(db.Float, nullable=False, default=0)
+    best_e1rm = db.Column(db.Float, nullable=False)
+    set_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def estimate_1rm(weight, reps):
+        """Epley estimated one-rep max; a single rep is its own max"""
+        if reps <= 1:
+            return float(weight)
+        return weight * (1 + reps / 30.0)
+
+    @staticmethod
+    def estimate_1rm_expr(weight, reps):
+        """SQL counterpart of estimate_1rm for use in queries"""
+        return case(
+            (reps <= 1, weight),
+            else_=weight * (1 + reps / 30.0)
+        )
+
+    @classmethod
+    def record_sets(cls, user_id, standard_exercise_id, custom_exercise_id, set_date, weight, reps, sets):
+        """Fold newly logged sets into their day's row. Does not commit."""
+        cls._merge(
+            user_id, standard_exercise_id, custom_exercise_id, set_date,
+            weight, weight * reps * sets, cls.estimate_1rm(weight, reps), sets
+        )
+
+    @classmethod
+    def record_rows(cls, rows):
+        """Fold a batch of Exercises row mappings (see Exercise.bulk_insert). Does not commit."""
+        days = {}
+        for row in rows:
+            key = (row['user_id'], row['standard_exercise_id'], row['custom_exercise_id'], row['date'])
+            e1rm = cls.estimate_1rm(row['weight'], row['reps'])
+            volume = row['weight'] * row['reps'] * row['sets']
+            if key not in days:
+                days[key] = [row['weight'], volume, e1rm, row['sets']]
+            else:
+                day = days[key]
+                day[0] = max(day[0], row['weight'])
+                day[1] += volume
+                day[2] = max(day[2], e1rm)
+                day[3] += row['sets']
+
+        for (user_id, standard_exercise_id, custom_exercise_id, set_date), day in days.items():
+            cls._merge(user_id, standard_exercise_id, custom_exercise_id, set_date, *day)
+
+    @classmethod
+    def _merge(cls, user_id, standard_exercise_id, custom_exercise_id, set_date,
+               max_weight, volume, e1rm, sets):
+        """Upsert one day's totals in one statement, keeping the larger max weight and e1RM"""
+        key = Exercise.make_exercise_key(standard_exercise_id, custom_exercise_id)
+        if key is None:
+            return
+
+        _upsert(cls, dict(
+            user_id=user_id,
+            exercise_key=key,
+            date=set_date,
+            standard_exercise_id=standard_exercise_id or None,
+            custom_exercise_id=None if standard_exercise_id else custom_exercise_id,
+            max_weight=max_weight,
+            total_volume=volume,
+            best_e1rm=e1rm,
+            set_count=sets
+        ), ['user_id', 'exercise_key', 'date'], lambda new: [
+            ('max_weight', case((cls.max_weight < new.max_weight, new.max_weight), else_=cls.max_weight)),
+            ('best_e1rm', case((cls.best_e1rm < new.best_e1rm, new.best_e1rm), else_=cls.best_e1rm)),
+            ('total_volume', cls.total_volume + new.total_volume),
+            ('set_count', cls.set_count + new.set_count)
+        ])
+
+    @classmethod
+    def _day_totals_query(cls):
+        """Aggregate Exercises rows into per-(user, exercise, day) totals"""
+        return db.session.query(
+            Exercise.user_id,
+            Exercise.exercise_key_expr().label('exercise_key'),
+            func.max(Exercise.standard_exercise_id).label('standard_exercise_id'),
+            func.max(Exercise.custom_exercise_id).label('custom_exercise_id'),
+            Exercise.date,
+            func.max(Exercise.weight).label('max_weight'),
+            func.sum(Exercise.weight * Exercise.reps * Exercise.sets).label('total_volume'),
+            func.max(cls.estimate_1rm_expr(Exercise.weight, Exercise.reps)).label('best_e1rm'),
+            func.sum(Exercise.sets).label('set_count')
+        ).filter(
+            (Exercise.standard_exercise_id.isnot(None)) | (Exercise.custom_exercise_id.isnot(None))
+        ).group_by(
+            Exercise.user_id,
+            Exercise.exercise_key_expr(),
+            Exercise.date
+        )
+
+    @classmethod
+    def refresh_day(cls, user_id, standard_exercise_id, custom_exercise_id, set_date):
+        """
+        Recompute one day's row from set history after a delete. Does not commit.
+
+        Max weight and e1RM cannot be decremented, so the day is re-aggregated
+        (a handful of rows). Callers must flush the delete first.
+        """
+        key = Exercise.make_exercise_key(standard_exercise_id, custom_exercise_id)
+        if key is None:
+            return None
+
+        totals = cls._day_totals_query().filter(
+            Exercise.user_id == user_id,
+            Exercise.exercise_key_expr() == key,
+            Exercise.date == set_date
+        ).first()
+        summary = cls.query.filter_by(user_id=user_id, exercise_key=key, date=set_date).first()
+
+        if totals is None:
+            if summary is not None:
+                db.session.delete(summary)
+            return None
+
+        if summary is None:
+            summary = cls(
+                user_id=user_id,
+                exercise_key=key,
+                date=set_date,
+                standard_exercise_id=standard_exercise_id or None,
+                custom_exercise_id=None if standard_exercise_id else custom_exercise_id
+            )
+            db.session.add(summary)
+        summary.max_weight = totals.max_weight
+        summary.total_volume = float(totals.total_volume or 0)
+        summary.best_e1rm = float(totals.best_e1rm)
+        summary.set_count = int(totals.set_count or 0)
+        return summary
+
+    @classmethod
+    def progression_rows(cls, user_id, exercise_names=(), standard_exercise_ids=()):
+        """
+        One row per training day for several exercises, ordered by exercise
+        and date. Exercises can be selected by name (standard or the user's
+        custom exercises), by standard_exercise_id, or both.
+        """
+        exercise_name = func.coalesce(
+            StandardExercise.exercise_name,
+            CustomExercise.exercise_name,
+            "Unknown"
+        )
+        selectors = []
+        if exercise_names:
+            selectors.append(exercise_name.in_(exercise_names))
+        if standard_exercise_ids:
+            selectors.append(cls.standard_exercise_id.in_(standard_exercise_ids))
+        if not selectors:
+            return []
+
+        return db.session.query(
+            cls.exercise_key,
+            cls.standard_exercise_id,
+            exercise_name.label('exercise_name'),
+            cls.date,
+            cls.max_weight,
+            cls.total_volume,
+            cls.best_e1rm,
+            cls.set_count
+        ).outerjoin(
+            StandardExercise, StandardExercise.standard_exercise_id == cls.standard_exercise_id
+        ).outerjoin(
+            CustomExercise, CustomExercise.custom_exercise_id == cls.custom_exercise_id
+        ).filter(
+            cls.user_id == user_id,
+            db.or_(*selectors)
+        ).order_by(
+            cls.exercise_key.desc(),  # Standard exercises first on name clashes
+            cls.date
+        ).all()
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """
+        Rebuild daily summaries from the Exercises table (all users by default).
+        Commits and returns the number of rows written.
+        """
+        query = cls._day_totals_query()
+        delete_query = cls.query
+        if user_id is not None:
+            query = query.filter(Exercise.user_id == user_id)
+            delete_query = delete_query.filter_by(user_id=user_id)
+
+        rows = [{
+            'user_id': row.user_id,
+            'exercise_key': row.exercise_key,
+            'date': row.date,
+            'standard_exercise_id': row.standard_exercise_id if row.exercise_key > 0 else None,
+            'custom_exercise_id': row.custom_exercise_id if row.exercise_key < 0 else None,
+            'max_weight': row.max_weight,
+            'total_volume': float(row.total_volume or 0),
+            'best_e1rm': float(row.best_e1rm),
+            'set_count': int(row.set_count or 0)
+        } for row in query.yield_per(1000)]
+
+        delete_query.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(cls, rows)
+        db.session.commit()
+        return len(rows)
+
+
+class DailyRestSummary(db.Model):
+    """
+    Rest between sets per user and day: the number of sets with a known
+    rest, their total rest, and a histogram of rest times in
+    REST_BUCKET_SECONDS buckets (little-endian uint16 counts, saturating
+    at 65535) for percentiles. Rest of sets stored as one group is their average.
+
+    Refreshed from the day's Exercises rows by rep_logger on every write,
+    so rest-efficiency reads one row per day. Rebuild from existing data
+    with rebuild_summaries.py.
+    """
+    __tablename__ = 'DailyRestSummaries'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    rest_sets = db.Column(db.Integer, nullable=False, default=0)
+    rest_seconds = db.Column(db.Integer, nullable=False, default=0)
+    histogram = db.Column(db.LargeBinary(80), nullable=False)
+
+    @staticmethod
+    def empty_histogram():
+        from . import constants
+        return [0] * (constants.MAX_REST_SECONDS // constants.REST_BUCKET_SECONDS)
+
+    @staticmethod
+    def pack(counts):
+        """Histogram counts as uint16, clamped so a huge day cannot overflow a bucket"""
+        return struct.pack(f'<{len(counts)}H', *(min(count, 0xFFFF) for count in counts))
+
+    @staticmethod
+    def unpack(histogram):
+        return list(struct.unpack(f'<{len(histogram) // 2}H', histogram))
+
+    @classmethod
+    def _summarize(cls, groups):
+        """
+        Fold (rest_seconds, rest_sets, sets) per stored row into
+        (rest_sets, rest_seconds, histogram counts).
+        """
+        from . import constants
+
+        counts = cls.empty_histogram()
+        total_sets = total_seconds = 0
+        for rest_seconds, rest_sets, sets in groups:
+            # Sets deleted from a group take their share of its rest with them
+            known = min(rest_sets, sets)
+            if known <= 0:
+                continue
+            average = rest_seconds / rest_sets
+            bucket = min(int(average // constants.REST_BUCKET_SECONDS), len(counts) - 1)
+            counts[bucket] += known
+            total_sets += known
+            total_seconds += round(average * known)
+        return total_sets, total_seconds, counts
+
+    @classmethod
+    def refresh_day(cls, user_id, day):
+        """Recompute one day's summary from its Exercises rows. Does not commit."""
+        groups = db.session.query(
+            Exercise.rest_seconds, Exercise.rest_sets, Exercise.sets
+        ).filter(
+            Exercise.user_id == user_id,
+            Exercise.date == day,
+            Exercise.rest_sets > 0
+        ).all()
+        rest_sets, rest_seconds, counts = cls._summarize(groups)
+
+        summary = db.session.get(cls, (user_id, day))
+        if not rest_sets:
+            if summary is not None:
+                db.session.delete(summary)
+            return
+        if summary is None:
+            summary = cls(user_id=user_id, date=day)
+            db.session.add(summary)
+        summary.rest_sets = rest_sets
+        summary.rest_seconds = rest_seconds
+        summary.histogram = cls.pack(counts)
+
+    @staticmethod
+    def percentile(counts, fraction):
+        """
+        Rest time (seconds) at a percentile of a histogram, interpolated
+        linearly within the bucket. None for an empty histogram.
+        """
+        from . import constants
+
+        total = sum(counts)
+        if not total:
+            return None
+        rank = fraction * total
+        seen = 0
+        for bucket, count in enumerate(counts):
+            if count and seen + count >= rank:
+                position = (rank - seen) / count
+                return (bucket + position) * constants.REST_BUCKET_SECONDS
+            seen += count
+        return len(counts) * constants.REST_BUCKET_SECONDS
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """
+        Rebuild rest summaries from the Exercises table (all users by default).
+        Commits and returns the number of rows written.
+        """
+        query = db.session.query(
+            Exercise.user_id, Exercise.date, Exercise.rest_seconds, Exercise.rest_sets, Exercise.sets
+        ).filter(Exercise.rest_sets > 0)
+        delete_query = cls.query
+        if user_id is not None:
+            query = query.filter(Exercise.user_id == user_id)
+            delete_query = delete_query.filter_by(user_id=user_id)
+
+        groups = defaultdict(list)
+        for row in query.yield_per(1000):
+            groups[(row.user_id, row.date)].append((row.rest_seconds, row.rest_sets, row.sets))
+
+        rows = []
+        for (uid, day), day_groups in groups.items():
+            rest_sets, rest_seconds, counts = cls._summarize(day_groups)
+            if rest_sets:
+                rows.append({
+                    'user_id': uid,
+                    'date': day,
+                    'rest_sets': rest_sets,
+                    'rest_seconds': rest_seconds,
+                    'histogram': cls.pack(counts)
+                })
+
+        delete_query.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(cls, rows)
+        db.session.commit()
+        return len(rows)
+
+
+class TrainingDayBitmap(db.Model):
+    """
+    Days trained per user, year and body part, one bit per day of the year
+    (bit 0 is January 1st). body_part_id 0 (ANY_BODY_PART) holds the union:
+    every day with any logged set.
+
+    Maintained on write by rep_logger, so "days trained in a window",
+    streaks and calendars are popcounts and shifts over a few small rows.
+    Rebuild from existing data with rebuild_summaries.py.
+    """
+    __tablename__ = 'TrainingDayBitmaps'
+    ANY_BODY_PART = 0
+    BITMAP_BYTES = 46  # 366 bits
+
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    body_part_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    days = db.Column(db.LargeBinary(46), nullable=False)
+
+    @staticmethod
+    def day_index(day):
+        """Bit position of a date within its year's bitmap"""
+        return day.timetuple().tm_yday - 1
+
+    @property
+    def bits(self):
+        return int.from_bytes(self.days, 'little')
+
+    @classmethod
+    def _set(cls, user_id, body_part_id, day, trained):
+        """
+        Set or clear one day's bit, deleting a bitmap that becomes empty.
+
+        The bits are changed in Python, so the row is locked and re-read
+        first (SELECT ... FOR UPDATE): concurrent writes for the same user
+        and year apply their bits one after the other instead of
+        overwriting each other. Setting a bit creates a missing row with an
+        upsert first, so concurrent first writes of a year cannot collide.
+        """
+        key = dict(user_id=user_id, year=day.year, body_part_id=body_part_id)
+        if trained:
+            _upsert(cls, dict(days=bytes(cls.BITMAP_BYTES), **key), list(key), lambda new: [('days', cls.days)])
+        row = cls.query.filter_by(**key).with_for_update().populate_existing().one_or_none()
+        if row is None:
+            return
+
+        mask = 1 << cls.day_index(day)
+        bits = row.bits | mask if trained else row.bits & ~mask
+        if bits == 0:
+            db.session.delete(row)
+        else:
+            row.days = bits.to_bytes(cls.BITMAP_BYTES, 'little')
+
+    @classmethod
+    def mark_day(cls, user_id, body_part_id, day):
+        """Record a training day for a body part (and for ANY_BODY_PART). Does not commit."""
+        if body_part_id is not None:
+            cls._set(user_id, body_part_id, day, True)
+        cls._set(user_id, cls.ANY_BODY_PART, day, True)
+
+    @classmethod
+    def mark_rows(cls, rows):
+        """Mark days for a batch of Exercises row mappings (see Exercise.bulk_insert). Does not commit."""
+        days = {(row['user_id'], row['body_part_id'], row['date']) for row in rows}
+        for user_id, body_part_id, day in days:
+            cls.mark_day(user_id, body_part_id, day)
+
+    @classmethod
+    def refresh_day(cls, user_id, body_part_id, day):
+        """
+        Clear a day's bits once its last set is deleted (checked against
+        the Exercises table). Does not commit.
+        """
+        day_rows = Exercise.query.filter_by(user_id=user_id, date=day)
+        if body_part_id is not None and not day_rows.filter_by(body_part_id=body_part_id).first():
+            cls._set(user_id, body_part_id, day, False)
+        if not day_rows.first():
+            cls._set(user_id, cls.ANY_BODY_PART, day, False)
+
+    @classmethod
+    def day_bits(cls, user_id, start, end, body_part_id=None, for_update=False):
+        """
+        Training days between two dates (inclusive) as Python ints, where
+        bit i means start + i days was trained.
+
+        Returns:
+            dict: {body_part_id: bits}, ANY_BODY_PART included; body parts
+            without training in the range are omitted. Limited to one
+            body part if body_part_id is given. With for_update the rows
+            are locked and read current, for writers deriving state from them.
+        """
+        from datetime import date
+        query = cls.query.filter(
+            cls.user_id == user_id,
+            cls.year >= start.year,
+            cls.year <= end.year
+        )
+        if body_part_id is not None:
+            query = query.filter(cls.body_part_id == body_part_id)
+        if for_update:
+            query = query.with_for_update().populate_existing()
+
+        # Lay each year's bitmap at its offset from start, then cut to the range
+        origin = start.toordinal()
+        window = (1 << (end.toordinal() - origin + 1)) - 1
+        combined = defaultdict(int)
+        for row in query:
+            offset = date(row.year, 1, 1).toordinal() - origin
+            bits = row.bits << offset if offset >= 0 else row.bits >> -offset
+            combined[row.body_part_id] |= bits & window
+        return {body_part: bits for body_part, bits in combined.items() if bits}
+
+    @classmethod
+    def days_trained(cls, user_id, start, end):
+        """Number of days trained between two dates per body part id (popcount)"""
+        return {
+            body_part_id: bits.bit_count()
+            for body_part_id, bits in cls.day_bits(user_id, start, end).items()
+        }
+
+    @staticmethod
+    def longest_run(bits):
+        """Length of the longest run of consecutive set bits"""
+        length = 0
+        while bits:
+            # Each step shortens every run by one
+            bits &= bits >> 1
+            length += 1
+        return length
+
+    @staticmethod
+    def run_ending_at(bits, index):
+        """Length of the run of set bits ending at bit `index`"""
+        window = (1 << (index + 1)) - 1
+        gaps = ~bits & window
+        return index + 1 - gaps.bit_length() if gaps else index + 1
+
+    @classmethod
+    def _collect(cls, user_id=None):
+        """Bitmaps from the Exercises table as {(user_id, year, body_part_id): bits}"""
+        query = db.session.query(
+            Exercise.user_id,
+            Exercise.body_part_id,
+            Exercise.date
+        ).distinct()
+        if user_id is not None:
+            query = query.filter(Exercise.user_id == user_id)
+
+        bitmaps = defaultdict(int)
+        for row in query.yield_per(1000):
+            mask = 1 << cls.day_index(row.date)
+            if row.body_part_id is not None:
+                bitmaps[(row.user_id, row.date.year, row.body_part_id)] |= mask
+            bitmaps[(row.user_id, row.date.year, cls.ANY_BODY_PART)] |= mask
+        return bitmaps
+
+    @classmethod
+    def rebuild_user(cls, user_id):
+        """
+        Rebuild one user's bitmaps through the session, so rows already
+        loaded (e.g. by mark_day in the same request) stay current.
+        Does not commit.
+        """
+        bitmaps = cls._collect(user_id)
+        for row in cls.query.filter_by(user_id=user_id):
+            bits = bitmaps.pop((user_id, row.year, row.body_part_id), 0)
+            if bits:
+                row.days = bits.to_bytes(cls.BITMAP_BYTES, 'little')
+            else:
+                db.session.delete(row)
+        for (uid, year, body_part_id), bits in bitmaps.items():
+            db.session.add(cls(
+                user_id=uid,
+                year=year,
+                body_part_id=body_part_id,
+                days=bits.to_bytes(cls.BITMAP_BYTES, 'little')
+            ))
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """
+        Rebuild bitmaps from the Exercises table (all users by default).
+        Commits and returns the number of rows written.
+        """
+        bitmaps = cls._collect(user_id)
+        delete_query = cls.query
+        if user_id is not None:
+            delete_query = delete_query.filter_by(user_id=user_id)
+
+        delete_query.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(cls, [{
+            'user_id': uid,
+            'year': year,
+            'body_part_id': body_part_id,
+            'days': bits.to_bytes(cls.BITMAP_BYTES, 'little')
+        } for (uid, year, body_part_id), bits in bitmaps.items()])
+        db.session.commit()
+        return len(bitmaps)
+
+
 
 
 
@@ -360,9 +1855,85 @@ class MotivationalQuote(db.Model):
         return f"<MotivationalQuote by {self.author}>"
     
     @staticmethod
-    def get_random_quote():
-        """Get a random active quote"""
-        import random
-        quotes = MotivationalQuote.query.filter_by(active=True).all()
-        return random.choice(quotes) if quotes else None
-    
\ No newline at end of file
+    def get_random_quote(category_weights=None):
+        """
+        Get a random active quote from the in-process quote pool.
+        Optionally weight the pick by category, e.g. {'strength': 2, 'motivation': 1}.
+        """
+        from .quote_pool import quote_pool
+        return quote_pool.random_quote(category_weights)
+    
+
+
+# ========================================
+# DASHBOARD SUMMARY SERVICE
+# ========================================
+@dataclass
+class DashboardSummary:
+    """Headline numbers shown on the dashboard for one user and date."""
+    workouts_this_week: int = 0
+    total_weight_lifted: float = 0.0
+    total_reps_performed: float = 0.0
+    max_single_lift: float = 0.0
+    max_lift_name: Optional[str] = None
+    unique_exercises_count: int = 0
+    workout_streak: int = 0
+    recent_prs: List[dict] = field(default_factory=list)
+
+    @classmethod
+    def for_user(cls, user_id, selected_date):
+        """
+        Build the summary for a user with a fixed number of round trips.
+
+        The selected-day totals and the week counters share one conditional
+        aggregate over Workouts/Exercises; the all-time max lift and recent
+        PRs are indexed reads of the PersonalRecords table.
+
+        Args:
+            user_id: ID of the user
+            selected_date: date (or datetime) the dashboard is showing
+        """
+        if isinstance(selected_date, datetime):
+            selected_date = selected_date.date()
+        today = datetime.now().date()
+        week_start = today - timedelta(days=today.weekday())
+
+        on_selected = Workout.date == selected_date
+        in_week = Workout.date >= week_start
+        exercise_key = Exercise.exercise_key_expr()
+
+        totals = db.session.query(
+            func.count(func.distinct(case((in_week, Workout.workout_id)))).label('workouts_this_week'),
+            func.sum(case((on_selected, Exercise.weight * Exercise.sets))).label('total_weight'),
+            func.sum(case((on_selected, Exercise.reps * Exercise.sets))).label('total_reps'),
+            func.count(func.distinct(case((in_week, exercise_key)))).label('unique_exercises')
+        ).select_from(Workout).outerjoin(
+            Exercise, Exercise.workout_id == Workout.workout_id
+        ).filter(
+            Workout.user_id == user_id,
+            on_selected | in_week
+        ).one()
+
+        max_lift = PersonalRecord.named_query(user_id).order_by(
+            PersonalRecord.weight.desc()
+        ).first()
+
+        week_ago = today - timedelta(days=7)
+        recent_prs = PersonalRecord.named_query(user_id).filter(
+            PersonalRecord.date >= week_ago
+        ).order_by(PersonalRecord.weight.desc()).limit(5).all()
+
+        return cls(
+            workouts_this_week=totals.workouts_this_week or 0,
+            total_weight_lifted=float(totals.total_weight or 0),
+            total_reps_performed=float(totals.total_reps or 0),
+            max_single_lift=float(max_lift.weight) if max_lift else 0.0,
+            max_lift_name=max_lift.exercise_name if max_lift else None,
+            unique_exercises_count=totals.unique_exercises or 0,
+            workout_streak=Workout.calculate_consecutive_workout_days(user_id),
+            recent_prs=[{
+                'name': pr.exercise_name,
+                'weight': float(pr.weight),
+                'date': pr.date
+            } for pr in recent_prs]
+        )
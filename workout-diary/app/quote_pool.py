@@ -0,0 +1,126 @@
+"""
+In-process pool of motivational quotes for the dashboard.
+
+Each worker loads the active quotes once and serves random picks from
+memory. The pool reloads when its TTL expires or when the invalidation
+stamp file is touched (see invalidate_quote_pool), so quotes added by
+init_quotes.py show up without a restart.
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from . import constants
+
+CachedQuote = namedtuple('CachedQuote', ['id', 'quote_text', 'author', 'category'])
+
+STAMP_FILE = os.getenv(
+    'QUOTE_POOL_STAMP_FILE',
+    os.path.join(tempfile.gettempdir(), 'repjurnal_quote_pool.stamp')
+)
+
+
+def _stamp_mtime():
+    """Return the invalidation stamp's mtime, or 0 if it has never been touched"""
+    try:
+        return os.stat(STAMP_FILE).st_mtime
+    except OSError:
+        return 0
+
+
+class QuotePool:
+    def __init__(self, ttl_seconds=constants.QUOTE_POOL_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._quotes = None
+        self._by_category = {}
+        self._loaded_at = 0.0
+        self._stamp = 0
+
+    def _is_stale(self):
+        if self._quotes is None:
+            return True
+        if time.monotonic() - self._loaded_at > self.ttl_seconds:
+            return True
+        return _stamp_mtime() != self._stamp
+
+    def _load(self):
+        """Load active quotes as plain tuples (no ORM objects kept around)"""
+        from .models import db, MotivationalQuote
+
+        stamp = _stamp_mtime()
+        rows = db.session.query(
+            MotivationalQuote.id,
+            MotivationalQuote.quote_text,
+            MotivationalQuote.author,
+            MotivationalQuote.category
+        ).filter(MotivationalQuote.active.is_(True)).all()
+
+        quotes = [CachedQuote(*row) for row in rows]
+        by_category = {}
+        for quote in quotes:
+            by_category.setdefault(quote.category, []).append(quote)
+
+        self._quotes = quotes
+        self._by_category = by_category
+        self._loaded_at = time.monotonic()
+        self._stamp = stamp
+
+    def get_quotes(self):
+        """Return the cached quotes, reloading first if the pool is stale"""
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    self._load()
+        return self._quotes
+
+    def random_quote(self, category_weights=None):
+        """
+        Pick a random active quote.
+
+        Args:
+            category_weights: Optional dict of {category: weight}. A category
+                is chosen by weight first, then a quote uniformly within it.
+                Categories missing from the dict get weight 0; if every
+                weight is 0 the pick is uniform over all quotes.
+
+        Returns:
+            CachedQuote or None if there are no active quotes
+        """
+        quotes = self.get_quotes()
+        if not quotes:
+            return None
+
+        if category_weights:
+            categories = list(self._by_category)
+            weights = [max(category_weights.get(category, 0), 0) for category in categories]
+            if any(weights):
+                category = random.choices(categories, weights=weights, k=1)[0]
+                return random.choice(self._by_category[category])
+
+        return random.choice(quotes)
+
+    def invalidate(self):
+        """Drop this worker's cached quotes so the next pick reloads them"""
+        with self._lock:
+            self._quotes = None
+
+
+quote_pool = QuotePool()
+
+
+def invalidate_quote_pool():
+    """
+    Invalidate the quote pool in every worker.
+
+    Clears this process's pool and touches the stamp file that other
+    workers on the same host compare against on each pick. Workers on
+    other hosts pick the change up when their TTL expires.
+    """
+    quote_pool.invalidate()
+    with open(STAMP_FILE, 'a'):
+        os.utime(STAMP_FILE, None)
@@ -1,25 +1,124 @@
 from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
-from .models import db, Workout, Exercise, BodyPart, StandardExercise, CustomExercise
-from .validators import validate_exercise_log, validate_date_string, sanitize_input
-from datetime import date
+from .models import db, Workout, Exercise, BodyPart, StandardExercise, CustomExercise, PersonalRecord, WorkoutStreak, UserDataVersion, WeeklyVolume, DailyExerciseSummary, TrainingDayBitmap, DailyRestSummary
+from .validators import validate_exercise_log, validate_workout_date, sanitize_input
+from .catalog import reference_catalog
+from .cache import etag_by_data_version
+from . import constants
+from datetime import date, datetime, timezone
 
 workout_bp = Blueprint('workout', __name__)
+
+
+def _get_or_create_workout(user_id, workout_date):
+    """
+    Return the user's workout for a date, creating it if needed.
+    Flushes (to assign workout_id) but does not commit.
+
+    Returns:
+        (Workout, bool): the workout and whether it was newly created
+    """
+    workout = Workout.query.filter_by(
+        user_id=user_id,
+        date=workout_date
+    ).first()
+    if workout:
+        return workout, False
+
+    workout = Workout(
+        user_id=user_id,
+        date=workout_date
+    )
+    db.session.add(workout)
+    db.session.flush()
+    return workout, True
+
+
+def _parse_completed_at(value):
+    """
+    Parse a set completion timestamp (ISO 8601, e.g. from
+    Date.toISOString()) into a naive UTC datetime. None if not given.
+
+    Raises:
+        ValueError: if the timestamp is malformed
+    """
+    if not value:
+        return None
+    completed_at = datetime.fromisoformat(str(value))
+    if completed_at.tzinfo is not None:
+        completed_at = completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return completed_at
+
+
+def _parse_session_exercise(entry):
+    """
+    Validate one exercise of a session log payload.
+
+    Accepts either a list of sets ({"sets": [{"weight": .., "reps": ..}, ...]})
+    or the single-log shape ({"weight": .., "reps": .., "sets": <count>}).
+
+    Returns:
+        (dict, str): (parsed exercise, error message); exactly one is None
+    """
+    if not isinstance(entry, dict):
+        return None, 'Each exercise must be an object'
+
+    body_part_name = sanitize_input(entry.get('bodyPart', ''), 50)
+    body_part_id = reference_catalog.body_part_id(body_part_name)
+    if body_part_id is None:
+        return None, 'Invalid body part'
+
+    standard_exercise_id = int(entry['standardExerciseId']) if entry.get('standardExerciseId') else None
+    custom_exercise_id = int(entry['customExerciseId']) if entry.get('customExerciseId') else None
+    if not standard_exercise_id and not custom_exercise_id:
+        return None, 'Each exercise needs a standardExerciseId or customExerciseId'
+    if standard_exercise_id and reference_catalog.standard_exercise(standard_exercise_id) is None:
+        return None, 'Invalid exercise'
+
+    raw_sets = entry.get('sets')
+    if isinstance(raw_sets, list):
+        set_list = raw_sets
+    else:
+        count = raw_sets if raw_sets is not None else 1
+        is_valid, errors = validate_exercise_log(entry.get('weight', 0), entry.get('reps', 0), count)
+        if not is_valid:
+            return None, next(iter(errors.values()))
+        set_list = [{'weight': entry.get('weight', 0), 'reps': entry.get('reps', 0)}] * int(count)
+
+    if not set_list or len(set_list) > constants.MAX_SETS_PER_EXERCISE:
+        return None, f'Each exercise must have between 1 and {constants.MAX_SETS_PER_EXERCISE} sets'
+
+    sets = []
+    for logged_set in set_list:
+        if not isinstance(logged_set, dict):
+            return None, 'Each set must be an object'
+        weight = logged_set.get('weight', 0)
+        reps = logged_set.get('reps', 0)
+        is_valid, errors = validate_exercise_log(weight, reps, 1, allow_bodyweight=True)
+        if not is_valid:
+            return None, next(iter(errors.values()))
+        sets.append((float(weight), int(reps)))
+
+    return {
+        'body_part_id': body_part_id,
+        'standard_exercise_id': standard_exercise_id,
+        'custom_exercise_id': custom_exercise_id,
+        'sets': sets,
+    }, None
+
 @workout_bp.route('/api/exercises/<body_part>', methods=['GET'])
 @login_required
 def get_exercises(body_part):
-    # Get the body part
-    body_part_obj = BodyPart.query.filter_by(body_part_name=body_part).first()
-    if not body_part_obj:
+    # Resolve the body part and its standard exercises from the in-memory catalog
+    body_part_id = reference_catalog.body_part_id(body_part)
+    if body_part_id is None:
         return jsonify({'error': 'Body part not found'}), 404
     
-    # Get standard exercises
-    standard_exercises = StandardExercise.query.filter_by(body_part_id=body_part_obj.body_part_id)\
-        .order_by(StandardExercise.exercise_name).all()
+    standard_exercises = reference_catalog.standard_exercises_for_body_part(body_part_id)
     
     # Get custom exercises
     custom_exercises = CustomExercise.query.filter_by(
-        body_part_id=body_part_obj.body_part_id,
+        body_part_id=body_part_id,
         user_id=current_user.user_id
     ).order_by(CustomExercise.exercise_name).all()
     
@@ -44,9 +143,7 @@ def get_body_parts():
     """
     current_app.logger.debug(f"User {current_user.user_id} requesting body parts list")
     
-    body_parts = BodyPart.query.order_by(BodyPart.body_part_name).all()
-    
-    return jsonify([bp.body_part_name for bp in body_parts]), 200
+    return jsonify(reference_catalog.body_part_names()), 200
 
 
 
@@ -61,18 +158,19 @@ def add_custom_exercise():
     try:
         data = request.get_json()
         
-        body_part = BodyPart.query.filter_by(body_part_name=data['bodyPart']).first()
-        if not body_part:
+        body_part_id = reference_catalog.body_part_id(data['bodyPart'])
+        if body_part_id is None:
             current_app.logger.warning(f"Invalid body part '{data['bodyPart']}' from user {current_user.user_id}")
             return jsonify({'error': 'Invalid body part'}), 400
             
         new_exercise = CustomExercise(
             user_id=current_user.user_id,
-            body_part_id=body_part.body_part_id,
+            body_part_id=body_part_id,
             exercise_name=sanitize_input(data['exerciseName'], 100)
         )
         
         db.session.add(new_exercise)
+        UserDataVersion.bump(current_user.user_id)
         db.session.commit()
         
         current_app.logger.info(
@@ -92,15 +190,13 @@ def add_exercise():
     """
     Log an exercise with comprehensive input validation.
     """
-    from datetime import datetime
-    
     try:
         data = request.get_json()
         
         # Validate and parse date
         workout_date_str = data.get('date')
         if workout_date_str:
-            is_valid, error = validate_date_string(workout_date_str)
+            is_valid, error = validate_workout_date(workout_date_str)
             if not is_valid:
                 return jsonify({'error': error}), 400
             workout_date = datetime.strptime(workout_date_str, '%Y-%m-%d').date()
@@ -126,41 +222,75 @@ def add_exercise():
         
         # Validate body part
         body_part_name = sanitize_input(data.get('bodyPart', ''), 50)
-        body_part = BodyPart.query.filter_by(body_part_name=body_part_name).first()
-        if not body_part:
+        body_part_id = reference_catalog.body_part_id(body_part_name)
+        if body_part_id is None:
             current_app.logger.warning(
                 f"Invalid body part '{body_part_name}' from user {current_user.user_id}"
             )
             return jsonify({'error': 'Invalid body part'}), 400
         
-        # Get or create workout for the selected date
-        workout = Workout.query.filter_by(
-            user_id=current_user.user_id,
-            date=workout_date
-        ).first()
-        
-        if not workout:
-            workout = Workout(
-                user_id=current_user.user_id,
-                date=workout_date
-            )
-            db.session.add(workout)
-            db.session.commit()
-        
-        # Create exercise entries (one per set)
-        for i in range(sets):
-            new_exercise = Exercise(
-                workout_id=workout.workout_id,
-                user_id=current_user.user_id,
-                body_part_id=body_part.body_part_id,
-                standard_exercise_id=data.get('standardExerciseId'),
-                custom_exercise_id=data.get('customExerciseId'),
-                sets=1,  # Each DB entry represents 1 set
-                reps=reps,
-                weight=weight,
-                date=workout_date
+        # Validate the standard exercise against the catalog (no DB access)
+        standard_exercise_id = int(data['standardExerciseId']) if data.get('standardExerciseId') else None
+        custom_exercise_id = int(data['customExerciseId']) if data.get('customExerciseId') else None
+        if standard_exercise_id and reference_catalog.standard_exercise(standard_exercise_id) is None:
+            return jsonify({'error': 'Invalid exercise'}), 400
+        if custom_exercise_id and not CustomExercise.owned_ids(current_user.user_id, [custom_exercise_id]):
+            current_app.logger.warning(
+                f"User {current_user.user_id} tried to log custom exercise {custom_exercise_id} they do not own"
             )
-            db.session.add(new_exercise)
+            return jsonify({'error': 'Invalid exercise'}), 400
+        
+        # When the sets were finished (sent by repLogger.js for live logging)
+        try:
+            completed_at = _parse_completed_at(data.get('completedAt'))
+        except ValueError:
+            return jsonify({'error': 'Invalid completion time'}), 400
+        
+        # Get or create workout for the selected date (committed with the sets below)
+        workout, new_day = _get_or_create_workout(current_user.user_id, workout_date)
+        
+        # Rest since the workout's previous set, then store the sets (one
+        # compact row, or merged into an identical previous row)
+        rest_seconds, rest_sets = Exercise.rest_before(workout.workout_id, completed_at, sets)
+        Exercise.append_sets(
+            workout.workout_id,
+            current_user.user_id,
+            body_part_id,
+            standard_exercise_id,
+            custom_exercise_id,
+            weight,
+            reps,
+            sets,
+            workout_date,
+            completed_at=completed_at,
+            rest_seconds=rest_seconds,
+            rest_sets=rest_sets
+        )
+        
+        # Keep the personal record in the same transaction as the sets
+        PersonalRecord.record_set(
+            current_user.user_id,
+            standard_exercise_id,
+            custom_exercise_id,
+            weight,
+            reps,
+            workout_date
+        )
+        WeeklyVolume.add(current_user.user_id, body_part_id, workout_date, weight, reps, sets)
+        DailyExerciseSummary.record_sets(
+            current_user.user_id,
+            standard_exercise_id,
+            custom_exercise_id,
+            workout_date,
+            weight,
+            reps,
+            sets
+        )
+        TrainingDayBitmap.mark_day(current_user.user_id, body_part_id, workout_date)
+        if rest_sets:
+            DailyRestSummary.refresh_day(current_user.user_id, workout_date)
+        WorkoutStreak.record_day(current_user.user_id, workout_date, new_day)
+        UserDataVersion.bump(current_user.user_id)
         
         db.session.commit()
         
@@ -179,8 +309,143 @@ def add_exercise():
         return jsonify({'error': 'An error occurred while logging the exercise'}), 500
 
 
+@workout_bp.route('/api/session_log', methods=['POST'])
+@login_required
+def add_session():
+    """
+    Log a whole workout session (many exercises, many sets each) at once.
+
+    The payload is validated in one pass before anything is written, then
+    every set goes in with a single multi-row INSERT and one commit.
+    Returns the created set IDs grouped per exercise, in request order.
+    """
+    from datetime import datetime
+    
+    try:
+        data = request.get_json() or {}
+        
+        # Validate and parse date
+        workout_date_str = data.get('date')
+        if workout_date_str:
+            is_valid, error = validate_workout_date(workout_date_str)
+            if not is_valid:
+                return jsonify({'error': error}), 400
+            workout_date = datetime.strptime(workout_date_str, '%Y-%m-%d').date()
+        else:
+            workout_date = date.today()
+        
+        entries = data.get('exercises')
+        if not isinstance(entries, list) or not entries:
+            return jsonify({'error': 'A session needs at least one exercise'}), 400
+        if len(entries) > constants.MAX_EXERCISES_PER_SESSION:
+            return jsonify({
+                'error': f'A session can have at most {constants.MAX_EXERCISES_PER_SESSION} exercises'
+            }), 400
+        
+        # Validate everything before writing anything
+        exercises = []
+        for index, entry in enumerate(entries):
+            parsed, error = _parse_session_exercise(entry)
+            if error:
+                return jsonify({'error': error, 'exercise_index': index}), 400
+            exercises.append(parsed)
+        
+        # Custom exercises must be the user's own (one query for the whole session)
+        owned = CustomExercise.owned_ids(
+            current_user.user_id,
+            [exercise['custom_exercise_id'] for exercise in exercises if exercise['custom_exercise_id']]
+        )
+        for index, exercise in enumerate(exercises):
+            if exercise['custom_exercise_id'] and exercise['custom_exercise_id'] not in owned:
+                current_app.logger.warning(
+                    f"User {current_user.user_id} tried to log custom exercise "
+                    f"{exercise['custom_exercise_id']} they do not own"
+                )
+                return jsonify({'error': 'Invalid exercise', 'exercise_index': index}), 400
+        
+        workout, new_day = _get_or_create_workout(current_user.user_id, workout_date)
+        
+        rows = []
+        best_sets = {}
+        for exercise in exercises:
+            exercise['row_start'] = len(rows)
+            for weight, reps in exercise['sets']:
+                previous = rows[-1] if len(rows) > exercise['row_start'] else None
+                if (constants.COMPACT_SET_STORAGE and previous
+                        and previous['weight'] == weight and previous['reps'] == reps):
+                    # Identical consecutive set: extend the stored group
+                    previous['sets'] += 1
+                    continue
+                rows.append({
+                    'workout_id': workout.workout_id,
+                    'user_id': current_user.user_id,
+                    'body_part_id': exercise['body_part_id'],
+                    'standard_exercise_id': exercise['standard_exercise_id'],
+                    'custom_exercise_id': exercise['custom_exercise_id'],
+                    'sets': 1,
+                    'reps': reps,
+                    'weight': weight,
+                    'date': workout_date
+                })
+            exercise['row_end'] = len(rows)
+            # Only the heaviest set per exercise can move its personal record
+            key = (exercise['standard_exercise_id'], exercise['custom_exercise_id'])
+            heaviest = max(exercise['sets'])
+            if key not in best_sets or heaviest > best_sets[key]:
+                best_sets[key] = heaviest
+        
+        exercise_ids = Exercise.bulk_insert(rows)
+        
+        # Keep summaries in the same transaction as the sets
+        for (standard_exercise_id, custom_exercise_id), (weight, reps) in best_sets.items():
+            PersonalRecord.record_set(
+                current_user.user_id,
+                standard_exercise_id,
+                custom_exercise_id,
+                weight,
+                reps,
+                workout_date
+            )
+        WeeklyVolume.add_rows(rows)
+        DailyExerciseSummary.record_rows(rows)
+        TrainingDayBitmap.mark_rows(rows)
+        WorkoutStreak.record_day(current_user.user_id, workout_date, new_day)
+        UserDataVersion.bump(current_user.user_id)
+        
+        db.session.commit()
+        
+        # One ID per logged set, grouped per exercise; sets stored as one
+        # group share their row's ID (see delete_logged_set's count)
+        grouped_ids = []
+        for exercise in exercises:
+            set_ids = []
+            for row, exercise_id in zip(rows[exercise['row_start']:exercise['row_end']],
+                                        exercise_ids[exercise['row_start']:exercise['row_end']]):
+                set_ids.extend([exercise_id] * row['sets'])
+            grouped_ids.append(set_ids)
+        
+        current_app.logger.info(
+            f"User {current_user.user_id} logged a session of {len(exercises)} exercises ({len(rows)} rows)"
+        )
+        
+        return jsonify({
+            'success': True,
+            'workout_id': workout.workout_id,
+            'exercise_ids': grouped_ids
+        }), 201
+        
+    except ValueError as e:
+        current_app.logger.error(f"Value error in add_session: {str(e)}")
+        return jsonify({'error': 'Invalid data format'}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error in add_session: {str(e)}", exc_info=True)
+        return jsonify({'error': 'An error occurred while logging the session'}), 500
+
+
 @workout_bp.route('/api/logged-sets', methods=['GET'])
 @login_required
+@etag_by_data_version
 def get_logged_sets():
     from datetime import datetime
     from flask import request, jsonify
@@ -191,18 +456,20 @@ def get_logged_sets():
     workouts = Workout.get_workouts_for_date(current_user.user_id, selected_date)
     workout_ids = [workout.workout_id for workout in workouts]
 
-    exercises = Exercise.query.filter(Exercise.workout_id.in_(workout_ids)).all()
+    exercises = Exercise.sets_for_workouts(workout_ids)
 
+    # One entry per set; sets stored as one group share their row's ID
     logged_sets = []
     for exercise in exercises:
-        logged_sets.append({
-            "id": exercise.exercise_id,  # Include the ID of the lift
-            "exercise_name": exercise.get_exercise_name(),
-            "weight": exercise.weight,
-            "unit": "lbs",  # Adjust unit logic as needed
-            "reps": exercise.reps,
-            "sets": exercise.sets,
-        })
+        for _ in range(exercise.sets):
+            logged_sets.append({
+                "id": exercise.exercise_id,  # Include the ID of the lift
+                "exercise_name": exercise.exercise_name,
+                "weight": exercise.weight,
+                "unit": "lbs",  # Adjust unit logic as needed
+                "reps": exercise.reps,
+                "sets": 1,
+            })
 
     return jsonify({"logged_sets": logged_sets})
 
@@ -222,8 +489,37 @@ def delete_logged_set(lift_id):
     if lift.workout.user_id != current_user.user_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    # Delete the lift
-    db.session.delete(lift)
+    # Remove `count` sets (default 1) from the stored set group
+    count = max(request.args.get('count', 1, type=int), 1)
+    stored_sets = lift.sets
+    if not Exercise.remove_sets(lift, count):
+        WeeklyVolume.add(lift.user_id, lift.body_part_id, lift.date, lift.weight, lift.reps, -count)
+        DailyExerciseSummary.refresh_day(lift.user_id, lift.standard_exercise_id, lift.custom_exercise_id, lift.date)
+        DailyRestSummary.refresh_day(lift.user_id, lift.date)
+        UserDataVersion.bump(lift.user_id)
+        db.session.commit()
+        return jsonify({"success": True}), 200
+
+    # The whole group is gone: subtract it and recompute the personal record it may have held
+    WeeklyVolume.add(lift.user_id, lift.body_part_id, lift.date, lift.weight, lift.reps, -stored_sets)
+    DailyExerciseSummary.refresh_day(lift.user_id, lift.standard_exercise_id, lift.custom_exercise_id, lift.date)
+    DailyRestSummary.refresh_day(lift.user_id, lift.date)
+    PersonalRecord.refresh(
+        lift.user_id,
+        lift.standard_exercise_id,
+        lift.custom_exercise_id,
+        removed_weight=lift.weight
+    )
+
+    # Removing a day's last set removes the training day from the streak
+    TrainingDayBitmap.refresh_day(lift.user_id, lift.body_part_id, lift.date)
+    workout = lift.workout
+    if not Exercise.query.filter_by(workout_id=workout.workout_id).first():
+        db.session.delete(workout)
+        db.session.flush()
+        WorkoutStreak.recompute(lift.user_id)
+
+    UserDataVersion.bump(lift.user_id)
     db.session.commit()
 
     return jsonify({"success": True}), 200
@@ -4,7 +4,9 @@ from urllib.parse import urlparse, urljoin
 
 from flask import Blueprint, jsonify, render_template, request, redirect, url_for, flash, current_app
 from werkzeug.security import generate_password_hash
-from .models import db, User, Workout, Exercise, CustomExercise, MotivationalQuote
+from .models import db, User, Workout, Exercise, CustomExercise, MotivationalQuote, DashboardSummary, UserDataVersion
+from .cache import LRUCache
+from . import constants
 from .auth_service import AuthService
 from .validators import (
     validate_registration_data, 
@@ -29,6 +31,9 @@ def get_user_by_username(username):
 # Initialize AuthService
 auth_service = AuthService(get_user_by_username)
 
+# Computed dashboard contexts, keyed by (user_id, selected date, today, data version)
+dashboard_cache = LRUCache(maxsize=constants.DASHBOARD_CACHE_SIZE)
+
 
 def is_safe_url(target):
     """
@@ -102,88 +107,35 @@ def register_page():
 def dashboard():
     from datetime import datetime, timedelta
     from flask import request
-    from collections import defaultdict
 
     # Get the selected date from query parameters, default to today
     date_str = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
     selected_date = datetime.strptime(date_str, '%Y-%m-%d')
 
-    # Get user info
-    user_data = User.query.get(current_user.user_id)
-
-    # Get the workouts for the selected date
-    workouts = Workout.get_workouts_for_date(current_user.user_id, selected_date)
-    workout_ids = [workout.workout_id for workout in workouts]
-
-    # Fetch exercise details for the selected date's workouts
-    exercises = Exercise.query.filter(Exercise.workout_id.in_(workout_ids)).all()
-
-    # Group exercises by workout, body part, and aggregate similar entries
-    workout_exercises = {}
-    for exercise in exercises:
-        workout_id = exercise.workout_id
-        body_part_name = exercise.body_part.body_part_name if exercise.body_part else "Unknown"
-
-        if workout_id not in workout_exercises:
-            workout_exercises[workout_id] = defaultdict(list)
-
-        # Use a tuple of exercise_name, weight, and reps as the key
-        exercise_key = (exercise.get_exercise_name(), exercise.weight, exercise.reps)
-
-        # Check if an entry already exists; if yes, aggregate the sets
-        found = False
-        for grouped_exercise in workout_exercises[workout_id][body_part_name]:
-            if grouped_exercise["key"] == exercise_key:
-                grouped_exercise["sets"] += exercise.sets
-                found = True
-                break
-
-        # If no match found, create a new entry
-        if not found:
-            workout_exercises[workout_id][body_part_name].append({
-                "key": exercise_key,
-                "exercise_name": exercise.get_exercise_name(),
-                "weight": float(exercise.weight),
-                "reps": exercise.reps,
-                "sets": exercise.sets,
-            })
-
-    # Check if no workouts exist for the selected date
-    workouts_exist = bool(workouts)
-
-    # Calculate the total weight lifted and total reps performed for the selected date
-    # Convert to float to avoid Decimal type issues in templates
-    total_weight_lifted = float(Exercise.get_total_weight_lifted(workout_ids))
-    total_reps_performed = float(Exercise.get_total_reps(workout_ids))
-
-    # Get the workouts this week for progress snapshot
-    workouts_this_week = Workout.get_workouts_this_week(current_user.user_id)
-    
-    # Calculate workout streak
-    workout_streak = Workout.calculate_consecutive_workout_days(current_user.user_id)
-    
-    # Get max single lift (all time)
-    max_lift_exercise = db.session.query(Exercise).filter(
-        Exercise.user_id == current_user.user_id
-    ).order_by(Exercise.weight.desc()).first()
-    max_single_lift = float(max_lift_exercise.weight) if max_lift_exercise else 0.0
-    max_lift_name = max_lift_exercise.get_exercise_name() if max_lift_exercise else None
-    
-    # Get unique exercises count (this week)
-    week_start = datetime.now() - timedelta(days=datetime.now().weekday())
-    week_workouts = Workout.query.filter(
-        Workout.user_id == current_user.user_id,
-        Workout.date >= week_start.date()
-    ).all()
-    week_workout_ids = [w.workout_id for w in week_workouts]
-    
-    # Count unique exercises by name (MySQL doesn't support COUNT(DISTINCT col1, col2))
-    if week_workout_ids:
-        unique_exercises = db.session.query(
-            func.count(func.distinct(Exercise.exercise_name))
-        ).filter(Exercise.workout_id.in_(week_workout_ids)).scalar()
-    else:
-        unique_exercises = 0
+    # Serve the computed context from cache until the user's data changes.
+    # Today's date is part of the key because weekly counts and the streak
+    # roll over at midnight.
+    cache_key = (
+        current_user.user_id,
+        selected_date.date(),
+        datetime.now().date(),
+        UserDataVersion.get(current_user.user_id)
+    )
+    context = dashboard_cache.get(cache_key)
+    if context is None:
+        # Get the workouts for the selected date
+        workouts = Workout.get_workouts_for_date(current_user.user_id, selected_date)
+        workout_ids = [workout.workout_id for workout in workouts]
+
+        context = {
+            # Sets grouped by workout and body part, names joined in one query
+            'workout_exercises': Exercise.grouped_for_workouts(workout_ids),
+            'workouts_exist': bool(workouts),
+            # Headline numbers (totals, weekly counts, max lift, streak, recent PRs)
+            'summary': DashboardSummary.for_user(current_user.user_id, selected_date),
+        }
+        dashboard_cache.set(cache_key, context)
+    current_app.logger.debug(f"Dashboard cache stats: {dashboard_cache.stats()}")
     
     # Get a random motivational quote (handle if table doesn't exist yet)
     try:
@@ -192,47 +144,13 @@ def dashboard():
         print(f"Warning: Could not fetch quote: {e}")
         quote = None
     
-    # Get recent PRs (last 7 days)
-    week_ago = datetime.now() - timedelta(days=7)
-    recent_prs = []
-    recent_exercises = db.session.query(Exercise).filter(
-        Exercise.user_id == current_user.user_id,
-        Exercise.date >= week_ago.date()
-    ).order_by(Exercise.weight.desc()).limit(5).all()
-    
-    for ex in recent_exercises:
-        # Check if this is a PR (highest weight for this exercise)
-        max_for_exercise = db.session.query(func.max(Exercise.weight)).filter(
-            Exercise.user_id == current_user.user_id,
-            Exercise.standard_exercise_id == ex.standard_exercise_id if ex.standard_exercise_id else None,
-            Exercise.custom_exercise_id == ex.custom_exercise_id if ex.custom_exercise_id else None,
-            Exercise.date < ex.date
-        ).scalar()
-        
-        if max_for_exercise is None or ex.weight > max_for_exercise:
-            recent_prs.append({
-                'name': ex.get_exercise_name(),
-                'weight': float(ex.weight),
-                'date': ex.date
-            })
-    
     # Pass data to the template
     return render_template(
         'dashboard.html',
-        workouts_this_week=len(workouts_this_week),
-        total_weight_lifted=total_weight_lifted,
-        total_reps_performed=total_reps_performed,
-        max_single_lift=max_single_lift,
-        max_lift_name=max_lift_name,
-        unique_exercises_count=unique_exercises,
-        workout_streak=workout_streak,
         quote=quote,
-        recent_prs=recent_prs,
-        user=user_data,
-        workouts=workouts,
-        workout_exercises=workout_exercises,
+        user=current_user,
         current_date=selected_date.strftime('%Y-%m-%d'),
-        workouts_exist=workouts_exist
+        **context
     )
 
 
@@ -1,6 +1,6 @@
 from flask import request, flash, redirect, url_for, Blueprint, jsonify
 from flask_login import login_required, current_user
-from .models import db, User
+from .models import db, User, UserDataVersion, TrainingTarget
 from .my_utils import format_phone_number
 
 # Define blueprints
@@ -40,10 +40,20 @@ def update_account():
         if weight_kg:
             user.weight_kg = float(weight_kg)
 
+        profile_for_targets = (user.fitness_goal, user.activity_level)
+
         fitness_goal = request.form.get('fitness_goal')
         if fitness_goal:
             user.fitness_goal = fitness_goal
 
+        activity_level = request.form.get('activity_level')
+        if activity_level:
+            user.activity_level = activity_level
+
+        # Seeded training targets follow the goal and activity level
+        if (user.fitness_goal, user.activity_level) != profile_for_targets:
+            TrainingTarget.seed(user)
+
         dietary_preferences = request.form.get('dietary_preferences')
         if dietary_preferences:
             user.dietary_preferences = dietary_preferences
@@ -56,6 +66,9 @@ def update_account():
                 current_app.logger.warning(f"Invalid time format for user {current_user.user_id}")
                 user.preferred_workout_time = None
         
+        # Goal-based metrics depend on the profile, so invalidate cached reads
+        UserDataVersion.bump(user.user_id)
+        
         # Save the updated user object
         db.session.commit()
         
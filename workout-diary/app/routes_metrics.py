@@ -1,51 +1,131 @@
 from flask import Blueprint, jsonify, request, render_template, current_app
 from flask_login import login_required, current_user
-from .models import User, db, Workout, Exercise, BodyPart, StandardExercise, CustomExercise
+from .models import User, db, Workout, Exercise, BodyPart, StandardExercise, CustomExercise, WorkoutStreak, WeeklyVolume, DailyExerciseSummary, TrainingTarget, UserDataVersion, TrainingDayBitmap, DailyRestSummary
+from .catalog import reference_catalog
+from .cache import LRUCache, etag_by_data_version
+from . import constants
 from datetime import date, timedelta, datetime
+import math
 
 from sqlalchemy import func, extract
 
 metrics_bp = Blueprint('metrics', __name__)
 
-RECOMMENDED_VOLUME = {
-    'strength': {
-        'Chest': 10000,  # Example values in kg
-        'Back': 12000,
-        'Legs': 15000,
-        # Add more body parts as needed
-    },
-    'muscle_growth': {
-        'Chest': 15000,
-        'Back': 18000,
-        'Legs': 20000,
-        # Add more body parts as needed
-    }
-}
 
-def get_recommended_volume(fitness_goal):
-    return RECOMMENDED_VOLUME.get(fitness_goal, {})
+def _use_columnar_engine():
+    """True if this request should be served by the NumPy engine (see analitics.py)"""
+    engine = request.args.get('engine') or current_app.config.get('METRICS_ENGINE', 'sql')
+    return engine == 'numpy'
+
+
+def _training_history():
+    """The current user's cached TrainingHistory (NumPy is only imported when used)"""
+    from .analitics import history_for
+    return history_for(current_user.user_id)
+
+
+def _prefix_sums():
+    """The current user's cached DailyPrefixSums"""
+    from .analitics import prefix_sums_for
+    return prefix_sums_for(current_user.user_id)
+
+
+def _bucket_count(start, end, bucket):
+    """Number of day, week (ISO) or month buckets start..end touches, partial ones included"""
+    if bucket == 'day':
+        return (end - start).days + 1
+    if bucket == 'week':
+        first_monday = start - timedelta(days=start.weekday())
+        last_monday = end - timedelta(days=end.weekday())
+        return (last_monday - first_monday).days // 7 + 1
+    return (end.year - start.year) * 12 + end.month - start.month + 1
+
+
+def _requested_range(default_days, default_bucket=None):
+    """
+    Read ?start=&end= (ISO dates, inclusive) and ?bucket= (day, week or
+    month) for ranged metrics. Returns None when none are given, so the
+    endpoint keeps its fixed window. Otherwise returns (start, end,
+    bucket, periods), where a missing end is today, a missing start is
+    default_days before end, and periods are bucket_periods() (one
+    unlabelled period when there is no bucket).
+
+    Raises ValueError with a client-facing message on invalid input.
+    """
+    from .analitics import BUCKETS, bucket_periods
+
+    if not any(request.args.get(arg) for arg in ('start', 'end', 'bucket')):
+        return None
+
+    try:
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else date.today()
+        start = (date.fromisoformat(request.args['start']) if request.args.get('start')
+                 else end - timedelta(days=default_days))
+    except ValueError:
+        raise ValueError('start and end must be dates in YYYY-MM-DD format')
+    except OverflowError:
+        raise ValueError('start is out of range')
+    if start > end:
+        raise ValueError('start must be on or before end')
+
+    bucket = request.args.get('bucket', default_bucket)
+    if bucket is None:
+        return start, end, None, [(None, start, end)]
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(BUCKETS)}")
+    if _bucket_count(start, end, bucket) > constants.MAX_METRIC_BUCKETS:
+        raise ValueError(f'At most {constants.MAX_METRIC_BUCKETS} buckets per request')
+    try:
+        periods = bucket_periods(start, end, bucket)
+    except (OverflowError, ValueError):
+        # The bucket after the last one would start past 9999-12-31
+        raise ValueError('end is out of range')
+    return start, end, bucket, periods
+
+
+def _range_payload(start, end, bucket, periods, values, name):
+    """The period, plus one value per bucket when the request was bucketed"""
+    payload = {'period': {'start': start.isoformat(), 'end': end.isoformat()}}
+    if bucket:
+        payload['buckets'] = {
+            'bucket': bucket,
+            'labels': [label for label, _, _ in periods],
+            name: values
+        }
+    return payload
+
+# Weekly goal achievement per (user_id, data version, ISO year, ISO week);
+# target edits bump the data version too
+goal_cache = LRUCache(maxsize=constants.GOAL_CACHE_SIZE)
+
+
+def _weekly_achievement(user, day):
+    """Cached TrainingTarget.weekly_achievement for the current user"""
+    iso_year, iso_week, _ = day.isocalendar()
+    cache_key = (user.user_id, UserDataVersion.get(user.user_id), iso_year, iso_week)
+    achievement = goal_cache.get(cache_key)
+    if achievement is None:
+        achievement = TrainingTarget.weekly_achievement(user, day)
+        goal_cache.set(cache_key, achievement)
+    return achievement
 
 
 @metrics_bp.route('/api/volume/')
 @login_required
-def metrics(user_id):
+def metrics():
     print("loading... volume")
     user = User.query.get(current_user.user_id)
 
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
-    # Get the volume per body part per week
-    volume_per_body_part = Exercise.get_volume_per_body_part_per_week(user_id)
-    volume_data = {body_part: volume for body_part, volume in volume_per_body_part}
-
-    # Get the recommended volume based on the user's fitness goal
-    recommended_volume = get_recommended_volume(user.fitness_goal.lower())
+    # This week's volume and the user's target per body part
+    achievement = _weekly_achievement(user, date.today())
 
     # Prepare data for Chart.js
-    labels = list(volume_data.keys())
-    actual_volumes = list(volume_data.values())
-    recommended_volumes = [recommended_volume.get(body_part, 0) for body_part in labels]
+    labels = [reference_catalog.body_part_name(body_part_id) for body_part_id in achievement]
+    actual_volumes = [volume for volume, _, _ in achievement.values()]
+    recommended_volumes = [target for _, target, _ in achievement.values()]
 
 
     print("done... volume")
@@ -56,49 +136,61 @@ def metrics(user_id):
 # Tracks how often the user has worked out in a given period.
 @metrics_bp.route('/api/consistency/', methods=['GET'])
 @login_required
+@etag_by_data_version
 def consistency():
+    """
+    Workout days in the last 30 days (or ?start=&end=, optionally per
+    ?bucket=), plus the current and longest streak.
+    """
     print("loading... consistency")
     
+    try:
+        requested = _requested_range(default_days=30)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    # Get workout dates for the last 30 days
     today = date.today()
-    start_date = today - timedelta(days=30)
-    workouts = Workout.query.filter(
-        Workout.user_id == current_user.user_id,
-        Workout.date >= start_date
-    ).all()
+    # Streak state is maintained on write, so this is a single-row read
+    streak_state = WorkoutStreak.for_user(current_user.user_id)
+
+    if requested:
+        start, end, bucket, periods = requested
+        prefix_sums = _prefix_sums()
+        workout_days = prefix_sums.workout_days(periods).tolist()
+        current_app.logger.debug("done... consistency")
+        return jsonify({
+            "workout_count": int(prefix_sums.workout_days([(None, start, end)])[0]),
+            "streak": streak_state.active_streak(today),
+            "longest_streak": streak_state.longest_streak,
+            **_range_payload(start, end, bucket, periods, workout_days, 'workout_count')
+        })
 
-    # Calculate workout frequency
-    workout_dates = {workout.date for workout in workouts}
-    streak = 0
-    for i in range(30):
-        if (today - timedelta(days=i)) in workout_dates:
-            streak += 1
-        else:
-            break
+    # Count workout days in the last 30 days (popcount of the day bitmap)
+    any_day = TrainingDayBitmap.ANY_BODY_PART
+    workout_count = TrainingDayBitmap.days_trained(
+        current_user.user_id, today - timedelta(days=30), today
+    ).get(any_day, 0)
 
     print("done... consistency")
 
     return jsonify({
-        "workout_count": len(workout_dates),
-        "streak": streak,
+        "workout_count": workout_count,
+        "streak": streak_state.active_streak(today),
+        "longest_streak": streak_state.longest_streak,
     })
 
 # Strength Progression Endpoint
 # Shows progression for key exercises.
 @metrics_bp.route('/api/progression/<exercise_name>', methods=['GET'])
 @login_required
+@etag_by_data_version
 def progression(exercise_name):
     print("loading... progression")
 
-    # Fetch progress for the given exercise
-    progress = db.session.query(
-        Exercise.date,
-        func.max(Exercise.weight).label('max_weight')
-    ).filter(
-        Exercise.user_id == current_user.user_id,
-        Exercise.exercise_name == exercise_name
-    ).group_by(Exercise.date).order_by(Exercise.date).all()
+    # One row per training day from the daily summary
+    progress = DailyExerciseSummary.progression_rows(current_user.user_id, exercise_names=[exercise_name])
+    first_key = progress[0].exercise_key if progress else None
+    progress = [p for p in progress if p.exercise_key == first_key]
 
     print("done... progression")
 
@@ -111,36 +203,43 @@ def progression(exercise_name):
 # Tracks the total volume lifted per week.
 @metrics_bp.route('/api/volume-trend/', methods=['GET'])
 @login_required
+@etag_by_data_version
 def volume_trend():
+    """
+    Total volume per ISO week for the past 8 weeks, or per ?bucket= (day,
+    week or month; default week) between ?start= and ?end=.
+    """
     print("loading... volume trend")
     
-    # Calculate weekly volume for the past 8 weeks
+    try:
+        requested = _requested_range(default_days=8 * 7, default_bucket='week')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if requested:
+        start, end, bucket, periods = requested
+        volumes = _prefix_sums().volume(periods).tolist()
+        current_app.logger.debug("done... volume trend")
+        return jsonify({
+            "bucket": bucket,
+            "labels": [label for label, _, _ in periods],
+            "volumes": volumes,
+            "period": {"start": start.isoformat(), "end": end.isoformat()}
+        })
+
+    # Weekly volume for the past 8 weeks, from the weekly rollup
     past_8_weeks = date.today() - timedelta(weeks=8)
+    if _use_columnar_engine():
+        current_app.logger.debug("done... volume trend")
+        return jsonify(_training_history().weekly_volume(past_8_weeks))
     
-    # Using extract() for more database-agnostic week calculation
-    volume_data = db.session.query(
-        extract('year', Workout.date).label('year'),
-        extract('week', Workout.date).label('week'),
-        func.sum(Exercise.weight * Exercise.reps * Exercise.sets).label('total_volume')
-    ).join(
-        Exercise,
-        Workout.workout_id == Exercise.workout_id
-    ).filter(
-        Workout.user_id == current_user.user_id,
-        Workout.date >= past_8_weeks
-    ).group_by(
-        'year',
-        'week'
-    ).order_by(
-        'year',
-        'week'
-    ).all()
+    volume_data = WeeklyVolume.weekly_totals(current_user.user_id, past_8_weeks)
     
     print("done... volume trend")
     
     # Format the response data
     formatted_data = [{
-        'week': f"{row.year}-{row.week:02d}",
+        'week': f"{row.iso_year}-{row.iso_week:02d}",
         'volume': float(row.total_volume) if row.total_volume else 0
     } for row in volume_data]
     
@@ -154,33 +253,32 @@ def volume_trend():
 # Displays percentage distribution of training volume by body part.
 @metrics_bp.route('/api/body-part-imbalance/', methods=['GET'])
 @login_required
+@etag_by_data_version
 def body_part_imbalance():
     try:
         print("loading... body part imbalance")
         
+        try:
+            requested = _requested_range(default_days=30)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if requested:
+            current_app.logger.debug("done... body part imbalance")
+            return jsonify(_ranged_imbalance(*requested))
+
         # Get data for the last 30 days by default
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=30)
         
-        # Aggregate volume per body part using proper joins through Workout table
-        volume_data = db.session.query(
-            BodyPart.body_part_name,
-            func.coalesce(
-                func.sum(Exercise.weight * Exercise.reps * Exercise.sets),
-                0
-            ).label('total_volume')
-        ).join(
-            Exercise,
-            Exercise.body_part_id == BodyPart.body_part_id
-        ).join(
-            Workout,
-            Exercise.workout_id == Workout.workout_id
-        ).filter(
-            Workout.user_id == current_user.user_id,
-            Workout.date.between(start_date, end_date)
-        ).group_by(
-            BodyPart.body_part_name
-        ).all()
+        if _use_columnar_engine():
+            history = _training_history()
+            current_app.logger.debug("done... body part imbalance")
+            return jsonify(history.imbalance(WeeklyVolume.week_start_of(start_date), end_date))
+
+        # Volume per body part from the weekly rollup (whole ISO weeks
+        # overlapping the period)
+        volume_data = WeeklyVolume.body_part_totals(current_user.user_id, start_date, end_date)
 
         # Calculate percentages with error handling for zero total volume
         total_volume = sum(float(v.total_volume) for v in volume_data)
@@ -198,13 +296,10 @@ def body_part_imbalance():
             for v in volume_data
         }
 
-        # Get all body parts to ensure we include ones with no volume
-        all_body_parts = db.session.query(BodyPart.body_part_name).all()
-        
-        # Create complete response with 0% for unused body parts
+        # Include every body part (from the in-memory catalog) with 0% for unused ones
         complete_percentages = {
-            body_part[0]: percentages.get(body_part[0], 0)
-            for body_part in all_body_parts
+            body_part: percentages.get(body_part, 0)
+            for body_part in reference_catalog.body_part_names()
         }
 
         print("done... body part imbalance")
@@ -213,7 +308,7 @@ def body_part_imbalance():
             'data': complete_percentages,
             'total_volume': total_volume,
             'period': {
-                'start': start_date.isoformat(),
+                'start': WeeklyVolume.week_start_of(start_date).isoformat(),
                 'end': end_date.isoformat()
             }
         })
@@ -225,44 +320,235 @@ def body_part_imbalance():
             'message': str(e)
         }), 500
 
+def _ranged_imbalance(start, end, bucket, periods):
+    """body_part_imbalance for an exact date range, from the daily prefix sums"""
+    prefix_sums = _prefix_sums()
+    totals = {
+        body_part: float(volume[0])
+        for body_part, volume in prefix_sums.body_part_volume([(None, start, end)]).items()
+    }
+    total_volume = sum(totals.values())
+    if total_volume == 0:
+        return {
+            'error': 'No workout data found for the specified period',
+            'data': {},
+            'total_volume': 0
+        }
+
+    body_parts = reference_catalog.body_part_names()
+    payload = {
+        'data': {
+            body_part: round(totals.get(body_part, 0) / total_volume * 100, 2)
+            for body_part in body_parts
+        },
+        'total_volume': total_volume
+    }
+
+    per_bucket = None
+    if bucket:
+        volumes = {
+            body_part: volume.tolist()
+            for body_part, volume in prefix_sums.body_part_volume(periods).items()
+        }
+        bucket_totals = [sum(bucket_volumes) for bucket_volumes in zip(*volumes.values())]
+        per_bucket = {
+            body_part: [
+                round(volume / bucket_total * 100, 2) if bucket_total else 0
+                for volume, bucket_total in zip(volumes.get(body_part, [0] * len(periods)), bucket_totals)
+            ]
+            for body_part in body_parts
+        }
+    payload.update(_range_payload(start, end, bucket, periods, per_bucket, 'data'))
+    return payload
+
+
+@metrics_bp.route('/api/training-calendar', methods=['GET'])
+@login_required
+@etag_by_data_version
+def training_calendar():
+    """
+    Year-long training calendar (?year=, default this year): body parts
+    trained per day, days trained per body part, and the year's longest
+    streak. Read from the user's training-day bitmaps for that year.
+    """
+    year = request.args.get('year', date.today().year, type=int)
+    if not 1900 <= year <= 9999:
+        return jsonify({'error': 'Invalid year'}), 400
+    current_app.logger.debug(f"loading... training calendar {year}")
+
+    start = date(year, 1, 1)
+    bitmaps = TrainingDayBitmap.day_bits(current_user.user_id, start, date(year, 12, 31))
+    any_day = TrainingDayBitmap.ANY_BODY_PART
+    all_days = bitmaps.pop(any_day, 0)
+
+    days = {}
+    body_parts = {}
+    for body_part_id, bits in bitmaps.items():
+        body_part = reference_catalog.body_part_name(body_part_id)
+        body_parts[body_part] = bits.bit_count()
+        while bits:
+            # Walk the set bits lowest first
+            low_bit = bits & -bits
+            day = (start + timedelta(days=low_bit.bit_length() - 1)).isoformat()
+            days.setdefault(day, []).append(body_part)
+            bits ^= low_bit
+
+    current_app.logger.debug(f"done... training calendar {year}")
+    return jsonify({
+        'year': year,
+        'days_trained': all_days.bit_count(),
+        'longest_streak': TrainingDayBitmap.longest_run(all_days),
+        'body_parts': body_parts,
+        'days': dict(sorted(days.items()))
+    })
+
+
 # Goal Achievement Rate Endpoint
 # Shows the percentage of the weekly goal achieved.
 @metrics_bp.route('/api/goal-achievement/', methods=['GET'])
 @login_required
+@etag_by_data_version
 def goal_achievement():
     print("loading... goal achivement")
     user = User.query.get(current_user.user_id)
-    fitness_goal = user.fitness_goal.lower()
-    recommended_volume = get_recommended_volume(fitness_goal)
 
-    # Get weekly volume per body part
-    weekly_volume = Exercise.get_volume_per_body_part_per_week(current_user.user_id)
-    achievement = {body_part: (weekly_volume.get(body_part, 0) / recommended_volume.get(body_part, 1)) * 100
-                   for body_part in recommended_volume.keys()}
+    # Percent of this week's target reached, for every targeted body part
+    achievement = {
+        reference_catalog.body_part_name(body_part_id): round(percent, 1)
+        for body_part_id, (_, _, percent) in _weekly_achievement(user, date.today()).items()
+    }
     print("done... goal achivement")
     return jsonify(achievement)
 
 
+@metrics_bp.route('/api/training-targets', methods=['GET'])
+@login_required
+@etag_by_data_version
+def get_training_targets():
+    """
+    Get the user's weekly volume targets per body part, and whether each
+    was set explicitly or seeded from the fitness goal and activity level.
+    """
+    user = User.query.get(current_user.user_id)
+    targets = TrainingTarget.for_user(user)
+    custom = {
+        target.body_part_id for target in TrainingTarget.query.filter_by(
+            user_id=user.user_id, is_custom=True
+        )
+    }
+    return jsonify({
+        'fitness_goal': user.fitness_goal,
+        'activity_level': user.activity_level,
+        'targets': {
+            reference_catalog.body_part_name(body_part_id): {
+                'weekly_volume': weekly_volume,
+                'is_custom': body_part_id in custom
+            }
+            for body_part_id, weekly_volume in targets.items()
+        }
+    })
+
+
+@metrics_bp.route('/api/training-targets', methods=['PUT'])
+@login_required
+def update_training_targets():
+    """
+    Set explicit weekly volume targets: {"targets": {"Chest": 12000, ...}}.
+    A null volume drops that body part's target (a later goal or
+    activity level change seeds it again). {"reset": true} drops
+    all explicit targets and re-seeds from the profile.
+    """
+    data = request.get_json() or {}
+    user = User.query.get(current_user.user_id)
+    
+    if data.get('reset'):
+        TrainingTarget.query.filter_by(user_id=user.user_id).delete(synchronize_session=False)
+        TrainingTarget.seed(user)
+    else:
+        targets = data.get('targets')
+        if not isinstance(targets, dict) or not targets:
+            return jsonify({'error': 'targets must map body part names to weekly volumes'}), 400
+        
+        volumes = {}
+        for body_part_name, weekly_volume in targets.items():
+            body_part_id = reference_catalog.body_part_id(body_part_name)
+            if body_part_id is None:
+                return jsonify({'error': f'Invalid body part: {body_part_name}'}), 400
+            if weekly_volume is not None:
+                try:
+                    weekly_volume = float(weekly_volume)
+                except (TypeError, ValueError):
+                    return jsonify({'error': f'Invalid target for {body_part_name}'}), 400
+                if not math.isfinite(weekly_volume):
+                    return jsonify({'error': f'Invalid target for {body_part_name}'}), 400
+                if weekly_volume <= 0:
+                    return jsonify({'error': f'Target for {body_part_name} must be positive'}), 400
+            volumes[body_part_id] = weekly_volume
+        TrainingTarget.set_custom(user, volumes)
+    
+    # Targets feed cached goal results, so they invalidate like a data write
+    UserDataVersion.bump(user.user_id)
+    db.session.commit()
+    
+    current_app.logger.info(f"User {user.user_id} updated training targets")
+    return jsonify({'success': True}), 200
+
+
 # Rest Efficiency Endpoint
 # Tracks average rest time between sets.
 @metrics_bp.route('/api/rest-efficiency/', methods=['GET'])
 @login_required
+@etag_by_data_version
 def rest_efficiency():
-    # Fetch rest time for the past week
+    """
+    Average, median and 90th percentile rest between sets per day for the
+    past week (or ?start=&end=), plus the same over the whole period.
+    Read from the maintained daily rest summaries.
+    """
     print("loading... rest efficinecy")
-    rest_times = db.session.query(
-        Exercise.date,
-        func.avg(Exercise.rest_time).label('avg_rest')
-    ).filter(
-        Exercise.user_id == current_user.user_id,
-        Exercise.date >= date.today() - timedelta(days=7)
-    ).group_by(Exercise.date).all()
+    try:
+        requested = _requested_range(default_days=7)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if requested:
+        start, end = requested[0], requested[1]
+    else:
+        end = date.today()
+        start = end - timedelta(days=7)
+
+    summaries = DailyRestSummary.query.filter(
+        DailyRestSummary.user_id == current_user.user_id,
+        DailyRestSummary.date >= start,
+        DailyRestSummary.date <= end
+    ).order_by(DailyRestSummary.date).all()
+
+    # Histograms add up, so the period's percentiles come from their sum
+    period_counts = DailyRestSummary.empty_histogram()
+    medians, p90s = [], []
+    for summary in summaries:
+        counts = DailyRestSummary.unpack(summary.histogram)
+        period_counts = [total + count for total, count in zip(period_counts, counts)]
+        medians.append(round(DailyRestSummary.percentile(counts, 0.5), 1))
+        p90s.append(round(DailyRestSummary.percentile(counts, 0.9), 1))
+
+    rest_sets = sum(s.rest_sets for s in summaries)
+    median = DailyRestSummary.percentile(period_counts, 0.5)
+    p90 = DailyRestSummary.percentile(period_counts, 0.9)
 
     print("done... rest efficinecy")
 
     return jsonify({
-        "dates": [r.date.strftime('%Y-%m-%d') for r in rest_times],
-        "average_rest_times": [r.avg_rest for r in rest_times]
+        "dates": [s.date.strftime('%Y-%m-%d') for s in summaries],
+        "average_rest_times": [round(s.rest_seconds / s.rest_sets, 1) for s in summaries],
+        "median_rest_times": medians,
+        "p90_rest_times": p90s,
+        "overall": {
+            "sets": rest_sets,
+            "average_rest_time": round(sum(s.rest_seconds for s in summaries) / rest_sets, 1) if rest_sets else None,
+            "median_rest_time": round(median, 1) if median is not None else None,
+            "p90_rest_time": round(p90, 1) if p90 is not None else None
+        },
+        "period": {"start": start.isoformat(), "end": end.isoformat()}
     })
 
 
@@ -270,23 +556,74 @@ def rest_efficiency():
 # Tracks the number of unique exercises performed.
 @metrics_bp.route('/api/workout-diversity/', methods=['GET'])
 @login_required
+@etag_by_data_version
 def workout_diversity():
-    # Fetch unique exercises performed in the last month
+    """
+    Distinct exercises performed in the last 30 days (or ?start=&end=,
+    optionally per ?bucket=).
+    """
     print("loading... workout diversity")
+    try:
+        requested = _requested_range(default_days=30)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if requested:
+        start, end, bucket, periods = requested
+        prefix_sums = _prefix_sums()
+        counts = prefix_sums.distinct_exercises(periods).tolist()
+        current_app.logger.debug("done... workout diversity")
+        return jsonify({
+            "unique_exercises": int(prefix_sums.distinct_exercises([(None, start, end)])[0]),
+            **_range_payload(start, end, bucket, periods, counts, 'unique_exercises')
+        })
+
+    # Fetch unique exercises performed in the last month
     start_date = date.today() - timedelta(days=30)
+    if _use_columnar_engine():
+        current_app.logger.debug("done... workout diversity")
+        return jsonify(_training_history().diversity(start_date))
+
     unique_exercises = db.session.query(
-        Exercise.exercise_name
+        Exercise.exercise_key_expr()
     ).filter(
         Exercise.user_id == current_user.user_id,
-        Exercise.date >= start_date
+        Exercise.date >= start_date,
+        (Exercise.standard_exercise_id.isnot(None)) | (Exercise.custom_exercise_id.isnot(None))
     ).distinct().count()
     print("done... workout diversity")
     return jsonify({"unique_exercises": unique_exercises})
 
 
 # Exercise Progression Tracking Endpoints
+def _progression_payload(exercise_name, rows):
+    """Format one exercise's per-day progression rows for charting"""
+    dates = [p.date.strftime('%Y-%m-%d') for p in rows]
+    max_weights = [float(p.max_weight) if p.max_weight else 0 for p in rows]
+    volumes = [float(p.total_volume) if p.total_volume else 0 for p in rows]
+    estimated_1rms = [round(float(p.best_e1rm), 1) if p.best_e1rm else 0 for p in rows]
+    
+    # Calculate personal record
+    pr_weight = max(max_weights) if max_weights else 0
+    pr_date = dates[max_weights.index(pr_weight)] if max_weights else None
+    
+    return {
+        'exercise_name': exercise_name,
+        'dates': dates,
+        'max_weights': max_weights,
+        'volumes': volumes,
+        'estimated_1rms': estimated_1rms,
+        'personal_record': {
+            'weight': pr_weight,
+            'date': pr_date
+        },
+        'total_sessions': len(dates)
+    }
+
+
 @metrics_bp.route('/api/exercise-progression/<exercise_name>', methods=['GET'])
 @login_required
+@etag_by_data_version
 def get_exercise_progression(exercise_name):
     """
     Get progression data for a specific exercise (max weight over time).
@@ -295,46 +632,15 @@ def get_exercise_progression(exercise_name):
     print(f"loading... progression for {exercise_name}")
     
     try:
-        # Get progression data for the exercise
-        # Query for max weight per date
-        progression_data = db.session.query(
-            Exercise.date,
-            func.max(Exercise.weight).label('max_weight'),
-            func.sum(Exercise.weight * Exercise.reps * Exercise.sets).label('total_volume')
-        ).join(
-            StandardExercise,
-            Exercise.standard_exercise_id == StandardExercise.standard_exercise_id
-        ).filter(
-            Exercise.user_id == current_user.user_id,
-            StandardExercise.exercise_name == exercise_name
-        ).group_by(
-            Exercise.date
-        ).order_by(
-            Exercise.date
-        ).all()
-        
-        # Format the response
-        dates = [p.date.strftime('%Y-%m-%d') for p in progression_data]
-        max_weights = [float(p.max_weight) if p.max_weight else 0 for p in progression_data]
-        volumes = [float(p.total_volume) if p.total_volume else 0 for p in progression_data]
-        
-        # Calculate personal record
-        pr_weight = max(max_weights) if max_weights else 0
-        pr_date = dates[max_weights.index(pr_weight)] if max_weights else None
+        if _use_columnar_engine():
+            current_app.logger.debug(f"done... progression for {exercise_name}")
+            return jsonify(_training_history().progression(exercise_name))
         
+        rows = DailyExerciseSummary.progression_rows(current_user.user_id, exercise_names=[exercise_name])
+        first_key = rows[0].exercise_key if rows else None
+        rows = [row for row in rows if row.exercise_key == first_key]
         print(f"done... progression for {exercise_name}")
-        
-        return jsonify({
-            'exercise_name': exercise_name,
-            'dates': dates,
-            'max_weights': max_weights,
-            'volumes': volumes,
-            'personal_record': {
-                'weight': pr_weight,
-                'date': pr_date
-            },
-            'total_sessions': len(dates)
-        })
+        return jsonify(_progression_payload(exercise_name, rows))
         
     except Exception as e:
         print(f"Error getting progression for {exercise_name}: {str(e)}")
@@ -344,13 +650,97 @@ def get_exercise_progression(exercise_name):
             'dates': [],
             'max_weights': [],
             'volumes': [],
+            'estimated_1rms': [],
             'personal_record': {'weight': 0, 'date': None},
             'total_sessions': 0
         }), 500
 
 
+@metrics_bp.route('/api/exercise-progression', methods=['GET'])
+@login_required
+@etag_by_data_version
+def get_exercise_progressions():
+    """
+    Get progression data for several exercises in one request.
+    Exercises are selected with repeated ?name= and/or ?id= (standard
+    exercise id) parameters; every requested exercise gets an entry,
+    empty if the user has not logged it.
+    """
+    names = [n.strip() for n in request.args.getlist('name') if n.strip()]
+    try:
+        ids = [int(i) for i in request.args.getlist('id')]
+    except ValueError:
+        return jsonify({'error': 'Exercise ids must be integers'}), 400
+    
+    if not names and not ids:
+        return jsonify({'error': 'At least one name or id is required'}), 400
+    if len(names) + len(ids) > constants.MAX_PROGRESSION_EXERCISES:
+        return jsonify({
+            'error': f'At most {constants.MAX_PROGRESSION_EXERCISES} exercises per request'
+        }), 400
+    
+    current_app.logger.debug(f"loading... progression for {len(names) + len(ids)} exercises")
+    
+    try:
+        rows = DailyExerciseSummary.progression_rows(
+            current_user.user_id, exercise_names=names, standard_exercise_ids=ids
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error getting batch progression: {str(e)}")
+        return jsonify({'error': f'Failed to load progression data: {str(e)}'}), 500
+    
+    # Rows arrive grouped per exercise, standard exercises first, so a name
+    # shared with a custom exercise resolves to the standard one
+    by_key = {}
+    key_by_name = {}
+    key_by_id = {}
+    for row in rows:
+        by_key.setdefault(row.exercise_key, []).append(row)
+        key_by_name.setdefault(row.exercise_name, row.exercise_key)
+        if row.standard_exercise_id:
+            key_by_id[row.standard_exercise_id] = row.exercise_key
+    
+    exercises = {}
+    for name in names:
+        exercises[name] = _progression_payload(name, by_key.get(key_by_name.get(name), []))
+    for exercise_id in ids:
+        exercise = reference_catalog.standard_exercise(exercise_id)
+        name = exercise.exercise_name if exercise else str(exercise_id)
+        exercises[name] = _progression_payload(name, by_key.get(key_by_id.get(exercise_id), []))
+    
+    current_app.logger.debug(f"done... progression for {len(exercises)} exercises")
+    
+    return jsonify({'exercises': exercises})
+
+
+@metrics_bp.route('/api/strength-curve/<exercise_name>', methods=['GET'])
+@login_required
+@etag_by_data_version
+def get_strength_curve(exercise_name):
+    """
+    Get estimated 1RM per session, rolling best e1RM and a rep-max table
+    for an exercise. ?formula= selects the headline estimate (epley,
+    brzycki or lombardi; default epley). Always served by the columnar
+    engine and cached per user data version.
+    """
+    from .analitics import E1RM_FORMULAS
+    
+    formula = request.args.get('formula', 'epley').lower()
+    if formula not in E1RM_FORMULAS:
+        return jsonify({
+            'error': f"Unknown formula '{formula}'. Choose one of: {', '.join(sorted(E1RM_FORMULAS))}"
+        }), 400
+    
+    current_app.logger.debug(f"loading... strength curve for {exercise_name}")
+    curve = _training_history().strength_curve(exercise_name, formula)
+    current_app.logger.debug(f"done... strength curve for {exercise_name}")
+    
+    return jsonify(curve)
+
+
 @metrics_bp.route('/api/tracked-exercises', methods=['GET'])
 @login_required
+@etag_by_data_version
 def get_tracked_exercises():
     """
     Get list of exercises the user wants to track.
@@ -363,7 +753,7 @@ def get_tracked_exercises():
     # For now, return defaults plus check which exercises user has actually performed
     user_exercises = db.session.query(
         StandardExercise.exercise_name,
-        func.count(Exercise.exercise_id).label('session_count'),
+        func.sum(Exercise.sets).label('session_count'),
         func.max(Exercise.date).label('last_performed')
     ).join(
         Exercise,
@@ -373,9 +763,9 @@ def get_tracked_exercises():
     ).group_by(
         StandardExercise.exercise_name
     ).having(
-        func.count(Exercise.exercise_id) >= 2  # At least 2 sessions to show progression
+        func.sum(Exercise.sets) >= 2  # At least 2 sessions to show progression
     ).order_by(
-        func.count(Exercise.exercise_id).desc()
+        func.sum(Exercise.sets).desc()
     ).all()
     
     tracked = []
@@ -395,6 +785,7 @@ def get_tracked_exercises():
 
 @metrics_bp.route('/api/available-exercises', methods=['GET'])
 @login_required
+@etag_by_data_version
 def get_available_exercises():
     """
     Get list of all available exercises that can be tracked.
@@ -403,7 +794,7 @@ def get_available_exercises():
     exercises = db.session.query(
         StandardExercise.exercise_name,
         BodyPart.body_part_name,
-        func.count(Exercise.exercise_id).label('times_performed')
+        func.sum(Exercise.sets).label('times_performed')
     ).join(
         Exercise,
         Exercise.standard_exercise_id == StandardExercise.standard_exercise_id
@@ -437,6 +828,7 @@ def get_available_exercises():
 
 @metrics_bp.route('/api/body-part-balance')
 @login_required
+@etag_by_data_version
 def body_part_balance():
     """
     Analyze workout balance across body parts over the last 7 days.
@@ -445,25 +837,21 @@ def body_part_balance():
     # Get last 7 days of workouts
     seven_days_ago = datetime.now() - timedelta(days=7)
     
-    # Query to get workout frequency per body part
-    body_part_frequency = db.session.query(
-        BodyPart.body_part_name,
-        func.count(func.distinct(func.date(Exercise.date))).label('days_worked')
-    ).join(
-        Exercise, Exercise.body_part_id == BodyPart.body_part_id
-    ).filter(
-        Exercise.user_id == current_user.user_id,
-        Exercise.date >= seven_days_ago.date()
-    ).group_by(
-        BodyPart.body_part_name
-    ).all()
+    if _use_columnar_engine():
+        frequency_map = _training_history().balance_frequency(seven_days_ago.date())
+    else:
+        # Days trained per body part, as popcounts of the training-day bitmaps
+        days_trained = TrainingDayBitmap.days_trained(
+            current_user.user_id, seven_days_ago.date(), date.today()
+        )
+        frequency_map = {
+            reference_catalog.body_part_name(body_part_id): days
+            for body_part_id, days in days_trained.items()
+            if body_part_id != TrainingDayBitmap.ANY_BODY_PART
+        }
     
     # Get all body parts for reference
-    all_body_parts = db.session.query(BodyPart.body_part_name).all()
-    all_body_part_names = {bp.body_part_name for bp in all_body_parts}
-    
-    # Build frequency map
-    frequency_map = {bp.body_part_name: bp.days_worked for bp in body_part_frequency}
+    all_body_part_names = reference_catalog.body_part_names()
     
     # Analyze and categorize body parts
     overworked = []  # 4+ days in last 7 days
@@ -0,0 +1,123 @@
+"""
+Production serving for `python -m app` (FLASK_ENV=production).
+
+Runs the app under Gunicorn's pre-fork arbiter instead of Werkzeug's
+development server:
+
+- a pool of worker processes (WEB_CONCURRENCY, default 2 per CPU plus one,
+  capped at WEB_MAX_WORKERS), each with WEB_THREADS request threads
+- the app is created once in the master (preload) and shared by the forked
+  workers; each worker drops the inherited database pool after the fork
+- workers are recycled after WEB_MAX_REQUESTS requests (plus jitter, so
+  they do not all restart together)
+- SIGTERM stops accepting connections and lets in-flight requests finish
+  for up to WEB_GRACEFUL_TIMEOUT seconds before workers exit
+- each worker runs its own log listener (see logging_config), flushed
+  when the worker exits
+"""
+
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from . import constants
+
+
+def _env_int(name, default):
+    """Read a positive integer setting from the environment"""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+    if number < 1:
+        raise ValueError(f"{name} must be at least 1, got {number}")
+    return number
+
+
+def _available_cpus():
+    """CPUs this process may run on (respects container CPU affinity)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_workers():
+    """Worker count when WEB_CONCURRENCY is unset: 2 per CPU plus one, capped"""
+    return min(
+        _available_cpus() * constants.WEB_WORKERS_PER_CPU + 1,
+        constants.WEB_MAX_WORKERS
+    )
+
+
+def server_options(port):
+    """Gunicorn settings for the production server, from env and constants"""
+    max_requests = _env_int('WEB_MAX_REQUESTS', constants.WEB_MAX_REQUESTS)
+    return {
+        'bind': f"0.0.0.0:{port}",
+        'workers': _env_int('WEB_CONCURRENCY', default_workers()),
+        'worker_class': 'gthread',
+        'threads': _env_int('WEB_THREADS', constants.WEB_THREADS),
+        'preload_app': True,
+        'max_requests': max_requests,
+        'max_requests_jitter': max(max_requests // 10, 1),
+        'timeout': _env_int('WEB_TIMEOUT', constants.WEB_TIMEOUT),
+        'graceful_timeout': _env_int('WEB_GRACEFUL_TIMEOUT', constants.WEB_GRACEFUL_TIMEOUT),
+        'keepalive': constants.WEB_KEEPALIVE,
+        # Requests are already logged by logging_config.log_request_info
+        'accesslog': None,
+        'errorlog': '-',
+    }
+
+
+class ProductionServer(BaseApplication):
+    """Gunicorn application serving an already-created Flask app"""
+
+    def __init__(self, app, options):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set('post_fork', self._post_fork)
+        self.cfg.set('worker_exit', self._worker_exit)
+
+    def load(self):
+        return self.application
+
+    def _post_fork(self, server, worker):
+        """Give each worker its own database connections and log listener"""
+        from .logging_config import restart_log_listener
+        from .models import db
+
+        restart_log_listener()
+
+        # Connections opened in the master (table checks, warm-up) must not be
+        # shared across processes; close=False leaves the master's sockets alone
+        with self.application.app_context():
+            db.engine.dispose(close=False)
+        server.log.info(f"Worker {worker.pid} ready")
+
+    def _worker_exit(self, server, worker):
+        """Write out the worker's queued log records before it exits"""
+        from .logging_config import log_queue_stats, stop_log_listener
+
+        stats = log_queue_stats()
+        stop_log_listener()
+        if stats['dropped']:
+            server.log.warning(f"Worker {worker.pid} dropped {stats['dropped']} log records")
+
+
+def serve(app, port):
+    """Serve `app` on `port` with the pre-fork worker pool until shut down"""
+    options = server_options(port)
+    app.logger.info(
+        f"Starting production server on port {port}: {options['workers']} workers x "
+        f"{options['threads']} threads, recycled every ~{options['max_requests']} requests"
+    )
+    ProductionServer(app, options).run()
@@ -0,0 +1,130 @@
+"""
+Fingerprinted, precompressed static files (built by build_static.py).
+
+build_static.py copies each file in static/ to static/dist/ under a
+content-hashed name, writes .gz/.br siblings and records them in
+static/dist/manifest.json. With STATIC_FINGERPRINT on (the production
+default) and a manifest present:
+
+- url_for('static', filename='repLogger.js') returns the hashed URL, so a
+  changed file always gets a new URL and browsers never revalidate
+- hashed files are sent with Cache-Control: public, max-age=1y, immutable,
+  as the .br or .gz sibling when the client accepts it
+- files missing from the manifest are served by Flask as before
+
+Templates get `tailwind_built`: use the vendored static/tailwind.css when
+the build produced it, the Tailwind CDN otherwise.
+"""
+
+import json
+import mimetypes
+import os
+
+from . import constants
+from .compression import negotiate_encoding
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+TAILWIND_CSS = 'tailwind.css'
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+class StaticManifest:
+    """
+    Logical static filenames mapped to their fingerprinted copies:
+    {'repLogger.js': {'path': 'dist/repLogger.1a2b3c4d5e.js', 'encodings': ['br', 'gzip']}}
+    """
+
+    def __init__(self, files=None):
+        self.files = files or {}
+        self._by_path = {entry['path']: entry for entry in self.files.values()}
+
+    @classmethod
+    def load(cls, static_folder):
+        """Read static/dist/manifest.json; an empty manifest if it was never built"""
+        try:
+            with open(os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)) as manifest_file:
+                return cls(json.load(manifest_file)['files'])
+        except FileNotFoundError:
+            return cls()
+
+    def __bool__(self):
+        return bool(self.files)
+
+    def hashed_path(self, filename):
+        """Fingerprinted path for a logical filename, or None if not built"""
+        entry = self.files.get(filename)
+        return entry['path'] if entry else None
+
+    def encodings(self, path):
+        """Precompressed encodings of a fingerprinted path, or None if it is not one"""
+        entry = self._by_path.get(path)
+        return entry['encodings'] if entry else None
+
+
+def send_fingerprinted(static_folder, path, encodings):
+    """Send a fingerprinted file, precompressed when the client accepts it, cached for good"""
+    from flask import request, send_from_directory
+
+    encoding = negotiate_encoding(request.accept_encodings, encodings) if encodings else None
+    response = send_from_directory(
+        static_folder,
+        path + ENCODING_SUFFIXES[encoding] if encoding else path,
+        mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+        max_age=constants.STATIC_MAX_AGE_SECONDS
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_static_assets(app):
+    """
+    Load the static manifest and hook it into url_for and the static route.
+    """
+    env = os.getenv('FLASK_ENV', 'development')
+    app.config.setdefault(
+        'STATIC_FINGERPRINT',
+        os.getenv('STATIC_FINGERPRINT', 'true' if env == 'production' else 'false').lower() == 'true'
+    )
+    app.config.setdefault(
+        'TAILWIND_BUILT',
+        os.path.isfile(os.path.join(app.static_folder, TAILWIND_CSS))
+    )
+
+    manifest = StaticManifest.load(app.static_folder) if app.config['STATIC_FINGERPRINT'] else StaticManifest()
+    app.extensions['static_manifest'] = manifest
+    if manifest:
+        app.logger.info(f"Static assets: {len(manifest.files)} fingerprinted files")
+    elif app.config['STATIC_FINGERPRINT']:
+        app.logger.warning("STATIC_FINGERPRINT is on but static/dist is not built (run python build_static.py)")
+    if not app.config['TAILWIND_BUILT']:
+        app.logger.info("Tailwind: static/tailwind.css not built, pages use the Tailwind CDN")
+
+    @app.context_processor
+    def static_asset_context():
+        return {'tailwind_built': app.config['TAILWIND_BUILT']}
+
+    if not manifest:
+        return
+
+    @app.url_defaults
+    def fingerprint_static_url(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            hashed = manifest.hashed_path(values['filename'].lstrip('/'))
+            if hashed:
+                values['filename'] = hashed
+
+    send_static_file = app.view_functions['static']
+
+    def static(filename):
+        encodings = manifest.encodings(filename)
+        if encodings is None:
+            return send_static_file(filename=filename)
+        return send_fingerprinted(app.static_folder, filename, encodings)
+
+    app.view_functions['static'] = static
@@ -234,6 +234,29 @@ def validate_date_string(date_str: str) -> Tuple[bool, str]:
     return True, ""
 
 
+def validate_workout_date(date_str: str) -> Tuple[bool, str]:
+    """
+    Validate a workout date: a valid YYYY-MM-DD date from 1900 up to a year
+    from today (the date fields only have day precision and no time zone).
+    
+    Returns:
+        (bool, str): (is_valid, error_message)
+    """
+    is_valid, error = validate_date_string(date_str)
+    if not is_valid:
+        return is_valid, error
+    
+    from datetime import date, timedelta
+    workout_date = date.fromisoformat(date_str)
+    if workout_date.year < 1900:
+        return False, "Date must be in 1900 or later"
+    
+    if workout_date > date.today() + timedelta(days=366):  # Planned workouts, at most a year ahead
+        return False, "Date is too far in the future"
+    
+    return True, ""
+
+
 def sanitize_input(text: str, max_length: int = 255, allow_special_chars: bool = False) -> str:
     """
     Sanitize user input by stripping whitespace and limiting length.
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Build the production static assets (served by app/static_assets.py).
+
+1. Compile Tailwind for the classes the templates and scripts use into a
+   minified static/tailwind.css, so pages no longer load the Tailwind CDN
+   script and compile styles in the browser. Needs the Tailwind CLI: the
+   standalone `tailwindcss` binary (see the Dockerfile), TAILWIND_CLI, or
+   `npx tailwindcss`.
+2. Copy each file in static/ to static/dist/ under a content-hashed name
+   (repLogger.js -> dist/repLogger.1a2b3c4d5e.js).
+3. Write .gz and, with the brotli package installed, .br siblings for
+   text files, kept only when smaller than the original.
+4. Write static/dist/manifest.json.
+
+Run it after changing anything in static/ or the templates' classes.
+
+Usage:
+    python build_static.py                  # full build
+    python build_static.py --skip-tailwind  # fingerprint and compress only
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+
+from app import constants
+from app.compression import available_encodings, compress_bytes
+from app.static_assets import DIST_DIR, MANIFEST_NAME, TAILWIND_CSS, ENCODING_SUFFIXES
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+TAILWIND_CONFIG = os.path.join('static', 'tailwind.config.js')
+TAILWIND_INPUT = os.path.join('static', 'tailwind.input.css')
+
+# Build inputs that are never served
+BUILD_ONLY = {'tailwind.config.js', 'tailwind.input.css'}
+
+
+def tailwind_command():
+    """The Tailwind CLI to run, as an argument list, or None if none is installed"""
+    if os.getenv('TAILWIND_CLI'):
+        return shlex.split(os.getenv('TAILWIND_CLI'))
+    if shutil.which('tailwindcss'):
+        return ['tailwindcss']
+    if shutil.which('npx'):
+        return ['npx', '--yes', 'tailwindcss@3']
+    return None
+
+
+def build_tailwind():
+    """Compile and minify static/tailwind.css"""
+    command = tailwind_command()
+    if command is None:
+        print("❌ Tailwind CLI not found. Install the standalone tailwindcss binary,")
+        print("   set TAILWIND_CLI, or run with --skip-tailwind to keep the CDN.")
+        sys.exit(1)
+
+    print(f"🎨 Building {TAILWIND_CSS} with {' '.join(command)}...")
+    result = subprocess.run(
+        command + ['-c', TAILWIND_CONFIG, '-i', TAILWIND_INPUT,
+                   '-o', os.path.join('static', TAILWIND_CSS), '--minify'],
+        cwd=BASE_DIR
+    )
+    if result.returncode != 0:
+        print(f"❌ Tailwind build failed (exit code {result.returncode})")
+        sys.exit(1)
+
+
+def static_files():
+    """Paths (relative to static/, with / separators) of the files to fingerprint"""
+    for root, dirs, files in os.walk(STATIC_DIR):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != os.path.join(STATIC_DIR, DIST_DIR))
+        for name in sorted(files):
+            relative = os.path.relpath(os.path.join(root, name), STATIC_DIR).replace(os.sep, '/')
+            if relative not in BUILD_ONLY and not name.startswith('.'):
+                yield relative
+
+
+def hashed_name(filename, content):
+    """repLogger.js -> dist/repLogger.<hash>.js"""
+    digest = hashlib.sha256(content).hexdigest()[:constants.STATIC_HASH_LENGTH]
+    stem, extension = os.path.splitext(filename)
+    return f"{DIST_DIR}/{stem}.{digest}{extension}"
+
+
+def precompress(path, content):
+    """Write the compressed siblings that are smaller than the file; return their encodings"""
+    mimetype = mimetypes.guess_type(path)[0]
+    if mimetype not in constants.COMPRESSIBLE_MIMETYPES or len(content) < constants.COMPRESSION_MIN_SIZE:
+        return []
+
+    levels = {'br': constants.STATIC_BROTLI_QUALITY, 'gzip': constants.STATIC_GZIP_LEVEL}
+    candidates = {encoding: compress_bytes(content, encoding, levels[encoding])
+                  for encoding in available_encodings()}
+
+    encodings = []
+    for encoding, compressed in candidates.items():
+        if len(compressed) < len(content):
+            with open(os.path.join(STATIC_DIR, path + ENCODING_SUFFIXES[encoding]), 'wb') as out:
+                out.write(compressed)
+            encodings.append(encoding)
+    return encodings
+
+
+def build_static(skip_tailwind=False):
+    """Run the full build and return the manifest's file map"""
+    if not skip_tailwind:
+        build_tailwind()
+
+    dist_dir = os.path.join(STATIC_DIR, DIST_DIR)
+    print("🧹 Clearing static/dist...")
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    os.makedirs(dist_dir)
+
+    print("📦 Fingerprinting static files...")
+    files = {}
+    original_bytes = compressed_bytes = 0
+    for filename in static_files():
+        with open(os.path.join(STATIC_DIR, filename), 'rb') as source:
+            content = source.read()
+        path = hashed_name(filename, content)
+        target = os.path.join(STATIC_DIR, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as out:
+            out.write(content)
+
+        encodings = precompress(path, content)
+        files[filename] = {'path': path, 'encodings': encodings}
+        if encodings:
+            original_bytes += len(content)
+            compressed_bytes += os.path.getsize(target + ENCODING_SUFFIXES[encodings[0]])
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump({'files': files}, manifest_file, indent=2, sort_keys=True)
+
+    print(f"✅ {len(files)} files fingerprinted")
+    if original_bytes:
+        print(f"✅ Precompressed text assets: {original_bytes} -> {compressed_bytes} bytes"
+              f" ({'br + gzip' if 'br' in available_encodings() else 'gzip only, pip install brotli for .br'})")
+    return files
+
+
+if __name__ == '__main__':
+    build_static(skip_tailwind='--skip-tailwind' in sys.argv[1:])
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Migrate the Exercises table to compact set storage.
+Collapses runs of identical consecutive sets (same exercise, weight and
+reps within a workout) into one row with a set count. Safe to re-run.
+
+Usage:
+    python coalesce_exercise_sets.py            # all users
+    python coalesce_exercise_sets.py <user_id>  # a single user
+"""
+
+import sys
+
+from app.app import create_app
+from app.models import Exercise
+
+
+def coalesce_exercise_sets(user_id=None):
+    """Coalesce identical consecutive set rows into set groups."""
+    app = create_app()
+
+    with app.app_context():
+        scope = f"user {user_id}" if user_id is not None else "all users"
+        print(f"🔨 Coalescing set rows for {scope}...")
+
+        updated, deleted = Exercise.coalesce_sets(user_id)
+
+        print(f"✅ {updated} set groups updated, {deleted} duplicate rows removed")
+
+
+if __name__ == '__main__':
+    coalesce_exercise_sets(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -6,6 +6,7 @@ Run this script to set up the quotes feature for the dashboard.
 
 from app.app import create_app
 from app.models import db, MotivationalQuote
+from app.quote_pool import invalidate_quote_pool
 
 def init_quotes():
     """Create the motivational_quotes table and add initial quotes."""
@@ -142,6 +143,9 @@ def init_quotes():
         # Commit all quotes
         db.session.commit()
         
+        # Make running workers reload their quote pools
+        invalidate_quote_pool()
+        
         print(f"✅ Successfully added {len(quotes)} motivational quotes!")
         print("🎉 Dashboard quotes feature is now ready!")
 
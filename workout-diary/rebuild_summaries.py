@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Rebuild the write-maintained summary tables from existing set history.
+Run this once after deploying a new summary table, or whenever the
+summaries need to be recomputed from the Exercises table.
+
+Usage:
+    python rebuild_summaries.py            # all users
+    python rebuild_summaries.py <user_id>  # a single user
+"""
+
+import sys
+
+from app.app import create_app
+from app.models import db, PersonalRecord, WorkoutStreak, WeeklyVolume, DailyExerciseSummary, TrainingDayBitmap, DailyRestSummary
+
+
+def rebuild_summaries(user_id=None):
+    """Create any missing summary tables and rebuild their contents."""
+    app = create_app()
+
+    with app.app_context():
+        print("🔨 Creating summary tables...")
+        db.create_all()
+
+        scope = f"user {user_id}" if user_id is not None else "all users"
+        print(f"📝 Rebuilding summaries for {scope}...")
+
+        count = PersonalRecord.rebuild(user_id)
+        print(f"✅ Personal records: {count} rows")
+
+        # Streaks are computed from the bitmaps, so rebuild those first
+        count = TrainingDayBitmap.rebuild(user_id)
+        print(f"✅ Training day bitmaps: {count} rows")
+
+        count = WorkoutStreak.rebuild(user_id)
+        print(f"✅ Workout streaks: {count} rows")
+
+        count = WeeklyVolume.rebuild(user_id)
+        print(f"✅ Weekly volumes: {count} rows")
+
+        count = DailyExerciseSummary.rebuild(user_id)
+        print(f"✅ Daily exercise summaries: {count} rows")
+
+        count = DailyRestSummary.rebuild(user_id)
+        print(f"✅ Daily rest summaries: {count} rows")
+
+        print("🎉 Summaries rebuilt!")
+
+
+if __name__ == '__main__':
+    rebuild_summaries(int(sys.argv[1]) if len(sys.argv) > 1 else None)
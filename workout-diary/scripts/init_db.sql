@@ -14,6 +14,14 @@
 -- ===================================
 -- DROP EXISTING TABLES (For clean setup)
 -- ===================================
+DROP TABLE IF EXISTS DailyRestSummaries;
+DROP TABLE IF EXISTS TrainingDayBitmaps;
+DROP TABLE IF EXISTS TrainingTargets;
+DROP TABLE IF EXISTS DailyExerciseSummaries;
+DROP TABLE IF EXISTS WeeklyVolumes;
+DROP TABLE IF EXISTS PersonalRecords;
+DROP TABLE IF EXISTS WorkoutStreaks;
+DROP TABLE IF EXISTS UserDataVersions;
 DROP TABLE IF EXISTS Exercises;
 DROP TABLE IF EXISTS CustomExercises;
 DROP TABLE IF EXISTS Workouts;
@@ -130,6 +138,9 @@ CREATE TABLE IF NOT EXISTS Exercises (
     reps INT NOT NULL,
     weight FLOAT NOT NULL,
     date DATE NOT NULL,
+    completed_at DATETIME NULL,  -- UTC time the row's latest set was completed
+    rest_seconds INT NOT NULL DEFAULT 0,  -- Total rest before the row's sets
+    rest_sets INT NOT NULL DEFAULT 0,  -- Number of sets rest_seconds covers
     FOREIGN KEY (workout_id) REFERENCES Workouts(workout_id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE,
     FOREIGN KEY (body_part_id) REFERENCES BodyParts(body_part_id),
@@ -139,6 +150,104 @@ CREATE TABLE IF NOT EXISTS Exercises (
     INDEX idx_user_date (user_id, date)
 );
 
+-- User Data Versions Table (bumped on every training-data write, keys in-process caches)
+CREATE TABLE IF NOT EXISTS UserDataVersions (
+    user_id INT PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+);
+
+-- Workout Streaks Table (maintained on write, rebuild with rebuild_summaries.py)
+CREATE TABLE IF NOT EXISTS WorkoutStreaks (
+    user_id INT PRIMARY KEY,
+    current_streak INT NOT NULL DEFAULT 0,
+    longest_streak INT NOT NULL DEFAULT 0,
+    last_workout_date DATE,
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+);
+
+-- Personal Records Table (maintained on write, rebuild with rebuild_summaries.py)
+CREATE TABLE IF NOT EXISTS PersonalRecords (
+    personal_record_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    exercise_key INT NOT NULL,
+    standard_exercise_id INT NULL,
+    custom_exercise_id INT NULL,
+    weight FLOAT NOT NULL,
+    reps INT NOT NULL,
+    date DATE NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (standard_exercise_id) REFERENCES StandardExercises(standard_exercise_id),
+    FOREIGN KEY (custom_exercise_id) REFERENCES CustomExercises(custom_exercise_id) ON DELETE CASCADE,
+    UNIQUE KEY unique_user_exercise (user_id, exercise_key),
+    INDEX idx_user_date (user_id, date)
+);
+
+-- Weekly Volumes Table (maintained on write, rebuild with rebuild_summaries.py)
+CREATE TABLE IF NOT EXISTS WeeklyVolumes (
+    user_id INT NOT NULL,
+    iso_year INT NOT NULL,
+    iso_week INT NOT NULL,
+    body_part_id INT NOT NULL,
+    week_start DATE NOT NULL,
+    volume FLOAT NOT NULL DEFAULT 0,
+    set_count INT NOT NULL DEFAULT 0,
+    rep_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, iso_year, iso_week, body_part_id),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (body_part_id) REFERENCES BodyParts(body_part_id),
+    INDEX idx_user_week_start (user_id, week_start)
+);
+
+-- Daily Exercise Summaries Table (maintained on write, rebuild with rebuild_summaries.py)
+CREATE TABLE IF NOT EXISTS DailyExerciseSummaries (
+    user_id INT NOT NULL,
+    exercise_key INT NOT NULL,
+    date DATE NOT NULL,
+    standard_exercise_id INT NULL,
+    custom_exercise_id INT NULL,
+    max_weight FLOAT NOT NULL,
+    total_volume FLOAT NOT NULL DEFAULT 0,
+    best_e1rm FLOAT NOT NULL,
+    set_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, exercise_key, date),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (standard_exercise_id) REFERENCES StandardExercises(standard_exercise_id),
+    FOREIGN KEY (custom_exercise_id) REFERENCES CustomExercises(custom_exercise_id) ON DELETE CASCADE
+);
+
+-- Training Targets Table (seeded from fitness goal and activity level on first use)
+CREATE TABLE IF NOT EXISTS TrainingTargets (
+    user_id INT NOT NULL,
+    body_part_id INT NOT NULL,
+    weekly_volume FLOAT NOT NULL,
+    is_custom BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (user_id, body_part_id),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (body_part_id) REFERENCES BodyParts(body_part_id)
+);
+
+-- Training Day Bitmaps Table (one bit per day of the year; body_part_id 0 = any body part)
+CREATE TABLE IF NOT EXISTS TrainingDayBitmaps (
+    user_id INT NOT NULL,
+    year INT NOT NULL,
+    body_part_id INT NOT NULL,
+    days VARBINARY(46) NOT NULL,
+    PRIMARY KEY (user_id, year, body_part_id),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+);
+
+-- Daily Rest Summaries Table (rest between sets per day; histogram of 15s buckets as uint16 counts)
+CREATE TABLE IF NOT EXISTS DailyRestSummaries (
+    user_id INT NOT NULL,
+    date DATE NOT NULL,
+    rest_sets INT NOT NULL DEFAULT 0,
+    rest_seconds INT NOT NULL DEFAULT 0,
+    histogram VARBINARY(80) NOT NULL,
+    PRIMARY KEY (user_id, date),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+);
+
 -- Legal Documents Table (Reference Data)
 CREATE TABLE IF NOT EXISTS legal_documents (
     id INT PRIMARY KEY AUTO_INCREMENT,
@@ -0,0 +1,50 @@
+// Conditional GETs for the JSON read APIs (/metrics/api/*, /workout/api/logged-sets).
+// The server tags responses with an ETag tied to the user's data version; we keep
+// the last body per URL and send its ETag back, so unchanged data costs a 304.
+
+const ETAG_CACHE_PREFIX = 'etag:';
+
+function readCachedResponse(url) {
+    try {
+        return JSON.parse(sessionStorage.getItem(ETAG_CACHE_PREFIX + url));
+    } catch (error) {
+        return null;
+    }
+}
+
+function storeCachedResponse(url, etag, data) {
+    try {
+        sessionStorage.setItem(ETAG_CACHE_PREFIX + url, JSON.stringify({ etag, data }));
+    } catch (error) {
+        // Storage full or unavailable: just skip caching this response
+    }
+}
+
+// GET a JSON endpoint, revalidating a stored copy with If-None-Match.
+// Resolves to the parsed body; rejects on network errors and non-2xx responses.
+window.getJSONWithETag = async function(url) {
+    const cached = readCachedResponse(url);
+    const headers = { 'Accept': 'application/json' };
+    if (cached && cached.etag) {
+        headers['If-None-Match'] = cached.etag;
+    }
+
+    // no-store keeps the browser cache out of the way so we see the 304 ourselves
+    const response = await fetch(url, { headers, cache: 'no-store', credentials: 'same-origin' });
+
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+    if (!response.ok) {
+        const error = new Error(`Request failed: ${response.status}`);
+        error.status = response.status;
+        throw error;
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) {
+        storeCachedResponse(url, etag, data);
+    }
+    return data;
+};
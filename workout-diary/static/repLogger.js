@@ -67,7 +67,7 @@ $(document).ready(function () {
     async function loadLoggedSets() {
         try {
             const dateStr = formatDateForInput(selectedDate);
-            const response = await $.get(`/workout/api/logged-sets?date=${dateStr}`);
+            const response = await getJSONWithETag(`/workout/api/logged-sets?date=${dateStr}`);
             const loggedSets = response.logged_sets;
 
             // Clear the logged sets container
@@ -222,11 +222,17 @@ $(document).ready(function () {
         const idsArray = Array.isArray(liftIds) ? liftIds : [liftIds];
         const setCard = $(this).closest('.set-card');
         
+        // Sets stored as one group share an ID, so count sets per ID
+        const setCounts = {};
+        idsArray.forEach(id => {
+            setCounts[id] = (setCounts[id] || 0) + 1;
+        });
+        
         try {
-            // Delete all sets in the group
-            const deletePromises = idsArray.map(id => 
+            // Delete all sets in the group (one request per stored row)
+            const deletePromises = Object.entries(setCounts).map(([id, count]) => 
                 $.ajax({
-                    url: `/workout/api/logged-sets/${id}`,
+                    url: `/workout/api/logged-sets/${id}?count=${count}`,
                     method: 'DELETE',
                 })
             );
@@ -271,6 +277,12 @@ $(document).ready(function () {
                 date: formatDateForInput(selectedDate)
             };
 
+            // Sets logged live get a completion time, which the server uses
+            // to derive rest between sets (back-filled days have none)
+            if (formatDateForInput(selectedDate) === formatDateForInput(new Date())) {
+                exerciseData.completedAt = new Date().toISOString();
+            }
+
             if (exerciseValue === 'new_custom') {
                 const customName = $('#custom-exercise-name').val().trim();
                 if (!customName) {
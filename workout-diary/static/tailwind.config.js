@@ -1,4 +1,8 @@
 module.exports = {
     darkMode: 'class', // Enable class-based dark mode
-    // ... rest of your Tailwind config
-  } 
\ No newline at end of file
+    // Where build_static.py looks for class names (paths relative to workout-diary/)
+    content: [
+      './templates/**/*.html',
+      './static/*.js',
+    ],
+  }
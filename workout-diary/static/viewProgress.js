@@ -150,64 +150,111 @@ function createExerciseChart(ctx, exerciseName, progressionData) {
     return exerciseCharts[exerciseName];
 }
 
-// Load exercise progression data
-function loadExerciseProgression(exerciseName, canvasId, prValueId = null, prDateId = null) {
-    $.get(`/metrics/api/exercise-progression/${encodeURIComponent(exerciseName)}`, (data) => {
-        const ctx = $(`#${canvasId}`)[0].getContext('2d');
+const DEFAULT_EXERCISES = ['Bench Press', 'Squats', 'Deadlift'];
+
+// Matches MAX_PROGRESSION_EXERCISES on the server
+const PROGRESSION_BATCH_SIZE = 25;
+
+// Fetch progression data for several exercises with as few requests as possible.
+// Resolves to { exercises: { name: progression } }.
+function fetchProgressions(exerciseNames) {
+    const batches = [];
+    for (let i = 0; i < exerciseNames.length; i += PROGRESSION_BATCH_SIZE) {
+        const query = exerciseNames.slice(i, i + PROGRESSION_BATCH_SIZE)
+            .map(name => `name=${encodeURIComponent(name)}`).join('&');
+        batches.push(getJSONWithETag(`/metrics/api/exercise-progression?${query}`));
+    }
+    
+    return Promise.all(batches).then(results => ({
+        exercises: Object.assign({}, ...results.map(result => result.exercises))
+    }));
+}
+
+// Draw an exercise's progression chart and update its PR display
+function renderExerciseProgression(exerciseName, canvasId, data, prValueId = null, prDateId = null) {
+    const ctx = $(`#${canvasId}`)[0].getContext('2d');
+    
+    if (data && data.dates && data.dates.length > 0) {
+        createExerciseChart(ctx, exerciseName, data);
         
-        if (data.dates && data.dates.length > 0) {
-            createExerciseChart(ctx, exerciseName, data);
-            
-            // Update PR display if IDs provided
-            if (prValueId && prDateId && data.personal_record) {
-                $(`#${prValueId}`).text(data.personal_record.weight ? `${data.personal_record.weight} lbs` : '--');
-                if (data.personal_record.date) {
-                    const prDate = new Date(data.personal_record.date);
-                    $(`#${prDateId}`).text(`Set on ${prDate.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' })}`);
-                } else {
-                    $(`#${prDateId}`).text('No PR yet');
-                }
-            }
-        } else {
-            // Show "No data" message
-            ctx.font = '16px Arial';
-            ctx.fillStyle = '#999';
-            ctx.textAlign = 'center';
-            ctx.fillText('No data available yet', ctx.canvas.width / 2, ctx.canvas.height / 2);
-            ctx.fillText('Start logging this exercise!', ctx.canvas.width / 2, (ctx.canvas.height / 2) + 25);
-            
-            // Update PR display to show no data
-            if (prValueId && prDateId) {
-                $(`#${prValueId}`).text('--');
-                $(`#${prDateId}`).text('No data yet');
+        // Update PR display if IDs provided
+        if (prValueId && prDateId && data.personal_record) {
+            $(`#${prValueId}`).text(data.personal_record.weight ? `${data.personal_record.weight} lbs` : '--');
+            if (data.personal_record.date) {
+                const prDate = new Date(data.personal_record.date);
+                $(`#${prDateId}`).text(`Set on ${prDate.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' })}`);
+            } else {
+                $(`#${prDateId}`).text('No PR yet');
             }
         }
-    }).fail((error) => {
-        console.error(`Failed to load progression for ${exerciseName}:`, error);
-        const ctx = $(`#${canvasId}`)[0].getContext('2d');
-        ctx.font = '14px Arial';
-        ctx.fillStyle = '#f00';
+    } else {
+        // Show "No data" message
+        ctx.font = '16px Arial';
+        ctx.fillStyle = '#999';
         ctx.textAlign = 'center';
-        ctx.fillText('Error loading data', ctx.canvas.width / 2, ctx.canvas.height / 2);
+        ctx.fillText('No data available yet', ctx.canvas.width / 2, ctx.canvas.height / 2);
+        ctx.fillText('Start logging this exercise!', ctx.canvas.width / 2, (ctx.canvas.height / 2) + 25);
         
-        // Update PR display to show error
+        // Update PR display to show no data
         if (prValueId && prDateId) {
             $(`#${prValueId}`).text('--');
-            $(`#${prDateId}`).text('Error loading');
+            $(`#${prDateId}`).text('No data yet');
         }
+    }
+}
+
+// Show a load error on an exercise chart
+function renderProgressionError(exerciseName, canvasId, error, prValueId = null, prDateId = null) {
+    console.error(`Failed to load progression for ${exerciseName}:`, error);
+    const ctx = $(`#${canvasId}`)[0].getContext('2d');
+    ctx.font = '14px Arial';
+    ctx.fillStyle = '#f00';
+    ctx.textAlign = 'center';
+    ctx.fillText('Error loading data', ctx.canvas.width / 2, ctx.canvas.height / 2);
+    
+    // Update PR display to show error
+    if (prValueId && prDateId) {
+        $(`#${prValueId}`).text('--');
+        $(`#${prDateId}`).text('Error loading');
+    }
+}
+
+// Load exercise progression data
+function loadExerciseProgression(exerciseName, canvasId, prValueId = null, prDateId = null) {
+    fetchProgressions([exerciseName]).then((data) => {
+        renderExerciseProgression(exerciseName, canvasId, data.exercises[exerciseName], prValueId, prDateId);
+    }).catch((error) => {
+        renderProgressionError(exerciseName, canvasId, error, prValueId, prDateId);
+    });
+}
+
+// Load the default three exercise charts in a single request
+function loadDefaultProgressions() {
+    const charts = [
+        ['Bench Press', 'benchPressChart', 'benchPrValue', 'benchPrDate'],
+        ['Squats', 'squatChart', 'squatPrValue', 'squatPrDate'],
+        ['Deadlift', 'deadliftChart', 'deadliftPrValue', 'deadliftPrDate'],
+    ];
+    
+    fetchProgressions(DEFAULT_EXERCISES).then((data) => {
+        charts.forEach(([name, canvasId, prValueId, prDateId]) => {
+            renderExerciseProgression(name, canvasId, data.exercises[name], prValueId, prDateId);
+        });
+    }).catch((error) => {
+        charts.forEach(([name, canvasId, prValueId, prDateId]) => {
+            renderProgressionError(name, canvasId, error, prValueId, prDateId);
+        });
     });
 }
 
 // Load tracked exercises and create charts
 function loadTrackedExercises() {
-    $.get('/metrics/api/tracked-exercises', (data) => {
+    // Always load the default three exercises with PR display
+    loadDefaultProgressions();
+    
+    getJSONWithETag('/metrics/api/tracked-exercises').then((data) => {
         console.log('Tracked exercises:', data);
         
-        // Always load the default three exercises with PR display
-        loadExerciseProgression('Bench Press', 'benchPressChart', 'benchPrValue', 'benchPrDate');
-        loadExerciseProgression('Squats', 'squatChart', 'squatPrValue', 'squatPrDate');
-        loadExerciseProgression('Deadlift', 'deadliftChart', 'deadliftPrValue', 'deadliftPrDate');
-        
         // Load additional tracked exercises
         const additionalExercises = data.tracked_exercises.filter(ex => 
             !data.default_exercises.includes(ex.exercise_name) && ex.session_count >= 2
@@ -223,14 +270,14 @@ function loadTrackedExercises() {
                 $select.append(`<option value="${ex.exercise_name}">${ex.exercise_name} (${ex.session_count} sessions)</option>`);
             });
         }
-    }).fail((error) => {
+    }).catch((error) => {
         console.error('Failed to load tracked exercises:', error);
     });
 }
 
 // Load available exercises for tracking
 function loadAvailableExercises() {
-    $.get('/metrics/api/available-exercises', (data) => {
+    getJSONWithETag('/metrics/api/available-exercises').then((data) => {
         const $modal = $('#addExerciseModal');
         const $exerciseList = $('#availableExercisesList');
         $exerciseList.empty();
@@ -278,7 +325,7 @@ function loadAvailableExercises() {
                 `);
             }
         });
-    }).fail((error) => {
+    }).catch((error) => {
         console.error('Failed to load available exercises:', error);
         $exerciseList.html(`
             <div class="text-center py-12">
@@ -306,64 +353,46 @@ window.selectExerciseToTrack = function(exerciseName) {
 
 // Load all personal records
 function loadAllRecords() {
-    // First, update the Big 3 cards at the top
-    $.get('/metrics/api/exercise-progression/Bench Press', (data) => {
-        if (data.personal_record && data.personal_record.weight) {
-            $('#recordBenchValue').text(`${data.personal_record.weight} lbs`);
-            const date = new Date(data.personal_record.date);
-            $('#recordBenchDate').text(date.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' }));
-        } else {
-            $('#recordBenchValue').text('No PR yet');
-            $('#recordBenchDate').text('Start lifting!');
-        }
-    });
-    
-    $.get('/metrics/api/exercise-progression/Squats', (data) => {
-        if (data.personal_record && data.personal_record.weight) {
-            $('#recordSquatValue').text(`${data.personal_record.weight} lbs`);
+    const setRecordCard = (prefix, data) => {
+        if (data && data.personal_record && data.personal_record.weight) {
+            $(`#record${prefix}Value`).text(`${data.personal_record.weight} lbs`);
             const date = new Date(data.personal_record.date);
-            $('#recordSquatDate').text(date.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' }));
+            $(`#record${prefix}Date`).text(date.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' }));
         } else {
-            $('#recordSquatValue').text('No PR yet');
-            $('#recordSquatDate').text('Start lifting!');
+            $(`#record${prefix}Value`).text('No PR yet');
+            $(`#record${prefix}Date`).text('Start lifting!');
         }
-    });
-    
-    $.get('/metrics/api/exercise-progression/Deadlift', (data) => {
-        if (data.personal_record && data.personal_record.weight) {
-            $('#recordDeadliftValue').text(`${data.personal_record.weight} lbs`);
-            const date = new Date(data.personal_record.date);
-            $('#recordDeadliftDate').text(date.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' }));
-        } else {
-            $('#recordDeadliftValue').text('No PR yet');
-            $('#recordDeadliftDate').text('Start lifting!');
-        }
-    });
+    };
     
     // Load all tracked exercises and their PRs
-    $.get('/metrics/api/tracked-exercises', (data) => {
+    getJSONWithETag('/metrics/api/tracked-exercises').then((data) => {
         const $recordsList = $('#allRecordsList');
         $recordsList.empty();
         
-        if (!data.tracked_exercises || data.tracked_exercises.length === 0) {
-            $recordsList.html(`
-                <div class="col-span-full text-center py-12">
-                    <div class="text-6xl mb-4">🏋️</div>
-                    <p class="text-gray-600 text-lg font-semibold">No records yet!</p>
-                    <p class="text-gray-500 text-sm mt-2">Start logging workouts to build your record board</p>
-                </div>
-            `);
-            return;
-        }
+        // Fetch the Big 3 and every tracked exercise together
+        const trackedExercises = data.tracked_exercises || [];
+        const trackedNames = trackedExercises.map(ex => ex.exercise_name);
+        const names = [...new Set([...DEFAULT_EXERCISES, ...trackedNames])];
         
-        // Create a record card for each exercise
-        const exercisePromises = data.tracked_exercises.map(ex => {
-            return $.get(`/metrics/api/exercise-progression/${encodeURIComponent(ex.exercise_name)}`);
-        });
-        
-        Promise.all(exercisePromises).then(results => {
-            results.forEach((result, index) => {
-                const exercise = data.tracked_exercises[index];
+        fetchProgressions(names).then(response => {
+            // Update the Big 3 cards at the top
+            setRecordCard('Bench', response.exercises['Bench Press']);
+            setRecordCard('Squat', response.exercises['Squats']);
+            setRecordCard('Deadlift', response.exercises['Deadlift']);
+            
+            if (trackedExercises.length === 0) {
+                $recordsList.html(`
+                    <div class="col-span-full text-center py-12">
+                        <div class="text-6xl mb-4">🏋️</div>
+                        <p class="text-gray-600 text-lg font-semibold">No records yet!</p>
+                        <p class="text-gray-500 text-sm mt-2">Start logging workouts to build your record board</p>
+                    </div>
+                `);
+                return;
+            }
+            
+            trackedExercises.forEach((exercise, index) => {
+                const result = response.exercises[exercise.exercise_name] || {};
                 
                 if (result.personal_record && result.personal_record.weight) {
                     const pr = result.personal_record;
@@ -419,7 +448,7 @@ function loadAllRecords() {
                 </div>
             `);
         });
-    }).fail((error) => {
+    }).catch((error) => {
         console.error('Failed to load tracked exercises for records:', error);
         $('#allRecordsList').html(`
             <div class="col-span-full text-center py-12">
@@ -503,7 +532,7 @@ $(document).ready(function () {
     function loadAnalyticsData() {
         if (!consistencyChart && !volumeTrendChart && !imbalanceChart) {
             // Fetch and render data for consistency
-            $.get('/metrics/api/consistency/', (data) => {
+            getJSONWithETag('/metrics/api/consistency/').then((data) => {
                 const ctx = $('#consistencyChart')[0].getContext('2d');
                 consistencyChart = new Chart(ctx, {
                     type: 'bar',
@@ -526,7 +555,7 @@ $(document).ready(function () {
             });
 
             // Fetch and render volume trend
-            $.get('/metrics/api/volume-trend/', (data) => {
+            getJSONWithETag('/metrics/api/volume-trend/').then((data) => {
                 const ctx = $('#volumeTrendChart')[0].getContext('2d');
                 volumeTrendChart = new Chart(ctx, {
                     type: 'line',
@@ -555,7 +584,7 @@ $(document).ready(function () {
 
     // Pie chart function
     function updateImbalanceChart() {
-        $.get('/metrics/api/body-part-imbalance/', (response) => {
+        getJSONWithETag('/metrics/api/body-part-imbalance/').then((response) => {
             if (response.error) {
                 console.error('Error loading body part data:', response.error);
                 return;
@@ -618,7 +647,7 @@ $(document).ready(function () {
                     }
                 }
             });
-        }).fail((error) => {
+        }).catch((error) => {
             console.error('Failed to load body part imbalance data:', error);
         });
     }
@@ -626,8 +655,7 @@ $(document).ready(function () {
     // Load Body Part Balance Data when Balance tab is shown
     async function loadBodyPartBalance() {
         try {
-            const response = await fetch('/metrics/api/body-part-balance');
-            const data = await response.json();
+            const data = await getJSONWithETag('/metrics/api/body-part-balance');
             
             // Hide loading, show content
             document.getElementById('balance-loading').classList.add('hidden');
@@ -0,0 +1,85 @@
+"""
+Shared fixtures for the tests_*.py modules (tests_routes.py keeps its own
+client fixture).
+
+Run the suite with: python -m pytest -q tests/tests_*.py
+"""
+
+import pytest
+from app.app import create_app
+from app.models import db, User, BodyPart, StandardExercise
+
+
+@pytest.fixture
+def app():
+    """
+    A fresh app on an empty in-memory database, with every in-process
+    cache cleared so nothing leaks between tests that reuse user IDs.
+    """
+    from app.analitics import history_cache, prefix_cache
+    from app.catalog import reference_catalog
+    from app.routes import dashboard_cache
+    from app.routes_metrics import goal_cache
+
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['JWT_SECRET_KEY'] = 'testsecret'
+    app.config['SECRET_KEY'] = 'testsecret'
+    with app.app_context():
+        db.create_all()
+        for cache in (dashboard_cache, goal_cache, history_cache, prefix_cache):
+            cache.invalidate()
+        reference_catalog.invalidate()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(client):
+    """
+    A logged-in user, with body parts Chest, Back and Legs and the standard
+    exercises Bench Press (id 1, Chest) and Squats (id 2, Legs).
+    """
+    for name in ('Chest', 'Back', 'Legs'):
+        db.session.add(BodyPart(body_part_name=name))
+    db.session.commit()
+    db.session.add(StandardExercise(body_part_id=1, exercise_name='Bench Press', is_compound=True))
+    db.session.add(StandardExercise(body_part_id=3, exercise_name='Squats', is_compound=True))
+
+    user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+
+    response = client.post('/auth/login', json={'username': 'testuser', 'password': 'password123'})
+    assert response.status_code == 200
+    return user
+
+
+@pytest.fixture
+def log_sets(client, user):
+    """
+    Log sets through /workout/api/exercise_log and return the response.
+    Defaults to 3 x 8 Bench Press at 100kg.
+    """
+    def log(day, body_part='Chest', standard_exercise_id=1, weight=100.0, reps=8, sets=3, status=201, **extra):
+        response = client.post('/workout/api/exercise_log', json={
+            'date': day.isoformat(),
+            'bodyPart': body_part,
+            'standardExerciseId': standard_exercise_id,
+            'weight': weight,
+            'reps': reps,
+            'sets': sets,
+            **extra
+        })
+        assert response.status_code == status, response.get_json()
+        return response
+
+    return log
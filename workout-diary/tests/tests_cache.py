@@ -0,0 +1,64 @@
+"""
+Tests for the per-user data version and the ETags built on it (cache.py).
+"""
+
+from datetime import date
+
+from app.models import db, UserDataVersion
+
+
+def test_data_version_bump_creates_then_increments(user):
+    """
+    Test UserDataVersion.bump upserts: first bump creates the row at 1.
+    """
+    assert UserDataVersion.get(user.user_id) == 0
+
+    # Act
+    UserDataVersion.bump(user.user_id)
+    db.session.commit()
+    UserDataVersion.bump(user.user_id)
+    UserDataVersion.bump(user.user_id)
+    db.session.commit()
+
+    # Assert
+    assert UserDataVersion.get(user.user_id) == 3
+    assert UserDataVersion.query.count() == 1
+
+
+def test_etag_conditional_request_skips_view(app, request):
+    """
+    Test a matching If-None-Match (strong or W/ form) answers 304 without
+    calling the view, and a write changes the tag.
+    """
+    from flask import jsonify
+    from flask_login import login_required
+    from app.cache import etag_by_data_version
+
+    calls = []
+
+    @app.route('/test/etag')
+    @login_required
+    @etag_by_data_version
+    def tagged():
+        calls.append(1)
+        return jsonify({'calls': len(calls)})
+
+    # Routes must exist before the first request (the login)
+    client = request.getfixturevalue('client')
+    log_sets = request.getfixturevalue('log_sets')
+
+    # Act
+    first = client.get('/test/etag')
+    etag = first.headers['ETag']
+    weak_match = client.get('/test/etag', headers={'If-None-Match': etag})
+    strong_match = client.get('/test/etag', headers={'If-None-Match': etag.removeprefix('W/')})
+    log_sets(date.today())
+    after_write = client.get('/test/etag', headers={'If-None-Match': etag})
+
+    # Assert
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert weak_match.status_code == 304 and weak_match.headers['ETag'] == etag
+    assert strong_match.status_code == 304
+    assert after_write.status_code == 200
+    assert after_write.headers['ETag'] != etag
+    assert len(calls) == 2
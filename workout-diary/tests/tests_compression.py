@@ -0,0 +1,119 @@
+"""
+Tests for response compression (compression.py).
+"""
+
+import gzip
+import io
+
+import pytest
+from flask import Flask, Response, jsonify, request, send_file, stream_with_context
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from app.compression import init_compression, negotiate_encoding
+
+BIG = {'values': list(range(1000))}         # Well over COMPRESSION_MIN_SIZE as JSON
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.delenv('COMPRESS', raising=False)
+    monkeypatch.delenv('COMPRESS_MIN_SIZE', raising=False)
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route('/big')
+    def big():
+        return jsonify(BIG)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/tagged')
+    def tagged():
+        response = jsonify(BIG)
+        response.set_etag('v1', weak=False)
+        return response.make_conditional(request)
+
+    @app.route('/file')
+    def file():
+        return send_file(io.BytesIO(b'{"a": 1}' * 500), mimetype='application/json')
+
+    @app.route('/stream')
+    def stream():
+        return Response(stream_with_context(iter([b'x' * 800, b'y' * 800])), mimetype='text/plain')
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_large_json_is_gzipped(client):
+    response = client.get('/big', headers=GZIP)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert int(response.headers['Content-Length']) == len(response.data)
+    assert gzip.decompress(response.data) == client.get('/big').data
+
+
+def test_large_json_without_accept_encoding_varies_but_is_identity(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'identity'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.get_json() == BIG
+
+
+def test_small_and_head_responses_untouched(client):
+    small = client.get('/small', headers=GZIP)
+    assert 'Content-Encoding' not in small.headers
+    assert 'Vary' not in small.headers
+
+    head = client.head('/big', headers=GZIP)
+    assert 'Content-Encoding' not in head.headers
+
+
+def test_etag_made_weak_and_304_untouched(client):
+    response = client.get('/tagged', headers=GZIP)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == 'W/"v1"'
+
+    not_modified = client.get('/tagged', headers={**GZIP, 'If-None-Match': '"v1"'})
+    assert not_modified.status_code == 304
+    assert 'Content-Encoding' not in not_modified.headers
+
+
+def test_direct_passthrough_untouched(client):
+    response = client.get('/file', headers=GZIP)
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == b'{"a": 1}' * 500
+
+
+def test_streamed_response_compressed_incrementally(client):
+    response = client.get('/stream', headers=GZIP)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.data) == b'x' * 800 + b'y' * 800
+
+
+def test_disabled_by_config(app, client):
+    app.config['COMPRESSION_ENABLED'] = False
+
+    assert 'Content-Encoding' not in client.get('/big', headers=GZIP).headers
+
+
+def test_negotiate_encoding_prefers_quality_then_order():
+    accept = parse_accept_header('gzip;q=0.5, br;q=1.0', Accept)
+    assert negotiate_encoding(accept, ('br', 'gzip')) == 'br'
+    assert negotiate_encoding(accept, ('gzip',)) == 'gzip'
+    assert negotiate_encoding(parse_accept_header('gzip, br', Accept), ('br', 'gzip')) == 'br'
+    assert negotiate_encoding(parse_accept_header('identity', Accept), ('br', 'gzip')) is None
+    assert negotiate_encoding(parse_accept_header('gzip;q=0', Accept), ('gzip',)) is None
@@ -0,0 +1,231 @@
+"""
+Tests for request timing and the queued log pipeline (logging_config.py).
+"""
+
+import logging
+import queue
+import re
+import threading
+import time
+
+import pytest
+from flask import Flask, g, render_template_string
+
+from app import constants, logging_config
+from app.logging_config import (
+    BatchingQueueListener, LogQueueStats, NonBlockingQueueHandler, log_queue_stats, log_request_info,
+    restart_log_listener
+)
+
+
+def _timings(response):
+    return {name: float(value) for name, value in
+            re.findall(r'(\w+);dur=([\d.]+)', response.headers['Server-Timing'])}
+
+
+def test_server_timing_off_by_default_in_production(monkeypatch):
+    """
+    Test the Server-Timing header is opt-in for production.
+    """
+    monkeypatch.setenv('FLASK_ENV', 'production')
+    monkeypatch.delenv('SERVER_TIMING', raising=False)
+    production = Flask(__name__)
+    log_request_info(production)
+
+    @production.route('/ping')
+    def ping():
+        return 'pong'
+
+    response = production.test_client().get('/ping')
+
+    assert production.config['SERVER_TIMING_ENABLED'] is False
+    assert 'Server-Timing' not in response.headers
+
+    monkeypatch.setenv('FLASK_ENV', 'development')
+    development = Flask(__name__)
+    log_request_info(development)
+    assert development.config['SERVER_TIMING_ENABLED'] is True
+
+
+def test_render_time_excludes_queries_run_while_rendering(monkeypatch):
+    """
+    Test DB time spent inside a template is reported under db only.
+    """
+    monkeypatch.setenv('FLASK_ENV', 'development')
+    app = Flask(__name__)
+    log_request_info(app)
+
+    def lazy_load():
+        # Stands in for a query the template triggers (e.g. a lazy relationship)
+        time.sleep(0.05)
+        g.db_queries += 1
+        g.db_time += 0.05
+        return 'loaded'
+
+    @app.route('/page')
+    def page():
+        return render_template_string('{{ lazy_load() }}', lazy_load=lazy_load)
+
+    timings = _timings(app.test_client().get('/page'))
+
+    assert timings['db'] >= 50
+    assert timings['render'] < 40
+
+
+class CaptureHandler(logging.Handler):
+    """Collects the messages the listener writes, and counts batch flushes"""
+
+    def __init__(self, block=None):
+        super().__init__()
+        self.messages = []
+        self.flushes = 0
+        self.block = block
+
+    def emit(self, record):
+        if self.block is not None:
+            self.block.wait()
+        self.messages.append(record.getMessage())
+
+    def flush_batch(self):
+        self.flushes += 1
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    """Fresh per-test queue counters (the module's are per process)"""
+    counters = LogQueueStats()
+    monkeypatch.setattr(logging_config, '_queue_counters', counters)
+    return counters
+
+
+def _record(message):
+    return logging.makeLogRecord({'msg': message, 'levelno': logging.INFO, 'levelname': 'INFO'})
+
+
+def test_full_queue_drops_and_counts(counters):
+    """
+    Test records beyond the queue size are dropped without blocking, and the
+    drop is reported once by the listener.
+    """
+    log_queue = queue.Queue(maxsize=2)
+    handler = NonBlockingQueueHandler(log_queue, 'app')
+    for index in range(5):
+        handler.handle(_record(f"record {index}"))
+
+    assert (counters.queued, counters.dropped) == (2, 3)
+
+    capture = CaptureHandler()
+    listener = BatchingQueueListener(log_queue, {'app': [capture]})
+    listener.start()
+    listener.stop()
+
+    assert capture.messages == ['record 0', 'record 1', 'Log queue full: dropped 3 records']
+    assert counters.reported_dropped == 3
+
+
+def test_listener_writes_in_batches(monkeypatch, counters):
+    """
+    Test the listener takes up to LOG_BATCH_SIZE records per batch, routes
+    them by target and flushes each handler once per batch.
+    """
+    monkeypatch.setattr(constants, 'LOG_BATCH_SIZE', 3)
+    log_queue = queue.Queue()
+    app_capture, security_capture = CaptureHandler(), CaptureHandler()
+    app_handler = NonBlockingQueueHandler(log_queue, 'app')
+    security_handler = NonBlockingQueueHandler(log_queue, 'security')
+    for index in range(7):
+        app_handler.handle(_record(f"app {index}"))
+    security_handler.handle(_record('security'))
+
+    listener = BatchingQueueListener(log_queue, {'app': [app_capture], 'security': [security_capture]})
+    log_queue.put(listener._sentinel)   # Queued up front, so the batches are deterministic
+    listener.start()
+    listener.stop()
+
+    # 8 records plus the stop sentinel, 3 per batch
+    assert app_capture.messages == [f"app {index}" for index in range(7)]
+    assert security_capture.messages == ['security']
+    assert (counters.written, counters.batches) == (8, 3)
+    assert app_capture.flushes == security_capture.flushes == 3
+
+
+def test_stop_waits_for_room_in_a_full_queue(monkeypatch, counters):
+    """
+    Test stop() on a full queue waits for the listener instead of raising
+    queue.Full, and nothing is lost.
+    """
+    release = threading.Event()
+    log_queue = queue.Queue(maxsize=2)
+    capture = CaptureHandler(block=release)
+    listener = BatchingQueueListener(log_queue, {'app': [capture]})
+    listener.start()
+    handler = NonBlockingQueueHandler(log_queue, 'app')
+    handler.handle(_record('first'))
+    while not log_queue.empty():
+        time.sleep(0.01)
+    handler.handle(_record('second'))
+    handler.handle(_record('third'))
+    assert log_queue.full()
+
+    threading.Timer(0.1, release.set).start()
+    listener.stop()
+
+    assert capture.messages == ['first', 'second', 'third']
+    assert counters.dropped == 0
+
+
+def test_stop_discards_backlog_of_stuck_listener(monkeypatch, counters):
+    """
+    Test stop() gives up on a listener that never frees room: the backlog
+    is dropped and counted, and stop returns after the timeout.
+    """
+    monkeypatch.setattr(constants, 'LOG_STOP_TIMEOUT', 0.1)
+    release = threading.Event()
+    log_queue = queue.Queue(maxsize=2)
+    listener = BatchingQueueListener(log_queue, {'app': [CaptureHandler(block=release)]})
+    listener.start()
+    handler = NonBlockingQueueHandler(log_queue, 'app')
+    handler.handle(_record('stuck'))
+    while not log_queue.empty():
+        time.sleep(0.01)
+    handler.handle(_record('second'))
+    handler.handle(_record('third'))
+
+    listener.stop()
+    release.set()
+
+    assert counters.dropped == 2
+    assert listener._thread is None
+
+
+def test_restart_after_fork_ignores_inherited_locks(monkeypatch):
+    """
+    Test restart_log_listener (run in forked workers) replaces the counters,
+    lock, queue and thread even when the inherited locks are held, as they
+    would be if another master thread held them at fork time.
+    """
+    capture = CaptureHandler()
+    inherited_counters = LogQueueStats()
+    inherited_lock = threading.Lock()
+    handler = NonBlockingQueueHandler(queue.Queue(), 'app')
+    parent_listener = BatchingQueueListener(handler.queue, {'app': [capture]})
+    monkeypatch.setattr(logging_config, '_queue_counters', inherited_counters)
+    monkeypatch.setattr(logging_config, '_listener_lock', inherited_lock)
+    monkeypatch.setattr(logging_config, '_queue_handlers', [handler])
+    monkeypatch.setattr(logging_config, '_listener', parent_listener)
+    inherited_counters.add(queued=5, dropped=2)
+    inherited_counters._lock.acquire()
+    inherited_lock.acquire()
+
+    restart_log_listener()
+    try:
+        handler.handle(_record('from the worker'))
+        stats = log_queue_stats()
+    finally:
+        logging_config.stop_log_listener()
+
+    assert logging_config._queue_counters is not inherited_counters
+    assert logging_config._listener_lock is not inherited_lock
+    assert handler.queue is not parent_listener.queue
+    assert stats['enabled'] and (stats['queued'], stats['dropped']) == (1, 0)
+    assert capture.messages == ['from the worker']
@@ -0,0 +1,288 @@
+"""
+Tests for the metrics endpoints (/metrics/api/...).
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+
+from app import constants
+from app.analitics import DailyPrefixSums, bucket_periods
+from app.models import db, Exercise, Workout, TrainingTarget, DailyRestSummary
+from app.routes_metrics import _requested_range
+
+
+def _targets(client):
+    response = client.get('/metrics/api/training-targets')
+    assert response.status_code == 200
+    return response
+
+
+def test_training_targets_read_seeded_defaults_without_storing(client, user):
+    expected = TrainingTarget.seeded_volumes(user.fitness_goal, user.activity_level)
+
+    targets = _targets(client).get_json()['targets']
+
+    assert targets == {
+        name: {'weekly_volume': expected[name], 'is_custom': False}
+        for name in ('Chest', 'Back', 'Legs')
+    }
+    assert TrainingTarget.query.count() == 0
+
+
+def test_training_targets_put_stores_custom_and_keeps_seeded(client, user):
+    expected = TrainingTarget.seeded_volumes(user.fitness_goal, user.activity_level)
+    etag = _targets(client).headers['ETag']
+
+    response = client.put('/metrics/api/training-targets', json={'targets': {'Chest': 12345}})
+    assert response.status_code == 200
+
+    response = _targets(client)
+    assert response.headers['ETag'] != etag
+    targets = response.get_json()['targets']
+    assert targets['Chest'] == {'weekly_volume': 12345, 'is_custom': True}
+    assert targets['Back'] == {'weekly_volume': expected['Back'], 'is_custom': False}
+    db.session.expire_all()
+    assert TrainingTarget.query.filter_by(user_id=user.user_id).count() == 3
+
+
+def test_training_targets_put_drop_and_reset(client, user):
+    expected = TrainingTarget.seeded_volumes(user.fitness_goal, user.activity_level)
+    client.put('/metrics/api/training-targets', json={'targets': {'Chest': 12345, 'Back': None}})
+
+    targets = _targets(client).get_json()['targets']
+    assert set(targets) == {'Chest', 'Legs'}
+
+    response = client.put('/metrics/api/training-targets', json={'reset': True})
+    assert response.status_code == 200
+
+    targets = _targets(client).get_json()['targets']
+    assert targets == {
+        name: {'weekly_volume': expected[name], 'is_custom': False}
+        for name in ('Chest', 'Back', 'Legs')
+    }
+
+
+def test_training_targets_put_rejects_invalid(client, user):
+    invalid = (
+        {}, {'targets': {'Wings': 1000}}, {'targets': {'Chest': 'lots'}}, {'targets': {'Chest': -5}},
+        {'targets': {'Chest': 'nan'}}, {'targets': {'Chest': 'inf'}}, {'targets': {'Chest': '1e400'}},
+    )
+    for body in invalid:
+        response = client.put('/metrics/api/training-targets', json=body)
+        assert response.status_code == 400, body
+    assert TrainingTarget.query.count() == 0
+
+
+# Ranged metrics (?start=&end=&bucket=) and the daily prefix sums behind them
+
+def _range_args(app, query_string, default_days=30, default_bucket=None):
+    with app.test_request_context('/', query_string=query_string):
+        return _requested_range(default_days, default_bucket)
+
+
+def test_requested_range_parsing(app):
+    today = date.today()
+
+    assert _range_args(app, {}) is None
+    assert _range_args(app, {'start': '2024-01-01', 'end': '2024-01-31'}) == (
+        date(2024, 1, 1), date(2024, 1, 31), None, [(None, date(2024, 1, 1), date(2024, 1, 31))]
+    )
+    start, end, bucket, _ = _range_args(app, {'end': '2024-03-01'}, default_days=7)
+    assert (start, end, bucket) == (date(2024, 2, 23), date(2024, 3, 1), None)
+    start, end, bucket, periods = _range_args(app, {'start': (today - timedelta(days=20)).isoformat()},
+                                              default_bucket='week')
+    assert (start, end, bucket) == (today - timedelta(days=20), today, 'week')
+    assert periods == bucket_periods(start, end, 'week')
+
+    _, _, _, periods = _range_args(app, {'start': '2024-01-30', 'end': '2024-03-02', 'bucket': 'month'})
+    assert periods == [
+        ('2024-01', date(2024, 1, 30), date(2024, 1, 31)),
+        ('2024-02', date(2024, 2, 1), date(2024, 2, 29)),
+        ('2024-03', date(2024, 3, 1), date(2024, 3, 2)),
+    ]
+
+
+@pytest.mark.parametrize('query_string', [
+    {'start': '2024-13-01'},
+    {'end': 'yesterday'},
+    {'start': '2024-02-01', 'end': '2024-01-01'},
+    {'start': '2024-01-01', 'bucket': 'year'},
+    {'end': '0001-01-05'},
+    {'start': '9999-12-30', 'end': '9999-12-31', 'bucket': 'day'},
+    {'start': '9999-12-01', 'end': '9999-12-31', 'bucket': 'week'},
+    {'start': '9999-11-01', 'end': '9999-12-31', 'bucket': 'month'},
+])
+def test_requested_range_rejects_invalid(app, query_string):
+    with pytest.raises(ValueError):
+        _range_args(app, query_string)
+
+
+def test_requested_range_bucket_limit(app, client, user):
+    start = date(2020, 1, 1)
+    below = {'start': start.isoformat(), 'bucket': 'day',
+             'end': (start + timedelta(days=constants.MAX_METRIC_BUCKETS - 1)).isoformat()}
+    assert len(_range_args(app, below)[3]) == constants.MAX_METRIC_BUCKETS
+
+    above = dict(below, end=(start + timedelta(days=constants.MAX_METRIC_BUCKETS)).isoformat())
+    with pytest.raises(ValueError, match='buckets per request'):
+        _range_args(app, above)
+    response = client.get('/metrics/api/volume-trend/', query_string=above)
+    assert response.status_code == 400
+    response = client.get('/metrics/api/volume-trend/', query_string={'end': '9999-12-31', 'bucket': 'day'})
+    assert response.status_code == 400
+
+    # Weeks are counted as weeks, partial first and last ones included
+    three_years = {'start': '2021-01-01', 'end': '2023-12-31', 'bucket': 'week'}
+    assert len(_range_args(app, three_years)[3]) == 157
+    monday = date(2020, 1, 6)
+    weeks = {'start': (monday + timedelta(days=6)).isoformat(), 'bucket': 'week',
+             'end': (monday + timedelta(weeks=constants.MAX_METRIC_BUCKETS - 1)).isoformat()}
+    assert len(_range_args(app, weeks)[3]) == constants.MAX_METRIC_BUCKETS
+    with pytest.raises(ValueError, match='buckets per request'):
+        _range_args(app, dict(weeks, end=(monday + timedelta(weeks=constants.MAX_METRIC_BUCKETS)).isoformat()))
+
+    # Without a bucket any span is a single lookup
+    response = client.get('/metrics/api/consistency/', query_string={'start': '1900-01-01'})
+    assert response.status_code == 200
+
+
+def _sql_totals(user_id, first, last):
+    """Reference totals for one period, straight from the set rows"""
+    in_period = (Exercise.user_id == user_id, Exercise.date >= first, Exercise.date <= last)
+    volume = db.session.query(func.sum(Exercise.weight * Exercise.reps * Exercise.sets)).filter(*in_period).scalar()
+    by_body_part = dict(db.session.query(
+        Exercise.body_part_id, func.sum(Exercise.weight * Exercise.reps * Exercise.sets)
+    ).filter(*in_period).group_by(Exercise.body_part_id).all())
+    exercises = db.session.query(func.count(func.distinct(Exercise.exercise_key_expr()))).filter(*in_period).scalar()
+    workout_days = db.session.query(func.count(func.distinct(Workout.date))).filter(
+        Workout.user_id == user_id, Workout.date >= first, Workout.date <= last
+    ).scalar()
+    return volume or 0, by_body_part, exercises, workout_days
+
+
+def test_prefix_sums_match_sql(client, user, log_sets):
+    today = date.today()
+    log_sets(today)
+    log_sets(today, body_part='Legs', standard_exercise_id=2, weight=150.0, reps=5, sets=2)
+    log_sets(today - timedelta(days=3), weight=90.0, reps=10, sets=4)
+    log_sets(today - timedelta(days=40), body_part='Legs', standard_exercise_id=2, weight=120.0, reps=6, sets=3)
+    log_sets(today - timedelta(days=41), weight=80.0, reps=12, sets=1)
+    db.session.expire_all()
+
+    prefix_sums = DailyPrefixSums.load(user.user_id)
+    periods = bucket_periods(today - timedelta(days=60), today, 'week') + [
+        (None, today - timedelta(days=41), today),
+        (None, today, today),
+        (None, today - timedelta(days=2), today - timedelta(days=1)),
+        (None, today + timedelta(days=1), today + timedelta(days=30)),
+    ]
+    volumes = prefix_sums.volume(periods)
+    body_part_volumes = prefix_sums.body_part_volume(periods)
+    exercises = prefix_sums.distinct_exercises(periods)
+    workout_days = prefix_sums.workout_days(periods)
+
+    for index, (_, first, last) in enumerate(periods):
+        volume, by_body_part, exercise_count, workout_count = _sql_totals(user.user_id, first, last)
+        assert volumes[index] == pytest.approx(volume)
+        for body_part_id, name in ((1, 'Chest'), (3, 'Legs')):
+            assert body_part_volumes[name][index] == pytest.approx(by_body_part.get(body_part_id, 0))
+        assert exercises[index] == exercise_count
+        assert workout_days[index] == workout_count
+
+
+def test_prefix_sums_years_apart_stay_small(client, user, log_sets):
+    today = date.today()
+    long_ago = date(1950, 6, 1)
+    log_sets(long_ago, weight=50.0, reps=10, sets=1)
+    log_sets(today)
+    db.session.expire_all()
+
+    prefix_sums = DailyPrefixSums.load(user.user_id)
+
+    # One column per logged day, not per day in between
+    assert prefix_sums.num_days == 2
+    assert prefix_sums.volume_prefix.shape == (1, 3)
+    periods = [(None, long_ago, long_ago), (None, long_ago + timedelta(days=1), today - timedelta(days=1)),
+               (None, long_ago, today), (None, date(1900, 1, 1), long_ago - timedelta(days=1))]
+    assert prefix_sums.volume(periods).tolist() == [500.0, 0.0, 2900.0, 0.0]
+    assert prefix_sums.workout_days(periods).tolist() == [1, 0, 2, 0]
+    assert prefix_sums.distinct_exercises(periods).tolist() == [1, 0, 1, 0]
+
+    response = client.get('/metrics/api/consistency/', query_string={'start': '1950-01-01'})
+    assert response.get_json()['workout_count'] == 2
+
+
+@pytest.mark.parametrize('day', ['0001-01-01', '1899-12-31', (date.today() + timedelta(days=400)).isoformat()])
+def test_implausible_workout_dates_rejected(client, user, day):
+    response = client.post('/workout/api/exercise_log', json={
+        'date': day, 'bodyPart': 'Chest', 'standardExerciseId': 1, 'weight': 100.0, 'reps': 8, 'sets': 1
+    })
+    assert response.status_code == 400
+    assert Exercise.query.count() == 0
+
+
+def test_training_calendar(client, user, log_sets):
+    for day in (date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3), date(2024, 3, 10)):
+        log_sets(day)
+    log_sets(date(2024, 1, 2), body_part='Legs', standard_exercise_id=2)
+    log_sets(date(2023, 12, 31), body_part='Legs', standard_exercise_id=2)
+
+    response = client.get('/metrics/api/training-calendar', query_string={'year': 2024})
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'year': 2024,
+        'days_trained': 4,
+        'longest_streak': 3,
+        'body_parts': {'Chest': 4, 'Legs': 1},
+        'days': {
+            '2024-01-01': ['Chest'],
+            '2024-01-02': ['Chest', 'Legs'],
+            '2024-01-03': ['Chest'],
+            '2024-03-10': ['Chest'],
+        }
+    }
+    calendar = client.get('/metrics/api/training-calendar', query_string={'year': 2023}).get_json()
+    assert (calendar['days_trained'], calendar['days']) == (1, {'2023-12-31': ['Legs']})
+    assert client.get('/metrics/api/training-calendar', query_string={'year': 1066}).status_code == 400
+
+
+def test_rest_efficiency(client, user, log_sets):
+    today = date.today()
+    started = datetime.combine(today, datetime.min.time()).replace(hour=10)
+
+    def log_at(seconds, **sets):
+        completed_at = (started + timedelta(seconds=seconds)).isoformat() + 'Z'
+        log_sets(today, completedAt=completed_at, **sets)
+
+    log_at(0, sets=1)                       # First set of the workout: no rest
+    log_at(90, sets=1)                      # Merged into the same row, 90s rest
+    log_at(210, weight=80.0, sets=2)        # 120s for two sets: 60s each
+    log_at(5000, weight=60.0, sets=1)       # A break, not rest
+
+    # Rest merged into the compact row
+    db.session.expire_all()
+    row = Exercise.query.filter_by(weight=100.0).one()
+    assert (row.sets, row.rest_seconds, row.rest_sets) == (2, 90, 1)
+    assert Exercise.query.filter_by(weight=60.0).one().rest_sets == 0
+
+    response = client.get('/metrics/api/rest-efficiency/')
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['dates'] == [today.isoformat()]
+    assert data['average_rest_times'] == [70.0]
+    assert data['median_rest_times'] == [71.2]
+    assert data['p90_rest_times'] == [100.5]
+    assert data['overall'] == {
+        'sets': 3, 'average_rest_time': 70.0, 'median_rest_time': 71.2, 'p90_rest_time': 100.5
+    }
+    summary = db.session.get(DailyRestSummary, (user.user_id, today))
+    assert (summary.rest_sets, summary.rest_seconds) == (3, 210)
+
+    # Outside the requested range: nothing
+    empty = client.get('/metrics/api/rest-efficiency/', query_string={
+        'start': (today - timedelta(days=30)).isoformat(), 'end': (today - timedelta(days=1)).isoformat()
+    }).get_json()
+    assert (empty['dates'], empty['overall']['sets'], empty['overall']['median_rest_time']) == ([], 0, None)
@@ -0,0 +1,214 @@
+"""
+Tests for the set logging and deletion routes (rep_logger.py).
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.models import db, User, CustomExercise, Exercise, Workout, PersonalRecord, WeeklyVolume
+
+
+def _other_users_custom_exercise():
+    other = User(username='otheruser', email='other@example.com')
+    other.set_password('password123')
+    db.session.add(other)
+    db.session.commit()
+    custom = CustomExercise(user_id=other.user_id, body_part_id=1, exercise_name='Secret Press')
+    db.session.add(custom)
+    db.session.commit()
+    return custom.custom_exercise_id
+
+
+def test_custom_exercise_must_be_owned(client, user):
+    """
+    Test both logging routes reject another user's custom exercise.
+    """
+    foreign_id = _other_users_custom_exercise()
+    own = CustomExercise(user_id=user.user_id, body_part_id=1, exercise_name='My Press')
+    db.session.add(own)
+    db.session.commit()
+
+    # Act
+    single = client.post('/workout/api/exercise_log', json={
+        'date': date.today().isoformat(), 'bodyPart': 'Chest',
+        'customExerciseId': foreign_id, 'weight': 50, 'reps': 5, 'sets': 1
+    })
+    session = client.post('/workout/api/session_log', json={
+        'date': date.today().isoformat(),
+        'exercises': [
+            {'bodyPart': 'Chest', 'customExerciseId': own.custom_exercise_id, 'weight': 50, 'reps': 5, 'sets': 1},
+            {'bodyPart': 'Chest', 'customExerciseId': foreign_id, 'weight': 50, 'reps': 5, 'sets': 1},
+        ]
+    })
+    allowed = client.post('/workout/api/exercise_log', json={
+        'date': date.today().isoformat(), 'bodyPart': 'Chest',
+        'customExerciseId': own.custom_exercise_id, 'weight': 50, 'reps': 5, 'sets': 1
+    })
+
+    # Assert
+    assert single.status_code == 400
+    assert session.status_code == 400
+    assert session.get_json() == {'error': 'Invalid exercise', 'exercise_index': 1}
+    assert allowed.status_code == 201
+    assert Exercise.query.filter_by(custom_exercise_id=foreign_id).count() == 0
+    assert Exercise.query.count() == 1
+
+
+@pytest.mark.parametrize('autoinc_lock_mode', [None, 1, 2])
+def test_session_log_returns_per_set_ids(client, user, monkeypatch, autoinc_lock_mode):
+    """
+    Test a session is stored with one multi-row INSERT and every set gets
+    its row's ID: from RETURNING, or without it (the MySQL path) from
+    consecutive auto-increment IDs (lock mode 1) or read back (lock mode 2).
+    """
+    engine = db.session.get_bind()
+    if autoinc_lock_mode is not None:
+        # Behave like MySQL: no RETURNING for single or multi-row INSERTs
+        for flag in ('insert_returning', 'insert_executemany_returning',
+                     'insert_executemany_returning_sort_by_parameter_order', 'use_insertmanyvalues'):
+            monkeypatch.setattr(engine.dialect, flag, False)
+        monkeypatch.setattr(Exercise, '_autoinc_lock_mode', classmethod(lambda cls: autoinc_lock_mode))
+
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO "Exercises"'):
+            inserts.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count_inserts)
+
+    # Act
+    response = client.post('/workout/api/session_log', json={
+        'date': date.today().isoformat(),
+        'exercises': [
+            {'bodyPart': 'Chest', 'standardExerciseId': 1,
+             'sets': [{'weight': 100, 'reps': 8}, {'weight': 100, 'reps': 8}, {'weight': 110, 'reps': 5}]},
+            {'bodyPart': 'Legs', 'standardExerciseId': 2, 'weight': 150, 'reps': 5, 'sets': 2},
+        ]
+    })
+
+    # Assert
+    assert response.status_code == 201
+    bench_ids, squat_ids = response.get_json()['exercise_ids']
+    assert len(bench_ids) == 3 and len(squat_ids) == 2
+    stored = {row.exercise_id: row for row in Exercise.query}
+    assert [(stored[i].weight, stored[i].reps) for i in bench_ids] == [(100, 8), (100, 8), (110, 5)]
+    assert [(stored[i].weight, stored[i].standard_exercise_id) for i in squat_ids] == [(150, 2), (150, 2)]
+    assert sum(row.sets for row in stored.values()) == 5
+    event.remove(engine, 'before_cursor_execute', count_inserts)
+    if autoinc_lock_mode is not None:
+        # SQLite's RETURNING path is sent row by row to keep the order
+        assert len(inserts) == 1
+
+
+def test_session_log_rejects_bad_entries_atomically(client, user):
+    """
+    Test one invalid exercise rejects the whole session without writing.
+    """
+    response = client.post('/workout/api/session_log', json={
+        'date': date.today().isoformat(),
+        'exercises': [
+            {'bodyPart': 'Chest', 'standardExerciseId': 1, 'weight': 100, 'reps': 8, 'sets': 3},
+            {'bodyPart': 'Chest', 'standardExerciseId': 1, 'sets': [{'weight': 100, 'reps': -1}]},
+        ]
+    })
+    bad_body_part = client.post('/workout/api/session_log', json={
+        'exercises': [{'bodyPart': 'Tail', 'standardExerciseId': 1, 'weight': 100, 'reps': 8}]
+    })
+    empty = client.post('/workout/api/session_log', json={'exercises': []})
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json()['exercise_index'] == 1
+    assert bad_body_part.status_code == 400
+    assert empty.status_code == 400
+    assert Exercise.query.count() == 0
+    assert Workout.query.count() == 0
+
+
+def test_identical_sets_merge_into_previous_row(log_sets, user):
+    """
+    Test logging the same exercise, weight and reps again bumps the last row.
+    """
+    today = date.today()
+    log_sets(today, sets=3)
+    log_sets(today, sets=2)
+    log_sets(today, weight=110.0, sets=1)
+    log_sets(today, sets=1)  # Not consecutive with the first group
+
+    rows = Exercise.query.order_by(Exercise.exercise_id).all()
+    assert [(row.weight, row.sets) for row in rows] == [(100.0, 5), (110.0, 1), (100.0, 1)]
+
+
+def test_partial_delete_decrements_set_count(client, log_sets, user):
+    """
+    Test deleting fewer sets than a group holds keeps the row.
+    """
+    log_sets(date.today(), sets=5)
+    lift = Exercise.query.one()
+
+    response = client.delete(f'/workout/api/logged-sets/{lift.exercise_id}?count=2')
+
+    assert response.status_code == 200
+    db.session.refresh(lift)
+    assert lift.sets == 3
+    assert len(client.get('/workout/api/logged-sets').get_json()['logged_sets']) == 3
+
+
+def test_full_delete_removes_row_and_refreshes_record(client, log_sets, user):
+    """
+    Test deleting a whole group removes it and recomputes the personal record.
+    """
+    today = date.today()
+    log_sets(today, weight=100.0, sets=2)
+    log_sets(today, weight=120.0, sets=1)
+    heaviest = Exercise.query.filter_by(weight=120.0).one()
+    assert PersonalRecord.query.one().weight == 120.0
+
+    response = client.delete(f'/workout/api/logged-sets/{heaviest.exercise_id}?count=1')
+
+    assert response.status_code == 200
+    assert Exercise.query.filter_by(exercise_id=heaviest.exercise_id).first() is None
+    assert PersonalRecord.query.one().weight == 100.0
+
+
+def test_delete_count_larger_than_group(client, log_sets, user):
+    """
+    Test a count above the stored set count deletes just that group.
+    """
+    today = date.today()
+    log_sets(today, weight=100.0, sets=2)
+    log_sets(today, weight=110.0, sets=4)
+    lift = Exercise.query.filter_by(weight=100.0).one()
+
+    response = client.delete(f'/workout/api/logged-sets/{lift.exercise_id}?count=10')
+
+    assert response.status_code == 200
+    assert [(row.weight, row.sets) for row in Exercise.query] == [(110.0, 4)]
+    assert WeeklyVolume.query.one().set_count == 4
+
+
+def test_coalesce_sets_is_idempotent(user):
+    """
+    Test coalescing one-row-per-set history collapses runs once and then
+    finds nothing left to do.
+    """
+    workout = Workout(user_id=user.user_id, date=date.today())
+    db.session.add(workout)
+    db.session.commit()
+    for weight in (100.0, 100.0, 100.0, 110.0, 100.0, 100.0):
+        db.session.add(Exercise(
+            workout_id=workout.workout_id, user_id=user.user_id, body_part_id=1,
+            standard_exercise_id=1, weight=weight, reps=8, sets=1, date=workout.date
+        ))
+    db.session.commit()
+
+    first = Exercise.coalesce_sets(user.user_id)
+    second = Exercise.coalesce_sets(user.user_id)
+
+    assert first == (2, 3)
+    assert second == (0, 0)
+    rows = Exercise.query.order_by(Exercise.exercise_id).all()
+    assert [(row.weight, row.sets) for row in rows] == [(100.0, 3), (110.0, 1), (100.0, 2)]
@@ -193,7 +193,7 @@ def test_get_exercise_progression(client):
     Test getting progression data for an exercise.
     """
     from datetime import date, timedelta
-    from app.models import Workout, Exercise, StandardExercise, BodyPart
+    from app.models import Workout, Exercise, StandardExercise, BodyPart, DailyExerciseSummary
     
     # Arrange: Create user and workouts with exercise data
     user = User(username='testuser', email='test@example.com')
@@ -241,6 +241,8 @@ def test_get_exercise_progression(client):
         db.session.add(exercise)
     
     db.session.commit()
+    # Sets were inserted directly, so build the daily summaries the endpoint reads
+    DailyExerciseSummary.rebuild(user.user_id)
     
     # Login the user
     with client:
@@ -358,3 +360,113 @@ def test_unauthorized_access_shows_flash_message(client):
     assert response.status_code == 200
     # The flash message is in the HTML
     assert b'Please log in' in response.data or b'login' in response.data.lower()
+
+
+def test_dashboard_summary(client):
+    """
+    Test the dashboard summary aggregates the selected day and all-time max lift.
+    """
+    from datetime import date
+    from app.models import Workout, Exercise, StandardExercise, BodyPart, DashboardSummary, PersonalRecord, TrainingDayBitmap
+
+    # Arrange: Create user with two sets logged today
+    user = User(username='testuser', email='test@example.com')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+
+    body_part = BodyPart(body_part_name='Chest')
+    db.session.add(body_part)
+    db.session.commit()
+
+    bench_press = StandardExercise(body_part_id=body_part.body_part_id, exercise_name='Bench Press')
+    db.session.add(bench_press)
+    db.session.commit()
+
+    workout = Workout(user_id=user.user_id, date=date.today(), workout_name='Chest Day')
+    db.session.add(workout)
+    db.session.commit()
+
+    for weight in (135.0, 155.0):
+        db.session.add(Exercise(
+            workout_id=workout.workout_id,
+            user_id=user.user_id,
+            body_part_id=body_part.body_part_id,
+            standard_exercise_id=bench_press.standard_exercise_id,
+            sets=1,
+            reps=5,
+            weight=weight,
+            date=date.today()
+        ))
+    db.session.commit()
+    PersonalRecord.rebuild(user.user_id)
+    TrainingDayBitmap.rebuild(user.user_id)
+
+    # Act
+    summary = DashboardSummary.for_user(user.user_id, date.today())
+
+    # Assert
+    assert summary.workouts_this_week == 1
+    assert summary.total_weight_lifted == 290.0
+    assert summary.total_reps_performed == 10
+    assert summary.max_single_lift == 155.0
+    assert summary.max_lift_name == 'Bench Press'
+    assert summary.unique_exercises_count == 1
+    assert summary.workout_streak == 1
+    assert summary.recent_prs == [{'name': 'Bench Press', 'weight': 155.0, 'date': date.today()}]
+
+
+def test_training_history_matches_daily_summary(client):
+    """
+    Test the columnar engine's progression matches the SQL daily summaries.
+    """
+    from datetime import date, timedelta
+    from app.models import Workout, Exercise, StandardExercise, BodyPart, DailyExerciseSummary
+    from app.analitics import TrainingHistory
+
+    # Arrange: Create user with two sets on each of three days
+    user = User(username='testuser', email='test@example.com')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+
+    body_part = BodyPart(body_part_name='Legs')
+    db.session.add(body_part)
+    db.session.commit()
+
+    squat = StandardExercise(body_part_id=body_part.body_part_id, exercise_name='Squats')
+    db.session.add(squat)
+    db.session.commit()
+
+    for i in range(3):
+        workout_date = date.today() - timedelta(days=i * 2)
+        workout = Workout(user_id=user.user_id, date=workout_date, workout_name='Leg Day')
+        db.session.add(workout)
+        db.session.commit()
+        for weight, reps in ((185.0 + i * 10, 5), (205.0 + i * 10, 1)):
+            db.session.add(Exercise(
+                workout_id=workout.workout_id,
+                user_id=user.user_id,
+                body_part_id=body_part.body_part_id,
+                standard_exercise_id=squat.standard_exercise_id,
+                sets=2,
+                reps=reps,
+                weight=weight,
+                date=workout_date
+            ))
+    db.session.commit()
+    DailyExerciseSummary.rebuild(user.user_id)
+
+    # Act
+    history = TrainingHistory.load(user.user_id)
+    progression = history.progression('Squats')
+    rows = DailyExerciseSummary.progression_rows(user.user_id, exercise_names=['Squats'])
+
+    # Assert
+    assert len(history) == 6
+    assert progression['dates'] == [row.date.isoformat() for row in rows]
+    assert progression['max_weights'] == [row.max_weight for row in rows]
+    assert progression['volumes'] == [row.total_volume for row in rows]
+    assert progression['estimated_1rms'] == [round(row.best_e1rm, 1) for row in rows]
+    assert progression['personal_record'] == {'weight': 225.0, 'date': rows[0].date.isoformat()}
+    assert history.diversity(date.today() - timedelta(days=30)) == {'unique_exercises': 1}
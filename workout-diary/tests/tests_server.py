@@ -0,0 +1,63 @@
+"""
+Tests for the production server settings (server.py).
+"""
+
+import pytest
+from flask import Flask
+
+from app import constants
+from app.server import ProductionServer, default_workers, server_options
+
+WEB_SETTINGS = ('WEB_CONCURRENCY', 'WEB_THREADS', 'WEB_MAX_REQUESTS', 'WEB_TIMEOUT', 'WEB_GRACEFUL_TIMEOUT')
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in WEB_SETTINGS:
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_server_options_defaults():
+    options = server_options(8000)
+
+    assert options['bind'] == '0.0.0.0:8000'
+    assert options['workers'] == default_workers() <= constants.WEB_MAX_WORKERS
+    assert options['threads'] == constants.WEB_THREADS
+    assert options['max_requests'] == constants.WEB_MAX_REQUESTS
+    assert options['max_requests_jitter'] == constants.WEB_MAX_REQUESTS // 10
+    assert options['timeout'] == constants.WEB_TIMEOUT
+    assert options['graceful_timeout'] == constants.WEB_GRACEFUL_TIMEOUT
+    assert options['preload_app'] is True
+
+
+def test_server_options_from_env(monkeypatch):
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('WEB_THREADS', '8')
+    monkeypatch.setenv('WEB_MAX_REQUESTS', '5')
+    monkeypatch.setenv('WEB_TIMEOUT', '60')
+    monkeypatch.setenv('WEB_GRACEFUL_TIMEOUT', '10')
+
+    options = server_options(5000)
+
+    assert (options['workers'], options['threads'], options['timeout'], options['graceful_timeout']) == (3, 8, 60, 10)
+    assert (options['max_requests'], options['max_requests_jitter']) == (5, 1)
+
+
+@pytest.mark.parametrize('name', WEB_SETTINGS)
+@pytest.mark.parametrize('value', ['two', '0', '-1', '1.5'])
+def test_server_options_reject_bad_values(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+
+    with pytest.raises(ValueError, match=name):
+        server_options(8000)
+
+
+def test_worker_hooks_registered():
+    app = Flask(__name__)
+    server = ProductionServer(app, server_options(8000))
+
+    assert server.cfg.post_fork == server._post_fork
+    assert server.cfg.worker_exit == server._worker_exit
+    assert server.cfg.workers == default_workers()
+    assert server.cfg.worker_class_str == 'gthread'
+    assert server.load() is app
@@ -0,0 +1,131 @@
+"""
+Tests for the static build (build_static.py) and fingerprinted serving
+(static_assets.py).
+"""
+
+import gzip
+import json
+import os
+import re
+
+import pytest
+from flask import Flask, url_for
+
+import build_static
+from app import constants
+from app.static_assets import StaticManifest, init_static_assets
+
+SCRIPT = b'function greet() { return "hello"; }\n' * 100    # Compressible, over COMPRESSION_MIN_SIZE
+STYLES = b'body { margin: 0; }\n'                           # Too small to precompress
+IMAGE = b'\x89PNG\r\n\x1a\n' + bytes(range(256))
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    """A static folder built with `build_static.py --skip-tailwind`"""
+    files = {
+        'app.js': SCRIPT,
+        'styles.css': STYLES,
+        'images/logo.png': IMAGE,
+        'tailwind.config.js': b'module.exports = {}',
+        '.DS_Store': b'',
+    }
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    monkeypatch.setattr(build_static, 'STATIC_DIR', str(tmp_path))
+
+    build_static.build_static(skip_tailwind=True)
+    return tmp_path
+
+
+def _app(static_dir, fingerprint=True):
+    app = Flask(__name__, static_folder=str(static_dir), static_url_path='/static')
+    app.config['STATIC_FINGERPRINT'] = fingerprint
+    init_static_assets(app)
+    return app
+
+
+def test_build_writes_hashed_files_and_manifest(static_dir):
+    manifest = json.loads((static_dir / 'dist' / 'manifest.json').read_text())['files']
+
+    # Build inputs and dotfiles are not served
+    assert sorted(manifest) == ['app.js', 'images/logo.png', 'styles.css']
+    for name, content in (('app.js', SCRIPT), ('styles.css', STYLES), ('images/logo.png', IMAGE)):
+        path = manifest[name]['path']
+        stem, extension = os.path.splitext(name)
+        assert re.fullmatch(rf"dist/{stem}\.[0-9a-f]{{{constants.STATIC_HASH_LENGTH}}}{extension}", path)
+        assert (static_dir / path).read_bytes() == content
+
+    assert manifest['app.js']['encodings'] == ['gzip']
+    assert gzip.decompress((static_dir / (manifest['app.js']['path'] + '.gz')).read_bytes()) == SCRIPT
+    assert manifest['styles.css']['encodings'] == manifest['images/logo.png']['encodings'] == []
+
+    # Rebuilding the same content gives the same names and clears old output
+    (static_dir / 'dist' / 'stale.js').write_bytes(b'')
+    build_static.build_static(skip_tailwind=True)
+    assert json.loads((static_dir / 'dist' / 'manifest.json').read_text())['files'] == manifest
+    assert not (static_dir / 'dist' / 'stale.js').exists()
+
+
+def test_manifest_load(static_dir, tmp_path_factory):
+    manifest = StaticManifest.load(str(static_dir))
+    path = manifest.hashed_path('app.js')
+
+    assert manifest and path.startswith('dist/app.')
+    assert manifest.encodings(path) == ['gzip']
+    assert manifest.hashed_path('missing.js') is None
+    assert manifest.encodings('app.js') is None
+
+    assert not StaticManifest.load(str(tmp_path_factory.mktemp('unbuilt')))
+
+
+def test_url_for_rewrites_to_hashed_path(static_dir):
+    app = _app(static_dir)
+    manifest = app.extensions['static_manifest']
+
+    with app.test_request_context():
+        assert url_for('static', filename='app.js') == '/static/' + manifest.hashed_path('app.js')
+        assert url_for('static', filename='/images/logo.png') == '/static/' + manifest.hashed_path('images/logo.png')
+        assert url_for('static', filename='unknown.js') == '/static/unknown.js'
+
+    with _app(static_dir, fingerprint=False).test_request_context():
+        assert url_for('static', filename='app.js') == '/static/app.js'
+
+
+def test_fingerprinted_file_served_precompressed_and_immutable(static_dir):
+    app = _app(static_dir)
+    path = app.extensions['static_manifest'].hashed_path('app.js')
+    client = app.test_client()
+
+    compressed = client.get(f'/static/{path}', headers={'Accept-Encoding': 'gzip, br'})
+    assert compressed.status_code == 200
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.mimetype == 'text/javascript'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.data) == SCRIPT
+    cache_control = compressed.cache_control
+    assert cache_control.public and cache_control.immutable
+    assert cache_control.max_age == constants.STATIC_MAX_AGE_SECONDS
+    compressed.close()
+
+    identity = client.get(f'/static/{path}', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers
+    assert identity.data == SCRIPT
+    identity.close()
+
+
+def test_unfingerprinted_file_served_as_before(static_dir):
+    app = _app(static_dir)
+    client = app.test_client()
+
+    logo = client.get('/static/' + app.extensions['static_manifest'].hashed_path('images/logo.png'))
+    assert logo.data == IMAGE and logo.cache_control.immutable
+    assert 'Vary' not in logo.headers
+    logo.close()
+
+    plain = client.get('/static/styles.css')
+    assert plain.data == STYLES
+    assert not plain.cache_control.immutable
+    plain.close()
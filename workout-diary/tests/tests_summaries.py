@@ -0,0 +1,347 @@
+"""
+Tests for the write-maintained summary tables: incremental updates through
+the logging and delete routes must stay equal to a rebuild from Exercises.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app import constants
+from app.models import (
+    db, Exercise, WorkoutStreak, WeeklyVolume, DailyExerciseSummary, TrainingDayBitmap, DailyRestSummary,
+    PersonalRecord
+)
+
+
+def test_streak_read_does_not_persist(log_sets, user):
+    """
+    Test WorkoutStreak.for_user computes a missing row without storing it.
+    """
+    today = date.today()
+    for days_ago in (2, 1, 0):
+        log_sets(today - timedelta(days=days_ago))
+    WorkoutStreak.query.delete()
+    db.session.commit()
+
+    # Act
+    state = WorkoutStreak.for_user(user.user_id)
+    db.session.commit()
+
+    # Assert
+    assert (state.current_streak, state.longest_streak, state.last_workout_date) == (3, 3, today)
+    assert state.active_streak() == 3
+    assert db.session.get(WorkoutStreak, user.user_id) is None
+
+
+def test_streak_rebuilds_missing_bitmaps(client, log_sets, user):
+    """
+    Test a user whose history predates the bitmaps gets them rebuilt on
+    their next write, so the streak counts the old days.
+    """
+    today = date.today()
+    for days_ago in (3, 2, 1):
+        log_sets(today - timedelta(days=days_ago))
+    TrainingDayBitmap.query.delete()
+    WorkoutStreak.query.delete()
+    db.session.commit()
+
+    # Act
+    log_sets(today)
+
+    # Assert
+    db.session.expire_all()
+    state = db.session.get(WorkoutStreak, user.user_id)
+    assert (state.current_streak, state.longest_streak, state.last_workout_date) == (4, 4, today)
+    assert client.get('/metrics/api/consistency/').get_json()['streak'] == 4
+    _assert_matches_rebuild(TrainingDayBitmap, user.user_id)
+
+
+def test_streak_recompute_without_bitmaps(log_sets, user):
+    """
+    Test recompute falls back to rebuilding the bitmaps when there are none.
+    """
+    today = date.today()
+    for days_ago in (1, 0):
+        log_sets(today - timedelta(days=days_ago))
+    TrainingDayBitmap.query.delete()
+    db.session.commit()
+
+    state = WorkoutStreak.recompute(user.user_id)
+    db.session.commit()
+
+    assert (state.current_streak, state.last_workout_date) == (2, today)
+    assert TrainingDayBitmap.query.count() == 2    # Chest and ANY_BODY_PART, this year
+
+
+def test_streak_across_year_boundary(log_sets, user):
+    """
+    Test a run of days spanning New Year counts as one streak.
+    """
+    for day in (date(2023, 12, 28), date(2023, 12, 30), date(2023, 12, 31), date(2024, 1, 1), date(2024, 1, 2)):
+        log_sets(day)
+    db.session.expire_all()
+
+    state = db.session.get(WorkoutStreak, user.user_id)
+    assert (state.current_streak, state.longest_streak, state.last_workout_date) == (4, 4, date(2024, 1, 2))
+
+    # Back-filled across the boundary: recomputed from both years' bitmaps
+    log_sets(date(2023, 12, 29))
+    db.session.expire_all()
+    state = db.session.get(WorkoutStreak, user.user_id)
+    assert (state.current_streak, state.longest_streak) == (6, 6)
+    assert WorkoutStreak._compute(user.user_id) == (6, 6, date(2024, 1, 2))
+
+
+def _snapshot(model):
+    """Every row of a summary table as sorted tuples (floats rounded)"""
+    db.session.expire_all()
+    columns = [column.name for column in model.__table__.columns]
+    return sorted(
+        tuple(round(value, 6) if isinstance(value, float) else value
+              for value in (getattr(row, column) for column in columns))
+        for row in model.query
+    )
+
+
+def _assert_matches_rebuild(model, user_id):
+    maintained = _snapshot(model)
+    model.rebuild(user_id)
+    assert maintained == _snapshot(model)
+    return maintained
+
+
+def _log_then_delete(client, log_sets, model, user_id):
+    """
+    Log sets over two weeks, delete part of a group, then whole groups
+    (including a day's last group), checking `model` against a rebuild
+    after every step.
+    """
+    today = date.today()
+    last_week = today - timedelta(days=8)
+    log_sets(today, weight=100.0, reps=8, sets=3)
+    log_sets(today, body_part='Legs', standard_exercise_id=2, weight=150.0, reps=5, sets=2)
+    log_sets(today, weight=110.0, reps=5, sets=1)
+    log_sets(last_week, weight=90.0, reps=10, sets=4)
+    assert _assert_matches_rebuild(model, user_id)
+
+    rows = {(row.date, row.weight): row.exercise_id for row in Exercise.query}
+    steps = [
+        (rows[(today, 100.0)], 1),      # Partial delete
+        (rows[(today, 150.0)], 2),      # Whole group, last Legs set of the day
+        (rows[(today, 110.0)], 5),      # Count above the group's sets
+        (rows[(last_week, 90.0)], 4),   # The day's last set
+    ]
+    for exercise_id, count in steps:
+        response = client.delete(f'/workout/api/logged-sets/{exercise_id}?count={count}')
+        assert response.status_code == 200
+        _assert_matches_rebuild(model, user_id)
+
+    return _snapshot(model)
+
+
+def test_personal_record_upsert_keeps_best(log_sets, user):
+    """
+    Test the personal record upsert keeps the heaviest set, and the earliest
+    date on a tie.
+    """
+    today = date.today()
+    log_sets(today - timedelta(days=5), weight=100.0, reps=5)
+    log_sets(today - timedelta(days=3), weight=120.0, reps=3)
+    log_sets(today - timedelta(days=2), weight=110.0, reps=8)     # Lighter: ignored
+    log_sets(today - timedelta(days=1), weight=120.0, reps=6)     # Tie: keeps the earlier date
+    log_sets(today - timedelta(days=4), weight=120.0, reps=2)     # Back-filled tie: earlier, so it wins
+    db.session.expire_all()
+
+    record = PersonalRecord.query.one()
+    assert (record.weight, record.reps, record.date) == (120.0, 2, today - timedelta(days=4))
+
+    log_sets(today, weight=125.0, reps=1)
+    db.session.expire_all()
+    record = PersonalRecord.query.one()
+    assert (record.weight, record.reps, record.date) == (125.0, 1, today)
+
+
+def test_weekly_volume_upsert(user):
+    """
+    Test WeeklyVolume.add inserts a new week, adds to an existing one and
+    deletes a week that drops to zero sets.
+    """
+    monday = date(2024, 1, 8)
+    WeeklyVolume.add(user.user_id, 1, monday, 100.0, 8, 3)
+    WeeklyVolume.add(user.user_id, 1, monday + timedelta(days=2), 50.0, 10, 1)
+    db.session.commit()
+
+    week = WeeklyVolume.query.one()
+    assert (week.week_start, week.volume, week.set_count, week.rep_count) == (monday, 2900.0, 4, 34)
+
+    WeeklyVolume.add(user.user_id, 1, monday, 100.0, 8, -3)
+    WeeklyVolume.add(user.user_id, 1, monday, 50.0, 10, -1)
+    db.session.commit()
+    assert WeeklyVolume.query.count() == 0
+
+
+def test_weekly_volume_maintained_equals_rebuild(client, log_sets, user):
+    """
+    Test incremental WeeklyVolume updates through the routes match a rebuild.
+    """
+    remaining = _log_then_delete(client, log_sets, WeeklyVolume, user.user_id)
+
+    # Only today's two remaining Bench Press sets are left
+    assert [(row[-3], row[-2], row[-1]) for row in remaining] == [(1600.0, 2, 16)]
+
+
+def test_daily_exercise_summary_upsert(user):
+    """
+    Test DailyExerciseSummary.record_sets inserts a new day and folds later
+    sets into it, keeping the larger max weight and e1RM.
+    """
+    day = date(2024, 1, 8)
+    DailyExerciseSummary.record_sets(user.user_id, 1, None, day, 100.0, 5, 3)
+    DailyExerciseSummary.record_sets(user.user_id, 1, None, day, 90.0, 10, 2)
+    DailyExerciseSummary.record_sets(user.user_id, 1, None, day, 110.0, 1, 1)
+    db.session.commit()
+
+    summary = DailyExerciseSummary.query.one()
+    assert (summary.max_weight, summary.total_volume, summary.set_count) == (110.0, 3410.0, 6)
+    assert summary.best_e1rm == pytest.approx(DailyExerciseSummary.estimate_1rm(90.0, 10))
+
+
+def test_daily_exercise_summary_maintained_equals_rebuild(client, log_sets, user):
+    """
+    Test incremental DailyExerciseSummary updates match a rebuild.
+    """
+    remaining = _log_then_delete(client, log_sets, DailyExerciseSummary, user.user_id)
+
+    assert len(remaining) == 1
+    summary = DailyExerciseSummary.query.one()
+    assert (summary.date, summary.max_weight, summary.total_volume, summary.set_count) == (
+        date.today(), 100.0, 1600.0, 2
+    )
+
+
+def test_training_day_bitmap_maintained_equals_rebuild(client, log_sets, user):
+    """
+    Test incremental TrainingDayBitmap updates match a rebuild.
+    """
+    remaining = _log_then_delete(client, log_sets, TrainingDayBitmap, user.user_id)
+
+    # Today's Chest sets remain: one Chest bitmap and the any-body-part union
+    today = date.today()
+    day_bit = (1 << TrainingDayBitmap.day_index(today)).to_bytes(TrainingDayBitmap.BITMAP_BYTES, 'little')
+    assert remaining == [
+        (user.user_id, today.year, TrainingDayBitmap.ANY_BODY_PART, day_bit),
+        (user.user_id, today.year, 1, day_bit),
+    ]
+
+
+def test_training_day_bitmap_reads_current_row(user):
+    """
+    Test marking a day re-reads the bitmap row, keeping a bit another writer
+    set after this session loaded it, and creates a missing year's row.
+    """
+    monday = date(2024, 1, 8)
+    TrainingDayBitmap.mark_day(user.user_id, 1, monday)
+    db.session.commit()
+    key = dict(user_id=user.user_id, year=monday.year, body_part_id=1)
+    stale = db.session.get(TrainingDayBitmap, (user.user_id, monday.year, 1))
+    assert stale.bits == 1 << TrainingDayBitmap.day_index(monday)
+
+    # Another writer marks Tuesday behind the session's back
+    both = (1 << TrainingDayBitmap.day_index(monday)) | (1 << TrainingDayBitmap.day_index(monday + timedelta(days=1)))
+    TrainingDayBitmap.query.filter_by(**key).update(
+        {'days': both.to_bytes(TrainingDayBitmap.BITMAP_BYTES, 'little')}, synchronize_session=False
+    )
+
+    # Act
+    TrainingDayBitmap.mark_day(user.user_id, 1, monday + timedelta(days=2))
+    TrainingDayBitmap.mark_day(user.user_id, 1, date(2025, 1, 1))
+    db.session.commit()
+
+    # Assert
+    db.session.expire_all()
+    assert TrainingDayBitmap.query.filter_by(**key).one().bits == both | (
+        1 << TrainingDayBitmap.day_index(monday + timedelta(days=2))
+    )
+    assert TrainingDayBitmap.query.filter_by(user_id=user.user_id, year=2025, body_part_id=1).one().bits == 1
+
+
+def test_streak_record_day_reads_current_state(log_sets, user):
+    """
+    Test record_day re-reads the stored streak, building on a day another
+    writer recorded after this session loaded it.
+    """
+    monday = date(2024, 1, 8)
+    log_sets(monday)
+    stale = db.session.get(WorkoutStreak, user.user_id)
+    assert (stale.current_streak, stale.last_workout_date) == (1, monday)
+
+    # Another writer records Tuesday behind the session's back
+    WorkoutStreak.query.filter_by(user_id=user.user_id).update(
+        {'current_streak': 2, 'longest_streak': 2, 'last_workout_date': monday + timedelta(days=1)},
+        synchronize_session=False
+    )
+
+    # Act
+    WorkoutStreak.record_day(user.user_id, monday + timedelta(days=2), True)
+    db.session.commit()
+
+    # Assert
+    db.session.expire_all()
+    state = db.session.get(WorkoutStreak, user.user_id)
+    assert (state.current_streak, state.longest_streak, state.last_workout_date) == (3, 3, monday + timedelta(days=2))
+
+
+def test_rest_summary_folds_groups():
+    """
+    Test _summarize buckets each group's average rest and drops the share
+    of deleted sets.
+    """
+    groups = [
+        (90, 1, 1),       # One set after 90s
+        (120, 2, 2),      # Two sets, 60s each
+        (360, 3, 1),      # Two of three sets deleted: one 120s set left
+        (50, 1, 0),       # Fully deleted group
+        (10000, 1, 1),    # Beyond MAX_REST_SECONDS: last bucket
+    ]
+
+    rest_sets, rest_seconds, counts = DailyRestSummary._summarize(groups)
+
+    assert (rest_sets, rest_seconds) == (5, 90 + 120 + 120 + 10000)
+    assert len(counts) == constants.MAX_REST_SECONDS // constants.REST_BUCKET_SECONDS
+    assert {bucket: count for bucket, count in enumerate(counts) if count} == {
+        60 // constants.REST_BUCKET_SECONDS: 2,
+        90 // constants.REST_BUCKET_SECONDS: 1,
+        120 // constants.REST_BUCKET_SECONDS: 1,
+        len(counts) - 1: 1,
+    }
+
+
+def test_rest_percentile():
+    """
+    Test percentile interpolates within buckets.
+    """
+    counts = DailyRestSummary.empty_histogram()
+    assert DailyRestSummary.percentile(counts, 0.5) is None
+
+    counts[4] = 2     # 60-75s
+    counts[6] = 1     # 90-105s
+    bucket = constants.REST_BUCKET_SECONDS
+    assert DailyRestSummary.percentile(counts, 0.5) == pytest.approx(4.75 * bucket)
+    assert DailyRestSummary.percentile(counts, 0.9) == pytest.approx(6.7 * bucket)
+    assert DailyRestSummary.percentile(counts, 1.0) == pytest.approx(7 * bucket)
+    assert DailyRestSummary.percentile(counts, 0.0) == pytest.approx(4 * bucket)
+
+
+def test_rest_histogram_pack_saturates():
+    """
+    Test pack round-trips and clamps counts that overflow uint16.
+    """
+    counts = DailyRestSummary.empty_histogram()
+    counts[0], counts[1], counts[-1] = 7, 70000, 65535
+
+    unpacked = DailyRestSummary.unpack(DailyRestSummary.pack(counts))
+
+    assert len(DailyRestSummary.pack(counts)) <= DailyRestSummary.histogram.type.length
+    assert unpacked[:2] == [7, 65535] and unpacked[-1] == 65535
+    assert sum(unpacked) == 7 + 2 * 65535